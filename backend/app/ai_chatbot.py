@@ -1,10 +1,21 @@
-"""AI-powered chatbot using HuggingFace Mistral-7B-Instruct API."""
+"""AI-powered chatbot on the configured LLM provider (HuggingFace Mistral-7B-Instruct by default)."""
 import json
-from typing import Optional, List, Dict, Any
+import logging
+import time
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Tuple
 import httpx
-from .chatbot_rules import get_response as get_fallback_response
+from .chatbot_rules import get_response as get_fallback_response, respond_to_intent
 from .config import settings
+from .http_clients import HUGGINGFACE, http_clients, timeout
+from .intent_router import route_message, route_stats
+from .llm_hedging import AllCandidatesFailed, ModelLatencyTracker, hedged_call
+from .llm_providers import fallback_provider, primary_provider
+from .llm_scheduler import CHAT, LoadShed, llm_scheduler
+from .prompt_builder import build_messages
+from .provider_health import provider_health
+from .response_cache import chat_response_cache
 
+logger = logging.getLogger(__name__)
 
 HF_MODEL_ID = "mistralai/Mistral-7B-Instruct-v0.1"
 HF_CHAT_MODEL_CANDIDATES = [
@@ -13,11 +24,12 @@ HF_CHAT_MODEL_CANDIDATES = [
     "meta-llama/Llama-3.1-8B-Instruct",
     "Qwen/Qwen2.5-7B-Instruct",
 ]
-HF_CHAT_COMPLETIONS_URL = "https://router.huggingface.co/v1/chat/completions"
 HF_LEGACY_URLS = [
-    f"https://router.huggingface.co/hf-inference/models/{HF_MODEL_ID}",
-    f"https://router.huggingface.co/models/{HF_MODEL_ID}",
+    f"{settings.hf_router_base_url}/hf-inference/models/{HF_MODEL_ID}",
+    f"{settings.hf_router_base_url}/models/{HF_MODEL_ID}",
 ]
+chat_latency = ModelLatencyTracker()
+
 SYSTEM_PROMPT = """You are AgriAI, an agriculture expert helping Indian farmers with crop advice, fertilizers, soil health, irrigation, pest control, and weather-based recommendations. 
 
 Provide practical, actionable advice in simple language. Consider local Indian farming conditions, soil types, climate zones, and traditional practices. Always prioritize sustainable and cost-effective solutions.
@@ -75,6 +87,7 @@ async def get_ai_response(
     crop_name: str = "",
     recommendations: Optional[List[Dict[str, Any]]] = None,
     chat_history: Optional[List[Dict[str, str]]] = None,
+    conversation_summary: Optional[str] = None,
 ) -> str:
     """
     Get AI response from HuggingFace API with fallback to rule-based system.
@@ -83,87 +96,137 @@ async def get_ai_response(
         user_message: User's question
         crop_name: Current crop name
         recommendations: List of crop recommendations with scores
-        chat_history: Previous chat messages [{"role": "user/assistant", "content": "..."}]
+        chat_history: Recent chat messages [{"role": "user/assistant", "content": "..."}]
+        conversation_summary: Rolling summary of older turns for this field
     
     Returns:
         AI-generated response or fallback response
     """
-    hf_token = (settings.hf_token or "").strip()
+    started = time.perf_counter()
+    route, answer = await _answer_message(
+        user_message, crop_name, recommendations, chat_history, conversation_summary
+    )
+    route_stats.record(route, time.perf_counter() - started)
+    return answer
+
+
+async def _answer_message(
+    user_message: str,
+    crop_name: str,
+    recommendations: Optional[List[Dict[str, Any]]],
+    chat_history: Optional[List[Dict[str, str]]],
+    conversation_summary: Optional[str],
+) -> Tuple[str, str]:
+    """Return (route, answer); route is one of local, rules, cache, shed, llm, fallback, degraded."""
+    if settings.chat_router_enabled:
+        decision = route_message(user_message, recommendations, settings.chat_router_min_confidence)
+        if decision.route == "local":
+            return "local", respond_to_intent(decision.intent_id, crop_name, recommendations)
+
+    provider = primary_provider()
     prepared_user_message = _prepare_user_message(user_message, crop_name)
-    
-    # Fallback to predefined responses if no token
-    if not hf_token:
-        print("⚠️  AI Chatbot: No HF_TOKEN found - using fallback responses")
-        return get_fallback_response(prepared_user_message, crop_name, recommendations)
-    
-    print(f"✅ AI Chatbot: HF_TOKEN found ({len(hf_token)} chars)")
+    context = _build_context(crop_name, recommendations)
+
+    def prompt_messages() -> List[Dict[str, str]]:
+        # Conversation with context, summary and recent turns within the token budget
+        messages, prompt_tokens = build_messages(
+            SYSTEM_PROMPT,
+            context,
+            conversation_summary,
+            chat_history or [],
+            prepared_user_message,
+            budget=settings.chat_prompt_token_budget,
+            user_message_max_tokens=settings.chat_user_message_max_tokens,
+        )
+        logger.debug("Calling chat model", extra={"provider": provider.name, "prompt_tokens": prompt_tokens})
+        return messages
+
+    def degraded(route: str) -> Awaitable[Tuple[str, str]]:
+        return _degraded_answer(route, prompt_messages, prepared_user_message, crop_name, recommendations)
+
+    # Fallback to predefined responses if the provider is not configured (e.g. no HF_TOKEN)
+    if not provider.available():
+        logger.debug("LLM provider %s not configured; using degraded response", provider.name)
+        return await degraded("rules")
+
+    use_cache = settings.chat_cache_enabled and chat_response_cache.cacheable(user_message)
+    if use_cache:
+        cached = chat_response_cache.lookup(crop_name, prepared_user_message, context)
+        if cached:
+            logger.debug("Chat answer served from response cache")
+            return "cache", cached
+
+    ticket = None
+    admit = None
+    if provider.remote:
+        queued_at = time.perf_counter()
+        try:
+            ticket = await llm_scheduler.acquire(CHAT, max_wait=settings.llm_chat_queue_slo_seconds)
+        except LoadShed as exc:
+            logger.warning("Shedding chat load, using degraded response: %s", exc)
+            return await degraded("shed")
+
+        # The ticket pays for one upstream request; every further hedge, failover or
+        # legacy call takes its own rate token, within what is left of the queue SLO.
+        wait_budget = settings.llm_chat_queue_slo_seconds - (time.perf_counter() - queued_at)
+
+        async def admit(wait: bool = True) -> bool:
+            nonlocal wait_budget
+            started = time.perf_counter()
+            try:
+                return await llm_scheduler.spend(CHAT, wait=wait, max_wait=max(0.0, wait_budget))
+            finally:
+                wait_budget -= time.perf_counter() - started
     
     try:
-        # Build conversation with context
-        context = _build_context(crop_name, recommendations)
-        
-        # Format messages for Mistral (instruct format)
-        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-        
-        if context:
-            messages.append({"role": "system", "content": f"Context: {context}"})
-        
-        # Add chat history (last 6 messages for context)
-        if chat_history:
-            for msg in chat_history[-6:]:
-                messages.append(msg)
-        
-        # Add current user message
-        messages.append({"role": "user", "content": prepared_user_message})
-        
-        print("🤖 AI Chatbot: Calling HuggingFace API...")
-
-        # Call HuggingFace router (OpenAI-compatible chat completions)
+        messages = prompt_messages()
         ai_text = ""
         error_messages: list[str] = []
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for model_id in HF_CHAT_MODEL_CANDIDATES:
-                print(f"🌐 AI Chatbot: Trying chat endpoint model: {model_id}")
-                response = await client.post(
-                    HF_CHAT_COMPLETIONS_URL,
-                    headers={
-                        "Authorization": f"Bearer {hf_token}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": model_id,
-                        "messages": messages,
-                        "max_tokens": 300,
-                        "temperature": 0.7,
-                        "top_p": 0.95,
-                    },
+
+        async def call_chat_model(model_id: str) -> str:
+            try:
+                return await provider.complete(
+                    messages,
+                    model=model_id,
+                    max_tokens=300,
+                    temperature=0.7,
+                    top_p=0.95,
+                    timeout_seconds=settings.hf_chat_timeout_seconds,
                 )
+            except ValueError as exc:
+                logger.warning("Chat model call failed", extra={"model": model_id, "error": str(exc)})
+                raise
 
-                print(f"📡 AI Chatbot: API response status: {response.status_code}")
+        try:
+            _, ai_text = await hedged_call(
+                provider.models("chat", HF_CHAT_MODEL_CANDIDATES),
+                call_chat_model,
+                hedge_delay=settings.llm_chat_hedge_delay_seconds if settings.llm_hedging_enabled else None,
+                tracker=chat_latency,
+                failure_latency=30.0,
+                health=provider_health,
+                endpoint=provider.endpoint,
+                admit=admit,
+            )
+        except AllCandidatesFailed as exc:
+            error_messages.extend(f"{provider.endpoint} -> {err}" for err in exc.errors)
 
-                if response.status_code == 200:
-                    result = response.json()
-                    ai_text = (
-                        ((result.get("choices") or [{}])[0].get("message") or {}).get("content", "")
-                        if isinstance(result, dict)
-                        else ""
-                    ).strip()
-                    if ai_text:
-                        break
-                    error_messages.append(f"{HF_CHAT_COMPLETIONS_URL} [{model_id}] -> empty content")
+        # Legacy fallback (in case account/provider doesn't support chat-completions route)
+        if not ai_text and provider.name == "huggingface":
+            hf_token = settings.hf_token.strip()
+            client = http_clients.async_client(HUGGINGFACE)
+            prompt = _format_mistral_prompt(messages)
+            for api_url in HF_LEGACY_URLS:
+                if not provider_health.allow(api_url, HF_MODEL_ID):
+                    error_messages.append(f"{api_url} -> circuit open")
                     continue
-
-                error_preview = response.text[:200]
-                print(f"❌ HF API error response: {error_preview}")
-                error_messages.append(f"{HF_CHAT_COMPLETIONS_URL} [{model_id}] -> {response.status_code}: {error_preview}")
-
-            # Legacy fallback (in case account/provider doesn't support chat-completions route)
-            if not ai_text:
-                prompt = _format_mistral_prompt(messages)
-                for api_url in HF_LEGACY_URLS:
-                    print(f"🌐 AI Chatbot: Trying legacy endpoint: {api_url}")
+                logger.info("Falling back to legacy HuggingFace endpoint", extra={"url": api_url})
+                if admit:
+                    await admit()
+                try:
                     response = await client.post(
                         api_url,
+                        timeout=timeout(settings.hf_chat_timeout_seconds),
                         headers={"Authorization": f"Bearer {hf_token}"},
                         json={
                             "inputs": prompt,
@@ -178,39 +241,75 @@ async def get_ai_response(
                             },
                         },
                     )
-                    print(f"📡 AI Chatbot: API response status: {response.status_code}")
-
-                    if response.status_code == 200:
-                        result = response.json()
-                        if isinstance(result, list) and len(result) > 0:
-                            ai_text = result[0].get("generated_text", "").strip()
-                        elif isinstance(result, dict):
-                            ai_text = result.get("generated_text", "").strip()
-                        if ai_text:
-                            break
-                        error_messages.append(f"{api_url} -> empty content")
-                        continue
-
-                    error_preview = response.text[:200]
-                    print(f"❌ HF API error response: {error_preview}")
-                    error_messages.append(f"{api_url} -> {response.status_code}: {error_preview}")
-
-            if not ai_text:
-                raise Exception("HF API error: " + " | ".join(error_messages))
+                except httpx.HTTPError as exc:
+                    provider_health.record_failure(api_url, HF_MODEL_ID, str(exc))
+                    error_messages.append(f"{api_url} -> {exc}")
+                    continue
+                if response.status_code == 200:
+                    result = response.json()
+                    if isinstance(result, list) and len(result) > 0:
+                        ai_text = result[0].get("generated_text", "").strip()
+                    elif isinstance(result, dict):
+                        ai_text = result.get("generated_text", "").strip()
+                    if ai_text:
+                        provider_health.record_success(api_url, HF_MODEL_ID)
+                        break
+                    provider_health.record_failure(api_url, HF_MODEL_ID, "empty content")
+                    error_messages.append(f"{api_url} -> empty content")
+                    continue
+
+                error_preview = response.text[:200]
+                logger.warning(
+                    "HuggingFace legacy call failed",
+                    extra={"url": api_url, "status": response.status_code, "error": error_preview},
+                )
+                provider_health.record_failure(api_url, HF_MODEL_ID, f"{response.status_code}: {error_preview}")
+                error_messages.append(f"{api_url} -> {response.status_code}: {error_preview}")
+
+        if not ai_text:
+            raise Exception("LLM error: " + " | ".join(error_messages))
             
-            # Clean up response
-            ai_text = _clean_response(ai_text)
+        # Clean up response
+        ai_text = _clean_response(ai_text)
             
-            if not ai_text:
-                raise Exception("Empty AI response")
+        if not ai_text:
+            raise Exception("Empty AI response")
             
-            print(f"✨ AI Chatbot: Generated response ({len(ai_text)} chars)")
-            return ai_text
+        logger.debug("Chat answer generated", extra={"chars": len(ai_text)})
+        if use_cache:
+            chat_response_cache.store(crop_name, prepared_user_message, context, ai_text)
+        return "llm", ai_text
     
     except Exception as e:
-        print(f"❌ AI chatbot error: {e}")
-        # Fallback to predefined responses
-        return get_fallback_response(prepared_user_message, crop_name, recommendations)
+        logger.error("Chat LLM failed, using degraded response: %s", e)
+        return await degraded("fallback")
+    finally:
+        if ticket is not None:
+            llm_scheduler.release(ticket)
+
+
+async def _degraded_answer(
+    route: str,
+    prompt_messages: Callable[[], List[Dict[str, str]]],
+    prepared_user_message: str,
+    crop_name: str,
+    recommendations: Optional[List[Dict[str, Any]]],
+) -> Tuple[str, str]:
+    """Answer from LLM_FALLBACK_PROVIDER (route "degraded") when one is set, else from the rules."""
+    fallback = fallback_provider()
+    if fallback is not None and fallback.available():
+        try:
+            text = _clean_response(await fallback.complete(
+                prompt_messages(),
+                model=fallback.models("chat", HF_CHAT_MODEL_CANDIDATES)[0],
+                max_tokens=300,
+                timeout_seconds=settings.hf_chat_timeout_seconds,
+            ))
+            if text:
+                return "degraded", text
+        except Exception as exc:
+            logger.warning("Fallback LLM provider %s failed: %s", fallback.name, exc)
+    return route, get_fallback_response(prepared_user_message, crop_name, recommendations)
 
 
 def _format_mistral_prompt(messages: List[Dict[str, str]]) -> str:
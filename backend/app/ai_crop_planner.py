@@ -1,21 +1,28 @@
 """AI-generated crop planning service with month-wise and day-wise schedule."""
 import json
+import logging
 import math
 import calendar
+from contextlib import nullcontext
 from datetime import date, timedelta
 from typing import Any, Dict, List
 from urllib.parse import quote_plus
 
-import httpx
-
 from .config import settings
+from .llm_hedging import AllCandidatesFailed, ModelLatencyTracker, hedged_call
+from .llm_providers import LLMProvider, fallback_provider, primary_provider
+from .llm_scheduler import PLAN, llm_scheduler
+from .metrics import timed
+from .provider_health import provider_health
+from .schemas import CropPlan
 
 HF_PLAN_MODEL_CANDIDATES = [
     "mistralai/Mistral-7B-Instruct-v0.3",
     "meta-llama/Llama-3.1-8B-Instruct",
     "Qwen/Qwen2.5-7B-Instruct",
 ]
-HF_CHAT_COMPLETIONS_URL = "https://router.huggingface.co/v1/chat/completions"
+logger = logging.getLogger(__name__)
+plan_latency = ModelLatencyTracker()
 _ALLOWED_ICONS = {"sprout", "water", "shield-check", "sun", "tractor", "leaf"}
 
 _ICON_KEYWORDS = {
@@ -92,59 +99,54 @@ def _extract_json_object(raw_text: str) -> Dict[str, Any]:
         raise
 
 
-def _normalize_day_plan_items(items: List[Dict[str, Any]], max_days: int) -> List[Dict[str, Any]]:
-    normalized: List[Dict[str, Any]] = []
-    for idx, item in enumerate(items[:max_days], start=1):
-        icon = str(item.get("icon", "leaf")).strip().lower()
-        if icon not in _ALLOWED_ICONS:
-            icon = "leaf"
-
-        normalized.append(
-            {
-                "day": int(item.get("day", idx)),
-                "date": str(item.get("date") or f"Day {idx}"),
-                "title": str(item.get("title") or f"Task for Day {idx}"),
-                "description": str(item.get("description") or "Inspect crop stage, apply required inputs, and document field observations for this day."),
-                "icon": icon,
-                "image_url": str(item.get("image_url") or ""),
-            }
-        )
-    return normalized
+_DEFAULT_ITEM_DESCRIPTION = "Inspect crop stage, apply required inputs, and document field observations for this day."
+_DEFAULT_MONTH_FOCUS = "Detailed crop growth, nutrition, irrigation, and crop protection schedule"
+_DEFAULT_IRRIGATION = (
+    "Follow stage-wise irrigation based on local weather and soil moisture; "
+    "prefer morning irrigation and avoid waterlogging."
+)
+
+# Filler tasks for days the AI left out, indexed by day % 6: (title, description, icon).
+_DEFAULT_ACTIVITIES = (
+    (
+        "Growth recording and planning",
+        "Record plant height, flowering/fruiting status, and weather impact. Use observations to plan next day irrigation, nutrition, and protection tasks.",
+        "leaf",
+    ),
+    (
+        "Soil moisture and root-zone check",
+        "Check topsoil and root-zone moisture. If moisture is low, schedule irrigation in early morning. Avoid overwatering to protect root health.",
+        "water",
+    ),
+    (
+        "Nutrient and fertilizer application",
+        "Apply stage-appropriate nutrients in split dose. Observe leaf color and growth response. Record quantity applied for cost and yield tracking.",
+        "sprout",
+    ),
+    (
+        "Pest and disease scouting",
+        "Walk across the field and inspect leaves, stems, and lower canopy. Remove infected plant parts and apply recommended control measures if needed.",
+        "shield-check",
+    ),
+    (
+        "Weeding and field sanitation",
+        "Remove weeds near crop rows and bunds. Keep channels clean for better water flow. Maintain field hygiene to reduce pest pressure.",
+        "tractor",
+    ),
+    (
+        "Sunlight and canopy management",
+        "Assess canopy density and sunlight penetration. Prune or adjust spacing where needed to improve airflow and reduce disease risk.",
+        "sun",
+    ),
+)
 
 
 def _default_day_item(crop_name: str, month_anchor: date, day: int, month_number: int) -> Dict[str, Any]:
-    date_value = month_anchor.replace(day=day)
-    activity_type = day % 6
-    if activity_type == 1:
-        title = "Soil moisture and root-zone check"
-        description = "Check topsoil and root-zone moisture. If moisture is low, schedule irrigation in early morning. Avoid overwatering to protect root health."
-        icon = "water"
-    elif activity_type == 2:
-        title = "Nutrient and fertilizer application"
-        description = "Apply stage-appropriate nutrients in split dose. Observe leaf color and growth response. Record quantity applied for cost and yield tracking."
-        icon = "sprout"
-    elif activity_type == 3:
-        title = "Pest and disease scouting"
-        description = "Walk across the field and inspect leaves, stems, and lower canopy. Remove infected plant parts and apply recommended control measures if needed."
-        icon = "shield-check"
-    elif activity_type == 4:
-        title = "Weeding and field sanitation"
-        description = "Remove weeds near crop rows and bunds. Keep channels clean for better water flow. Maintain field hygiene to reduce pest pressure."
-        icon = "tractor"
-    elif activity_type == 5:
-        title = "Sunlight and canopy management"
-        description = "Assess canopy density and sunlight penetration. Prune or adjust spacing where needed to improve airflow and reduce disease risk."
-        icon = "sun"
-    else:
-        title = "Growth recording and planning"
-        description = "Record plant height, flowering/fruiting status, and weather impact. Use observations to plan next day irrigation, nutrition, and protection tasks."
-        icon = "leaf"
-
-    title = f"{crop_name}: {title}"
+    title, description, icon = _DEFAULT_ACTIVITIES[day % 6]
     return {
         "day": day,
-        "date": date_value.strftime("%d/%m/%Y"),
-        "title": title,
+        "date": f"{day:02d}/{month_anchor.month:02d}/{month_anchor.year}",
+        "title": f"{crop_name}: {title}",
         "description": f"Month {month_number} • {description}",
         "icon": icon,
         "image_url": _task_image_url(icon, crop_name),
@@ -167,7 +169,7 @@ def _default_monthly_plans(crop_name: str, duration_days: int, start_date: date)
             {
                 "month_number": month,
                 "month_label": month_start.strftime("%B %Y"),
-                "focus": "Detailed crop growth, nutrition, irrigation, and crop protection schedule",
+                "focus": _DEFAULT_MONTH_FOCUS,
                 "day_plan": day_plan,
             }
         )
@@ -175,7 +177,14 @@ def _default_monthly_plans(crop_name: str, duration_days: int, start_date: date)
     return plans
 
 
+@timed("plan_normalize")
 def _normalize_plan(ai_plan: Dict[str, Any], crop_name: str, duration_days: int) -> Dict[str, Any]:
+    """
+    Coerce an AI plan into the stored plan shape in one pass per month: AI
+    items are cleaned and indexed by day as they are read, and missing days
+    are filled from the precomputed default activities. Every value is cast
+    to its CropPlan field type here, so the result validates as-is.
+    """
     start_date = date.today().replace(day=1)
 
     raw_duration = ai_plan.get("duration_days", duration_days)
@@ -183,6 +192,7 @@ def _normalize_plan(ai_plan: Dict[str, Any], crop_name: str, duration_days: int)
 
     duration_months = max(1, math.ceil(normalized_duration / 30))
     raw_monthly = ai_plan.get("monthly_plans") or []
+    image_urls = {icon: _task_image_url(icon, crop_name) for icon in _ALLOWED_ICONS}
 
     monthly_plans: List[Dict[str, Any]] = []
     for idx in range(duration_months):
@@ -190,37 +200,49 @@ def _normalize_plan(ai_plan: Dict[str, Any], crop_name: str, duration_days: int)
         raw_month = raw_monthly[idx] if idx < len(raw_monthly) and isinstance(raw_monthly[idx], dict) else {}
         month_start = _month_anchor(start_date, idx)
         max_days = calendar.monthrange(month_start.year, month_start.month)[1]
+        date_suffix = f"/{month_start.month:02d}/{month_start.year}"
 
         raw_day_plan = raw_month.get("day_plan") if isinstance(raw_month.get("day_plan"), list) else []
-        normalized_day_plan = _normalize_day_plan_items(raw_day_plan, max_days=max_days)
+        ai_by_day: Dict[int, tuple] = {}
+        for position, item in enumerate(raw_day_plan[:max_days], start=1):
+            icon = str(item.get("icon", "leaf")).strip().lower()
+            if icon not in _ALLOWED_ICONS:
+                icon = "leaf"
+            day = int(item.get("day", position))
+            if 0 < day <= max_days:
+                ai_by_day[day] = (
+                    str(item.get("title") or f"Task for Day {position}"),
+                    str(item.get("description") or _DEFAULT_ITEM_DESCRIPTION),
+                    icon,
+                    str(item.get("image_url") or "") or image_urls[icon],
+                )
 
-        ai_by_day = {int(item.get("day", 0)): item for item in normalized_day_plan if int(item.get("day", 0)) > 0}
         filled_day_plan: List[Dict[str, Any]] = []
         for day in range(1, max_days + 1):
             source = ai_by_day.get(day)
             if source:
-                icon = source.get("icon", "leaf")
-                day_title = source.get("title") or _default_day_item(crop_name, month_start, day, month_number)["title"]
-                day_description = source.get("description") or _default_day_item(crop_name, month_start, day, month_number)["description"]
-                image_url = source.get("image_url") or _task_image_url(icon, crop_name)
-                filled_day_plan.append(
-                    {
-                        "day": day,
-                        "date": month_start.replace(day=day).strftime("%d/%m/%Y"),
-                        "title": str(day_title),
-                        "description": str(day_description),
-                        "icon": str(icon),
-                        "image_url": str(image_url),
-                    }
-                )
+                title, description, icon, image_url = source
             else:
-                filled_day_plan.append(_default_day_item(crop_name, month_start, day, month_number))
+                title, description, icon = _DEFAULT_ACTIVITIES[day % 6]
+                title = f"{crop_name}: {title}"
+                description = f"Month {month_number} • {description}"
+                image_url = image_urls[icon]
+            filled_day_plan.append(
+                {
+                    "day": day,
+                    "date": f"{day:02d}{date_suffix}",
+                    "title": title,
+                    "description": description,
+                    "icon": icon,
+                    "image_url": image_url,
+                }
+            )
 
         monthly_plans.append(
             {
                 "month_number": month_number,
                 "month_label": str(raw_month.get("month_label") or month_start.strftime("%B %Y")),
-                "focus": str(raw_month.get("focus") or "Detailed crop growth, nutrition, irrigation, and crop protection schedule"),
+                "focus": str(raw_month.get("focus") or _DEFAULT_MONTH_FOCUS),
                 "day_plan": filled_day_plan,
             }
         )
@@ -237,7 +259,7 @@ def _normalize_plan(ai_plan: Dict[str, Any], crop_name: str, duration_days: int)
         "expected_yield": str(ai_plan.get("expected_yield") or "AI estimate unavailable"),
         "estimated_profit": float(ai_plan.get("estimated_profit") or 0),
         "fertilizer_recommendations": [str(x) for x in (ai_plan.get("fertilizer_recommendations") or [])][:8],
-        "irrigation_guidance": str(ai_plan.get("irrigation_guidance") or "Follow stage-wise irrigation based on local weather and soil moisture; prefer morning irrigation and avoid waterlogging."),
+        "irrigation_guidance": str(ai_plan.get("irrigation_guidance") or _DEFAULT_IRRIGATION),
         "monthly_plans": monthly_plans,
         "day_plan": first_month_day_plan,
     }
@@ -251,9 +273,11 @@ async def generate_ai_crop_plan(
     investment_level: str,
 ) -> Dict[str, Any]:
     """Generate a crop plan from AI as structured JSON with monthly/day-wise tasks."""
-    hf_token = (settings.hf_token or "").strip()
-    if not hf_token:
-        raise ValueError("HF_TOKEN is missing. Configure it in backend .env to generate AI plans.")
+    provider = primary_provider()
+    if not provider.available():
+        provider = fallback_provider()
+        if provider is None or not provider.available():
+            raise ValueError("HF_TOKEN is missing. Configure it in backend .env to generate AI plans.")
 
     system_prompt = (
         "You are an expert agronomist for Indian farming conditions. "
@@ -311,43 +335,56 @@ Rules:
         {"role": "user", "content": user_prompt},
     ]
 
-    errors: List[str] = []
-    async with httpx.AsyncClient(timeout=40.0) as client:
-        for model_id in HF_PLAN_MODEL_CANDIDATES:
-            response = await client.post(
-                HF_CHAT_COMPLETIONS_URL,
-                headers={
-                    "Authorization": f"Bearer {hf_token}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": model_id,
-                    "messages": messages,
-                    "max_tokens": 3500,
-                    "temperature": 0.3,
-                    "top_p": 0.9,
-                    "response_format": {"type": "json_object"},
-                },
-            )
+    async def call_plan_model(provider: LLMProvider, model_id: str) -> Dict[str, Any]:
+        content = await provider.complete(
+            messages,
+            model=model_id,
+            max_tokens=3500,
+            temperature=0.3,
+            top_p=0.9,
+            response_format={"type": "json_object"},
+            timeout_seconds=settings.hf_plan_timeout_seconds,
+        )
+        try:
+            parsed = _extract_json_object(content)
+            plan = _normalize_plan(parsed, crop_name=crop_name, duration_days=120)
+            # Validate once here, where the data is untrusted; stored plans are re-read as-is.
+            CropPlan.model_validate(plan)
+            return plan
+        except Exception as exc:
+            raise ValueError(f"invalid JSON ({exc})") from exc
 
-            if response.status_code != 200:
-                errors.append(f"{model_id}: {response.status_code} {response.text[:150]}")
-                continue
+    try:
+        return await _plan_with(provider, call_plan_model)
+    except AllCandidatesFailed as exc:
+        errors = exc.errors
+
+    fallback = fallback_provider()
+    if fallback is not None and fallback is not provider and fallback.available():
+        logger.warning("AI plan models failed, using fallback provider %s", fallback.name, extra={"errors": errors[:3]})
+        try:
+            return await _plan_with(fallback, call_plan_model)
+        except AllCandidatesFailed as exc:
+            errors = errors + exc.errors
 
-            payload = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
-            content = (
-                ((payload.get("choices") or [{}])[0].get("message") or {}).get("content", "")
-                if isinstance(payload, dict)
-                else ""
-            )
-            if not content:
-                errors.append(f"{model_id}: empty content")
-                continue
+    raise RuntimeError("AI crop plan generation failed: " + " | ".join(errors[:3]))
 
-            try:
-                parsed = _extract_json_object(content)
-                return _normalize_plan(parsed, crop_name=crop_name, duration_days=120)
-            except Exception as exc:
-                errors.append(f"{model_id}: invalid JSON ({exc})")
 
-    raise RuntimeError("AI crop plan generation failed: " + " | ".join(errors[:3]))
+async def _plan_with(provider: LLMProvider, call_plan_model) -> Dict[str, Any]:
+    """Race the provider's plan models; remote providers are admitted through the LLM scheduler."""
+    models = provider.models("plan", HF_PLAN_MODEL_CANDIDATES)
+    hedge_delay = settings.llm_plan_hedge_delay_seconds if settings.llm_hedging_enabled else None
+    # The slot pays for the first upstream request; each further hedge or failover takes its own rate token.
+    admit = (lambda wait: llm_scheduler.spend(PLAN, wait=wait)) if provider.remote else None
+    async with llm_scheduler.slot(PLAN) if provider.remote else nullcontext():
+        _, plan = await hedged_call(
+            models,
+            lambda model_id: call_plan_model(provider, model_id),
+            hedge_delay=hedge_delay,
+            tracker=plan_latency,
+            failure_latency=40.0,
+            health=provider_health,
+            endpoint=provider.endpoint,
+            admit=admit,
+        )
+    return plan
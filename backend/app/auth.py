@@ -1,4 +1,5 @@
 """Firebase Authentication verification."""
+import logging
 import os
 from typing import Optional
 from fastapi import HTTPException, status, Depends, Request
@@ -12,6 +13,7 @@ from .models import FarmerProfile
 
 security = HTTPBearer(auto_error=False)
 cookie_auth = APIKeyCookie(name="session_token", auto_error=False)
+logger = logging.getLogger(__name__)
 
 _firebase_initialized = False
 
@@ -63,18 +65,18 @@ def verify_firebase_token(token: str) -> dict:
                         "name": decoded.get("name"),
                     }
                 except Exception as e:
-                    print(f"Dev token decode error: {e}")
+                    logger.warning("Dev token decode error: %s", e)
         
         # Try to verify with Firebase Admin SDK
         try:
             decoded = auth.verify_id_token(token)
             return decoded
         except Exception as fb_error:
-            print(f"Firebase verification error: {fb_error}")
+            logger.warning("Firebase verification error: %s", fb_error)
             if settings.env == "development":
                 # In dev, allow any non-empty token that looks like JWT
                 if token.count(".") == 2:
-                    print("Dev mode: allowing token despite Firebase verification failure")
+                    logger.warning("Dev mode: allowing token despite Firebase verification failure")
                     parts = token.split(".")
                     try:
                         import base64, json
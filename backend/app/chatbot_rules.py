@@ -1,21 +1,52 @@
 """Rule-based chatbot with recommendation-aware responses for v2.0."""
-import re
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+
+from .intent_engine import Intent, IntentEngine
 
 
 KEYWORDS_RESPONSES = [
-    (r"hello|hi|namaste", "Hello! Welcome to AgriAI. Ask any question about your crop."),
-    (r"irrigation|watering|water", "Your plan includes irrigation guidance. Irrigate 2-4 times per week based on water availability. Keep soil moist, avoid overwatering."),
-    (r"fertilizer|manure|fertilisers", "Fertilizer recommendations for your soil and crop are in the right panel. Apply basal dressing at sowing and top dressing later."),
-    (r"pest|disease", "For pests or diseases, consult your local agriculture extension centre. Prefer organic pesticides."),
-    (r"cost|investment", "Estimated cost is in your plan. Actual cost depends on weather and market."),
-    (r"yield|production", "Yield depends on soil, weather, and care. Regular irrigation and fertilizer improve yield."),
-    (r"day|today|what to do", "Check the day-to-day plan in the right panel for today's tasks with dates."),
-    (r"weather|rain", "Adjust irrigation and fertilizer timing based on weather. Reduce irrigation after rain."),
-    (r"thanks|thank you", "You're welcome! Feel free to ask more questions."),
+    ("greeting", "hello|hi|namaste", "Hello! Welcome to AgriAI. Ask any question about your crop."),
+    ("irrigation", "irrigation|watering|water", "Your plan includes irrigation guidance. Irrigate 2-4 times per week based on water availability. Keep soil moist, avoid overwatering."),
+    ("fertilizer", "fertilizer|manure|fertilisers", "Fertilizer recommendations for your soil and crop are in the right panel. Apply basal dressing at sowing and top dressing later."),
+    ("pest_disease", "pest|disease", "For pests or diseases, consult your local agriculture extension centre. Prefer organic pesticides."),
+    ("cost", "cost|investment", "Estimated cost is in your plan. Actual cost depends on weather and market."),
+    ("yield", "yield|production", "Yield depends on soil, weather, and care. Regular irrigation and fertilizer improve yield."),
+    ("daily_tasks", "day|today|what to do", "Check the day-to-day plan in the right panel for today's tasks with dates."),
+    ("weather", "weather|rain", "Adjust irrigation and fertilizer timing based on weather. Reduce irrigation after rain."),
+    ("thanks", "thanks|thank you", "You're welcome! Feel free to ask more questions."),
+]
+
+# Intents answered from the farmer's recommendations; checked after the keyword replies.
+CONTEXT_INTENTS = [
+    ("best_crop", "best crop|which crop is best"),
+    ("high_profit", "high profit|which crop gives high profit"),
+    ("less_water", "less water|needs less water"),
+    ("question", "?|how|what|when|why"),
 ]
 
 
+def _build_engine() -> IntentEngine:
+    intents = [
+        Intent(intent_id, tuple(pattern.split("|")), priority, response)
+        for priority, (intent_id, pattern, response) in enumerate(KEYWORDS_RESPONSES)
+    ]
+    offset = len(intents)
+    intents += [
+        Intent(intent_id, tuple(pattern.split("|")), offset + i)
+        for i, (intent_id, pattern) in enumerate(CONTEXT_INTENTS)
+    ]
+    return IntentEngine(intents)
+
+
+# Compiled once at import; patterns are plain keyword alternations.
+INTENT_ENGINE = _build_engine()
+
+
+def match_intents(user_message: str) -> List[Tuple[str, int]]:
+    """All intents present in the message as (intent_id, priority), best first."""
+    return INTENT_ENGINE.match(user_message)
+
+
 def _best_profit_crop(recommendations: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     if not recommendations:
         return None
@@ -37,12 +68,20 @@ def get_response(user_message: str, crop_name: str = "", recommendations: Option
     if not text:
         return "Please type your question."
 
-    for pattern, response in KEYWORDS_RESPONSES:
-        if re.search(pattern, text, re.IGNORECASE):
-            return response
+    intent = INTENT_ENGINE.best(text)
+    return respond_to_intent(intent.intent_id if intent else None, crop_name, recommendations)
+
+
+def respond_to_intent(
+    intent_id: Optional[str], crop_name: str = "", recommendations: Optional[List[Dict[str, Any]]] = None
+) -> str:
+    """Canned or recommendation-derived reply for an already classified intent."""
+    intent = INTENT_ENGINE.by_id(intent_id) if intent_id else None
+    if intent and intent.response:
+        return intent.response
 
     recommendations = recommendations or []
-    if "best crop" in text or "which crop is best" in text:
+    if intent_id == "best_crop":
         if recommendations:
             top = recommendations[0]
             return (
@@ -51,7 +90,7 @@ def get_response(user_message: str, crop_name: str = "", recommendations: Option
             )
         return "For your field, I recommend checking crop score from the right panel recommendations."
 
-    if "high profit" in text or "which crop gives high profit" in text:
+    if intent_id == "high_profit":
         best = _best_profit_crop(recommendations)
         if best:
             return (
@@ -60,7 +99,7 @@ def get_response(user_message: str, crop_name: str = "", recommendations: Option
             )
         return "High-profit crop depends on your weather and soil; run recommendation for exact numbers."
 
-    if "less water" in text or "needs less water" in text:
+    if intent_id == "less_water":
         least = _least_water_crop(recommendations)
         if least:
             return (
@@ -69,7 +108,7 @@ def get_response(user_message: str, crop_name: str = "", recommendations: Option
             )
         return "Millet, pulses, and chickpea usually need less water than paddy/sugarcane."
 
-    if any(w in text for w in ["?", "how", "what", "when", "why"]):
+    if intent_id == "question":
         return (
             f"Thanks for your question. "
             f"AgriAI provides basic guidance for your '{crop_name}' crop. "
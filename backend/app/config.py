@@ -5,12 +5,109 @@ from typing import List
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./agriai.db"
+    # Connection pool; sized for the 40-thread pool that runs sync endpoints
+    db_pool_size: int = 10
+    db_max_overflow: int = 30
     firebase_project_id: str = ""
     google_application_credentials: str | None = None
     cors_origins: str = "http://localhost:5173,http://127.0.0.1:5173"
     env: str = "development"
     weather_api_key: str = ""
     hf_token: str = ""  # HuggingFace API token for AI chatbot
+    hf_chat_timeout_seconds: float = 30.0
+    hf_plan_timeout_seconds: float = 40.0
+    # Upstream base URLs; overridden to point at local stand-ins (benchmarks/mock_upstreams.py)
+    openweather_base_url: str = "https://api.openweathermap.org"
+    hf_router_base_url: str = "https://router.huggingface.co"
+    weather_timeout_seconds: float = 8.0
+    # LLM provider behind chat and AI plans (app/llm_providers.py): huggingface, openai or template
+    llm_provider: str = "huggingface"
+    llm_fallback_provider: str = ""  # degraded mode when the primary is unconfigured or failing, e.g. "template"
+    llm_base_url: str = "http://127.0.0.1:8081/v1"  # OpenAI-compatible server for llm_provider=openai
+    llm_api_key: str = ""
+    llm_chat_models: str = "local"  # comma-separated candidates for llm_provider=openai
+    llm_plan_models: str = "local"
+    # Simulated model speed of the bundled stand-in server (app/local_llm_server.py)
+    local_llm_latency_ms: float = 0.0
+    local_llm_tokens_per_second: float = 0.0  # 0 = stream as fast as possible
+    # Chatbot response cache (exact + near-duplicate questions)
+    chat_cache_enabled: bool = True
+    chat_cache_ttl_seconds: float = 86400.0
+    chat_cache_similarity_threshold: float = 0.8
+    chat_cache_max_entries: int = 5000
+    chat_cache_max_entries_per_bucket: int = 256  # per (crop, context); bounds each lookup's matmul
+    # Chat prompt assembly: token budget and rolling conversation summary
+    chat_prompt_token_budget: int = 1200
+    chat_user_message_max_tokens: int = 400
+    chat_summary_max_tokens: int = 250
+    chat_history_raw_messages: int = 2
+    # Answer greetings/recommendation questions locally instead of calling the LLM
+    chat_router_enabled: bool = True
+    chat_router_min_confidence: float = 0.5
+    # Shared outbound HTTP client pools (one per upstream host)
+    http2_enabled: bool = True
+    http_max_connections_per_host: int = 20
+    http_max_keepalive_per_host: int = 10
+    http_keepalive_expiry_seconds: float = 60.0
+    http_connect_timeout_seconds: float = 5.0
+    http_default_timeout_seconds: float = 30.0
+    # Hedged LLM requests: start the next model candidate if the current one is slow
+    llm_hedging_enabled: bool = True
+    llm_chat_hedge_delay_seconds: float = 2.5
+    llm_plan_hedge_delay_seconds: float = 0.0  # 0 = race all plan models at once
+    # Global admission control for upstream LLM calls (chat is served before plans)
+    llm_max_inflight: int = 8
+    llm_requests_per_minute: float = 120.0  # 0 = no rate limit
+    llm_rate_burst: int = 10
+    llm_chat_queue_slo_seconds: float = 3.0  # chat beyond this queue wait gets the rule-based answer
+    # Circuit breaker per (endpoint, model): skip models that keep failing
+    llm_breaker_failure_threshold: int = 3
+    llm_breaker_cooldown_seconds: float = 30.0
+    llm_breaker_max_cooldown_seconds: float = 600.0
+    # Background AI plan generation jobs
+    plan_job_backend: str = "database"  # database | memory
+    plan_job_workers: int = 2
+    plan_job_max_attempts: int = 3
+    plan_job_retry_backoff_seconds: float = 5.0
+    plan_job_wait_seconds: float = 25.0  # how long GET /api/plan waits before serving the rule-based plan
+    plan_job_lease_seconds: float = 120.0  # renewed while a job runs; other processes take over expired leases
+    plan_job_retention_hours: float = 24.0  # finished jobs (and their result_json) are deleted after this
+    weather_cache_ttl_seconds: int = 3600
+    # Background weather prefetch for active farmer locations (needs weather_api_key)
+    weather_prefetch_enabled: bool = True
+    weather_prefetch_start_hour: int = 5   # local server time
+    weather_prefetch_end_hour: int = 10
+    weather_prefetch_interval_minutes: int = 60
+    weather_prefetch_active_days: int = 30
+    weather_prefetch_concurrency: int = 8
+    weather_api_calls_per_minute: int = 55  # OpenWeather free tier allows 60
+    plan_weather_overlay_days: int = 5  # forecast-driven adjustments on upcoming plan days
+    # Serialize large responses with pydantic-core/orjson; stored plans are sent without re-encoding
+    fast_json_responses: bool = True
+    # Rendered plan documents keyed by (field, plan version, month view); 0 disables
+    plan_render_cache_size: int = 512
+    plan_render_cache_dir: str = ""  # optional on-disk tier shared by worker processes
+    # Delta sync (GET /api/sync) for offline clients
+    sync_page_size: int = 500  # change-log entries per page
+    sync_max_page_size: int = 2000
+    sync_settle_seconds: float = 0.0  # >0 on databases with concurrent writers (e.g. Postgres) so late commits are not skipped
+    sync_gzip_min_bytes: int = 1024
+    # In-process metrics exposed in Prometheus text format on GET /metrics
+    metrics_enabled: bool = True
+    # Opt-in sampling profiler (app/profiling.py); profiles are downloaded from /debug/profiles
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0  # fraction of requests profiled at random
+    profiling_token: str = ""  # X-Profile-Token value that profiles a request and unlocks /debug/profiles
+    profiling_interval_ms: float = 5.0
+    profiling_max_concurrent: int = 4  # profiled requests in flight at once; others run unprofiled
+    profiling_max_stacks_per_route: int = 5000
+    # Structured logging (JSON lines from a background writer thread)
+    log_level: str = "INFO"
+    log_format: str = "json"  # or "text"
+    log_levels: str = ""  # per-logger overrides, e.g. "app.ai_chatbot=DEBUG,httpx=WARNING"
+    log_sample_rates: str = ""  # fraction of sub-WARNING records kept per logger, e.g. "app.access=0.1"
+    log_queue_size: int = 10000  # records beyond this are dropped, never waited on
+    log_sql: bool = False  # SQL statements via the sqlalchemy.engine logger
 
     @property
     def cors_origins_list(self) -> List[str]:
@@ -1,6 +1,9 @@
 """Rule-based crop planning engine. Generates plans from field inputs."""
-from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Any, Tuple
+
+from .metrics import timed
 
 # Crop database: duration (days), base cost per acre, yield range, fertilizer types
 CROP_DB = {
@@ -16,6 +19,11 @@ CROP_DB = {
     "rice": {"duration": 120, "base_cost": 25000, "yield_low": "25", "yield_high": "35", "unit": "quintals"},
     "bajra": {"duration": 80, "base_cost": 10000, "yield_low": "12", "yield_high": "18", "unit": "quintals"},
     "jowar": {"duration": 100, "base_cost": 12000, "yield_low": "15", "yield_high": "25", "unit": "quintals"},
+    # Catalogue crops of the recommendation engine, so they do not fall back to paddy.
+    "millet": {"duration": 90, "base_cost": 12000, "yield_low": "12", "yield_high": "18", "unit": "quintals"},
+    "pulses": {"duration": 80, "base_cost": 14000, "yield_low": "8", "yield_high": "12", "unit": "quintals"},
+    "vegetables": {"duration": 90, "base_cost": 30000, "yield_low": "60", "yield_high": "90", "unit": "quintals"},
+    "barley": {"duration": 120, "base_cost": 15000, "yield_low": "25", "yield_high": "35", "unit": "quintals"},
 }
 
 
@@ -30,16 +38,79 @@ SOIL_FERTILIZER = {
 }
 
 
+# Local and alternate names (normalized) mapped to CROP_DB keys.
+CROP_ALIASES = {
+    "dhan": "paddy",
+    "chawal": "rice",
+    "gehun": "wheat",
+    "kapas": "cotton",
+    "ganna": "sugarcane",
+    "makka": "maize",
+    "corn": "maize",
+    "chana": "chickpea",
+    "sarson": "mustard",
+    "peanut": "groundnut",
+    "moongphali": "groundnut",
+    "soya": "soybean",
+    "pearlmillet": "bajra",
+    "sorghum": "jowar",
+}
+_CROP_INDEX = {**{k: k for k in CROP_DB}, **CROP_ALIASES}
+
+# The rule plan lists the first two weeks; later days come from the AI plan.
+PLAN_PREVIEW_DAYS = 14
+_PHASES = (
+    (1, 7, "Seed preparation", "Select seeds, treat them, and prepare for sowing."),
+    (8, 14, "Land preparation", "Plough, add manure, and level the field."),
+    (15, 30, "Sowing", "Sow at the right time. Maintain proper seed depth and spacing."),
+    (31, 60, "Weeding", "Remove weeds and apply first irrigation."),
+    (61, 90, "Irrigation and fertilizer", "Regular irrigation and top dressing."),
+    (91, None, "Crop care", "Pest and disease control. Monitor until harvest."),  # None = crop duration
+)
+
+
+def _build_skeleton(duration: int) -> Tuple[Tuple[int, str, str, str], ...]:
+    """(day, title, description, icon) rows for the preview days of a crop of this duration."""
+    rows = []
+    for d in range(1, min(duration + 1, 31)):
+        title, desc = "Crop care", "Regular monitoring and necessary care."
+        for start, end, phase_title, phase_desc in _PHASES:
+            if start <= d <= (end or duration):
+                title, desc = phase_title, phase_desc
+                break
+        rows.append((d, title, desc, "sprout" if d <= 14 else "water" if d <= 60 else "shield-check"))
+        if len(rows) >= PLAN_PREVIEW_DAYS:
+            break
+    return tuple(rows)
+
+
+# Built once at import; generate_plan only rebases dates and does the cost arithmetic.
+_SKELETONS = {key: _build_skeleton(data["duration"]) for key, data in CROP_DB.items()}
+
+
 def _normalize_crop(crop_name: str) -> str:
     return crop_name.strip().lower().replace(" ", "")
 
 
-def _get_crop_data(crop_name: str) -> Dict:
-    key = _normalize_crop(crop_name)
-    for k, v in CROP_DB.items():
+@lru_cache(maxsize=1024)
+def _resolve_crop(key: str) -> str:
+    """CROP_DB key for a normalized crop name: exact/alias match, else the legacy substring match."""
+    exact = _CROP_INDEX.get(key)
+    if exact:
+        return exact
+    for k in CROP_DB:
         if k in key or key in k:
-            return v
-    return CROP_DB["paddy"]
+            return k
+    return "paddy"
+
+
+def _get_crop_data(crop_name: str) -> Dict:
+    return CROP_DB[_resolve_crop(_normalize_crop(crop_name))]
+
+
+@lru_cache(maxsize=8)
+def _plan_dates(start_date: date, days: int) -> Tuple[str, ...]:
+    return tuple((start_date + timedelta(days=i)).strftime("%d/%m/%Y") for i in range(days))
 
 
 def _irrigation_guidance(water: str, crop: str) -> str:
@@ -50,14 +121,19 @@ def _irrigation_guidance(water: str, crop: str) -> str:
     return mapping.get(water, medium)
 
 
+_COST_MULTIPLIERS = {"low": 0.8, "medium": 1.0, "high": 1.25}
+_PROFIT_MULTIPLIERS = {"low": 0.9, "medium": 1.0, "high": 1.15}
+
+
 def _cost_multiplier(investment: str) -> float:
-    return {"low": 0.8, "medium": 1.0, "high": 1.25}[investment]
+    return _COST_MULTIPLIERS[investment]
 
 
 def _profit_multiplier(investment: str) -> float:
-    return {"low": 0.9, "medium": 1.0, "high": 1.15}[investment]
+    return _PROFIT_MULTIPLIERS[investment]
 
 
+@timed("rule_plan")
 def generate_plan(
     land_area_acres: float,
     soil_type: str,
@@ -66,7 +142,9 @@ def generate_plan(
     investment_level: str,
 ) -> Dict[str, Any]:
     """Generate a full crop plan based on input parameters."""
-    crop_data = _get_crop_data(crop_name)
+    normalized = _normalize_crop(crop_name)
+    crop_key = _resolve_crop(normalized)
+    crop_data = CROP_DB[crop_key]
     duration = crop_data["duration"]
     base_cost = crop_data["base_cost"] * land_area_acres
     cost_mult = _cost_multiplier(investment_level)
@@ -77,43 +155,19 @@ def generate_plan(
     unit = crop_data["unit"]
     expected_yield = f"{yield_low}-{yield_high} {unit} per acre"
     avg_yield_val = (float(yield_low) + float(yield_high)) / 2 * land_area_acres
-    price_per_q = 2000 if "paddy" in _normalize_crop(crop_name) or "rice" in _normalize_crop(crop_name) else 2500
+    price_per_q = 2000 if "paddy" in normalized or "rice" in normalized else 2500
     revenue = avg_yield_val * price_per_q
     profit = round((revenue - total_cost) * profit_mult)
 
     fertilizers = SOIL_FERTILIZER.get(soil_type.lower(), SOIL_FERTILIZER["alluvial"])
     irrigation = _irrigation_guidance(water_availability, crop_name)
 
-    start_date = datetime.now().date()
-    day_plan = []
-    phases = [
-        (1, 7, "Seed preparation", "Select seeds, treat them, and prepare for sowing."),
-        (8, 14, "Land preparation", "Plough, add manure, and level the field."),
-        (15, 30, "Sowing", "Sow at the right time. Maintain proper seed depth and spacing."),
-        (31, 60, "Weeding", "Remove weeds and apply first irrigation."),
-        (61, 90, "Irrigation and fertilizer", "Regular irrigation and top dressing."),
-        (91, duration, "Crop care", "Pest and disease control. Monitor until harvest."),
+    skeleton = _SKELETONS[crop_key]
+    dates = _plan_dates(datetime.now().date(), len(skeleton))
+    day_plan = [
+        {"day": d, "date": dates[d - 1], "title": title, "description": desc, "icon": icon}
+        for d, title, desc, icon in skeleton
     ]
-    day_idx = 0
-    for d in range(1, min(duration + 1, 31)):
-        dt = start_date + timedelta(days=d - 1)
-        phase_title = "Crop care"
-        phase_desc = "Regular monitoring and necessary care."
-        for start, end, title, desc in phases:
-            if start <= d <= end:
-                phase_title = title
-                phase_desc = desc
-                break
-        day_plan.append({
-            "day": d,
-            "date": dt.strftime("%d/%m/%Y"),
-            "title": phase_title,
-            "description": phase_desc,
-            "icon": "sprout" if d <= 14 else "water" if d <= 60 else "shield-check",
-        })
-        day_idx += 1
-        if day_idx >= 14:
-            break
 
     return {
         "crop_name": crop_name,
@@ -1,20 +1,38 @@
 """Database connection and session handling."""
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.pool import StaticPool
 from .config import settings
 
 connect_args = {}
 if settings.database_url.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+    connect_args = {"check_same_thread": False, "timeout": 15}
+    if settings.database_url in ("sqlite://", "sqlite:///:memory:"):
+        # An in-memory database only exists on its one connection.
+        engine = create_engine(settings.database_url, connect_args=connect_args, poolclass=StaticPool)
+    else:
+        # One connection per session: a single shared connection lets concurrent
+        # requests commit or roll back each other's transactions.
+        engine = create_engine(
+            settings.database_url,
+            connect_args=connect_args,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+        )
+
+        @event.listens_for(engine, "connect")
+        def _sqlite_pragmas(dbapi_connection, connection_record):
+            # WAL lets readers proceed while a writer holds the lock.
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+else:
     engine = create_engine(
         settings.database_url,
-        connect_args=connect_args,
-        poolclass=StaticPool,
-        echo=settings.env == "development",
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
     )
-else:
-    engine = create_engine(settings.database_url)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -32,3 +50,22 @@ def init_db():
     """Create all tables."""
     from . import models
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+
+
+def _add_missing_columns():
+    """
+    create_all() does not alter existing tables, so nullable columns added to
+    the models later are added here to keep older databases working.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"))
@@ -0,0 +1,68 @@
+"""Fast JSON responses for large payloads (plans, field lists, histories)."""
+from __future__ import annotations
+
+import gzip
+import json
+from typing import Any, Dict, Optional, Type
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+from .config import settings
+
+try:  # optional: orjson renders plain dict/list responses several times faster than json.dumps
+    import orjson
+except ImportError:
+    orjson = None
+
+_adapters: Dict[Any, TypeAdapter] = {}
+
+
+def default_response_class() -> Type[Response]:
+    """App-wide response class: ORJSONResponse when enabled and installed."""
+    if settings.fast_json_responses and orjson is not None:
+        from fastapi.responses import ORJSONResponse
+
+        return ORJSONResponse
+    return JSONResponse
+
+
+def json_response(value: Any, annotation: Optional[Any] = None) -> Any:
+    """
+    Serialize an endpoint's already-built response model(s) straight to JSON bytes.
+
+    FastAPI would otherwise dump the models to Python objects, run them through
+    the response field again and json-encode the result. Pass `annotation` for
+    non-model values, e.g. list[FieldResponse]. With fast responses disabled the
+    value is returned unchanged for the regular path.
+    """
+    if not settings.fast_json_responses:
+        return value
+    if isinstance(value, BaseModel):
+        body = value.model_dump_json()
+    else:
+        adapter = _adapters.get(annotation)
+        if adapter is None:
+            adapter = _adapters[annotation] = TypeAdapter(annotation)
+        body = adapter.dump_json(value)
+    return Response(content=body, media_type="application/json")
+
+
+def raw_json_response(raw: str | bytes) -> Response:
+    """Pass stored JSON text through without decoding it."""
+    return Response(content=raw, media_type="application/json")
+
+
+def loads(raw: str | bytes) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def compressed_json_response(body: bytes, accept_encoding: str, min_size: int = 1024) -> Response:
+    """Gzip a JSON body when the client accepts it and the body is worth compressing."""
+    if len(body) < min_size or "gzip" not in (accept_encoding or "").lower():
+        return Response(content=body, media_type="application/json", headers={"Vary": "Accept-Encoding"})
+    return Response(
+        content=gzip.compress(body, compresslevel=6),
+        media_type="application/json",
+        headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+    )
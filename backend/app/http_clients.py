@@ -0,0 +1,153 @@
+"""Shared outbound HTTP clients with pooled keep-alive connections."""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .config import settings
+from .metrics import outbound_hooks
+
+try:  # HTTP/2 needs the optional `h2` package (httpx[http2])
+    import h2  # noqa: F401
+
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+# Logical upstreams; each gets its own pool so one slow host cannot starve another.
+HUGGINGFACE = "huggingface"
+OPENAI_COMPATIBLE = "openai_compatible"
+OPENWEATHER = "openweather"
+
+
+class _ConnectionStats:
+    """Counts requests, new TCP connections and TLS handshakes via httpcore trace events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+
+    def trace(self, event: str, info: Dict[str, Any]) -> None:
+        if event == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections += 1
+        elif event == "connection.start_tls.complete":
+            with self._lock:
+                self.tls_handshakes += 1
+
+    async def trace_async(self, event: str, info: Dict[str, Any]) -> None:
+        self.trace(event, info)
+
+    def on_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self.trace
+
+    async def on_request_async(self, request: httpx.Request) -> None:
+        # httpcore's async transport awaits the trace callback.
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self.trace_async
+
+    def snapshot(self) -> Dict[str, Any]:
+        reused = max(0, self.requests - self.connections)
+        return {
+            "requests": self.requests,
+            "new_connections": self.connections,
+            "tls_handshakes": self.tls_handshakes,
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / self.requests, 4) if self.requests else 0.0,
+        }
+
+
+class HTTPClientRegistry:
+    """
+    Lazily creates one AsyncClient and one Client per upstream and reuses them
+    for every call. `aclose()` is called from the app lifespan on shutdown.
+    """
+
+    def __init__(self):
+        self._async: Dict[str, httpx.AsyncClient] = {}
+        self._sync: Dict[str, httpx.Client] = {}
+        self._stats: Dict[str, _ConnectionStats] = {}
+        self._lock = threading.Lock()
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.http_max_connections_per_host,
+            max_keepalive_connections=settings.http_max_keepalive_per_host,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        )
+
+    def _timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(settings.http_default_timeout_seconds, connect=settings.http_connect_timeout_seconds)
+
+    def stats(self, name: str) -> _ConnectionStats:
+        with self._lock:
+            return self._stats.setdefault(name, _ConnectionStats())
+
+    def async_client(self, name: str) -> httpx.AsyncClient:
+        client = self._async.get(name)
+        if client is None or client.is_closed:
+            stats = self.stats(name)
+            on_request, on_response = outbound_hooks(name)
+
+            async def request_hook(request: httpx.Request) -> None:
+                on_request(request)
+
+            async def response_hook(response: httpx.Response) -> None:
+                on_response(response)
+
+            client = httpx.AsyncClient(
+                http2=settings.http2_enabled and _HTTP2_AVAILABLE,
+                limits=self._limits(),
+                timeout=self._timeout(),
+                event_hooks={"request": [stats.on_request_async, request_hook], "response": [response_hook]},
+            )
+            self._async[name] = client
+        return client
+
+    def sync_client(self, name: str) -> httpx.Client:
+        with self._lock:
+            client = self._sync.get(name)
+            if client is None or client.is_closed:
+                stats = self._stats.setdefault(name, _ConnectionStats())
+                on_request, on_response = outbound_hooks(name)
+                client = httpx.Client(
+                    http2=settings.http2_enabled and _HTTP2_AVAILABLE,
+                    limits=self._limits(),
+                    timeout=self._timeout(),
+                    event_hooks={"request": [stats.on_request, on_request], "response": [on_response]},
+                )
+                self._sync[name] = client
+            return client
+
+    async def aclose(self) -> None:
+        for client in list(self._async.values()):
+            await client.aclose()
+        with self._lock:
+            sync_clients = list(self._sync.values())
+            self._sync.clear()
+        for client in sync_clients:
+            client.close()
+        self._async.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            items = list(self._stats.items())
+        return {
+            "http2": settings.http2_enabled and _HTTP2_AVAILABLE,
+            "upstreams": {name: stats.snapshot() for name, stats in items},
+        }
+
+
+http_clients = HTTPClientRegistry()
+
+
+def timeout(seconds: Optional[float]) -> httpx.Timeout:
+    """Per-call timeout that keeps the shared connect timeout."""
+    return httpx.Timeout(seconds, connect=settings.http_connect_timeout_seconds)
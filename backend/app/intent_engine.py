@@ -0,0 +1,103 @@
+"""Aho-Corasick keyword automaton mapping messages to prioritized intents."""
+from __future__ import annotations
+
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Keywords this short must match a whole word ("hi" must not fire on "which").
+SHORT_KEYWORD_LEN = 3
+
+
+@dataclass(frozen=True)
+class Intent:
+    intent_id: str
+    keywords: Tuple[str, ...]
+    priority: int
+    response: Optional[str] = None
+
+
+def _is_word_char(ch: str) -> bool:
+    # Combining marks count as word characters so Devanagari/Telugu matras do not split words.
+    return ch.isalnum() or ch == "_" or unicodedata.category(ch).startswith("M")
+
+
+class IntentEngine:
+    """
+    All intent keywords compiled into one automaton, so a message is scanned
+    once regardless of how many intents exist. Keywords match at the start of
+    a word; short keywords must match the whole word.
+    """
+
+    def __init__(self, intents: Sequence[Intent]):
+        self.intents = list(intents)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # state -> [(keyword length, whole_word, intent index)]
+        self._out: List[List[Tuple[int, bool, int]]] = [[]]
+        for idx, intent in enumerate(self.intents):
+            for keyword in intent.keywords:
+                self._add(keyword.lower(), idx)
+        self._build_failure_links()
+        self._by_id = {intent.intent_id: intent for intent in self.intents}
+
+    def by_id(self, intent_id: str) -> Optional[Intent]:
+        return self._by_id.get(intent_id)
+
+    def _add(self, keyword: str, intent_idx: int) -> None:
+        if not keyword:
+            return
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        whole_word = len(keyword) <= SHORT_KEYWORD_LEN and _is_word_char(keyword[-1])
+        self._out[state].append((len(keyword), whole_word, intent_idx))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _scan(self, text: str) -> Iterable[int]:
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        last = len(text) - 1
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, whole_word, intent_idx in out[state]:
+                start = pos - length + 1
+                if start > 0 and _is_word_char(text[start]) and _is_word_char(text[start - 1]):
+                    continue
+                if whole_word and pos < last and _is_word_char(text[pos + 1]):
+                    continue
+                yield intent_idx
+
+    def match(self, text: str) -> List[Tuple[str, int]]:
+        """Matched (intent_id, priority) pairs, highest priority (lowest number) first."""
+        found = {idx for idx in self._scan((text or "").lower())}
+        hits = sorted((self.intents[i].priority, self.intents[i].intent_id) for i in found)
+        return [(intent_id, priority) for priority, intent_id in hits]
+
+    def best(self, text: str) -> Optional[Intent]:
+        found = set(self._scan((text or "").lower()))
+        if not found:
+            return None
+        return min((self.intents[i] for i in found), key=lambda intent: intent.priority)
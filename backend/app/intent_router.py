@@ -0,0 +1,182 @@
+"""Local intent-first routing for chat: answer what the rules can, send the rest to the LLM."""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .chatbot_rules import match_intents
+from .llm_hedging import ModelLatencyTracker
+from .response_cache import embed, normalize_question
+
+OPEN_QUESTION = "open_question"
+# How far the local intent must beat the open-question class to skip the LLM.
+MIN_MARGIN = 0.15
+
+# Intents whose rule answer is complete on its own; the recommendation intents
+# only qualify when the farmer has stored recommendations to quote from.
+GREETING_INTENTS = {"greeting", "thanks"}
+RECOMMENDATION_INTENTS = {"best_crop", "high_profit", "less_water"}
+
+# Seed phrases for the nearest-exemplar classifier. The open_question class
+# pulls in messages that merely mention a keyword but ask for real advice.
+EXEMPLARS: Dict[str, List[str]] = {
+    "greeting": [
+        "hello", "hi", "hi there", "hello agriai", "namaste", "namaste ji", "good morning", "hey hello",
+    ],
+    "thanks": [
+        "thanks", "thank you", "thank you so much", "thanks a lot", "ok thanks", "thanks for the help",
+    ],
+    "best_crop": [
+        "best crop", "which crop is best", "which crop is best for me", "what is the best crop for my field",
+        "best crop to grow", "which crop should i grow", "suggest best crop",
+    ],
+    "high_profit": [
+        "high profit", "which crop gives high profit", "most profitable crop", "high profit crop",
+        "which crop gives more profit", "which crop earns most money",
+    ],
+    "less_water": [
+        "less water", "which crop needs less water", "crop with less water", "low water crop",
+        "crop for less water availability", "which crop uses less water",
+    ],
+    OPEN_QUESTION: [
+        "how do i control aphids on my cotton", "hi my tomato leaves are turning yellow what should i do",
+        "when should i apply urea to paddy", "why are my wheat plants wilting after irrigation",
+        "what spray should i use for leaf curl in chilli", "how much fertilizer per acre for maize",
+        "thanks but how do i treat stem borer", "my field has white insects under the leaves",
+        "soil is cracking and plants look weak what is the reason", "how to prepare land before sowing groundnut",
+        "is it safe to irrigate after spraying pesticide", "which fertilizer is best for flowering stage",
+    ],
+}
+
+
+# Words that make a message a question; a greeting or thanks carrying one is not small talk.
+_QUESTION_WORDS = frozenset(
+    "what which when where why who whom whose how should shall can could do does did is are will would".split()
+)
+# Filler allowed around any locally answered phrase ("ok thanks", "hi sir, best crop please").
+_FILLER = frozenset("ok okay so and very dear sir madam ji please".split())
+
+
+def _vocabulary(*labels: str) -> frozenset:
+    return frozenset(w for label in labels for text in EXEMPLARS[label] for w in normalize_question(text).split())
+
+
+_GREETING_VOCAB = _vocabulary(*GREETING_INTENTS) | _FILLER
+_INTENT_VOCAB = {intent_id: _vocabulary(intent_id) | _GREETING_VOCAB for intent_id in RECOMMENDATION_INTENTS}
+
+
+def _self_contained(intent_id: str, tokens: List[str], has_question_mark: bool, matched: set) -> bool:
+    """
+    Whether the raw message is only this intent's phrase (plus greetings and
+    filler). Decided on raw tokens: the embedding drops stopwords such as
+    what/how/should/i, which is exactly what marks "thanks, what should i do".
+    """
+    if intent_id in GREETING_INTENTS:
+        return (
+            not has_question_mark
+            and not matched - GREETING_INTENTS
+            and not any(t in _QUESTION_WORDS for t in tokens)
+            and all(t in _GREETING_VOCAB for t in tokens)
+        )
+    return all(t in _INTENT_VOCAB[intent_id] for t in tokens)
+
+
+@dataclass
+class RouteDecision:
+    route: str  # "local" or "llm"
+    intent_id: Optional[str]
+    confidence: float
+
+
+class IntentClassifier:
+    """
+    Nearest-exemplar classifier over the hashed features used by the response
+    cache; a class scores the best cosine similarity among its seed phrases.
+    """
+
+    def __init__(self, exemplars: Dict[str, List[str]]):
+        self.labels = list(exemplars)
+        rows, owners = [], []
+        for label_idx, label in enumerate(self.labels):
+            for text in exemplars[label]:
+                rows.append(embed(normalize_question(text)))
+                owners.append(label_idx)
+        self._vectors = np.vstack(rows).astype(np.float32)
+        self._owners = np.asarray(owners)
+
+    def scores(self, text: str) -> Dict[str, float]:
+        sims = self._vectors @ embed(normalize_question(text))
+        best = np.full(len(self.labels), -1.0, dtype=np.float32)
+        np.maximum.at(best, self._owners, sims)
+        return {label: float(score) for label, score in zip(self.labels, best)}
+
+
+_classifier = IntentClassifier(EXEMPLARS)
+
+
+def route_message(
+    user_message: str,
+    recommendations: Optional[List[Dict[str, Any]]],
+    min_confidence: float,
+) -> RouteDecision:
+    """
+    Answer locally only when a rule matches an answerable intent, the message
+    holds nothing beyond that intent's phrase, and the classifier agrees with
+    it over the open-question class; anything else, including attachments and
+    greetings or thanks followed by a question, goes to the LLM.
+    """
+    lowered = (user_message or "").lower()
+    if not lowered.strip() or "[image attached:" in lowered or "[video attached:" in lowered:
+        return RouteDecision("llm", None, 0.0)
+    answerable = set(GREETING_INTENTS)
+    if recommendations:
+        answerable |= RECOMMENDATION_INTENTS
+    matched = {intent_id for intent_id, _ in match_intents(user_message)}
+    tokens = normalize_question(user_message).split()
+    has_question_mark = "?" in lowered
+    candidates = [
+        intent_id for intent_id in matched
+        if intent_id in answerable and _self_contained(intent_id, tokens, has_question_mark, matched)
+    ]
+    if not candidates:
+        return RouteDecision("llm", None, 0.0)
+    scores = _classifier.scores(user_message)
+    intent_id = max(candidates, key=lambda c: scores[c])
+    confidence = scores[intent_id]
+    if confidence >= min_confidence and confidence - scores[OPEN_QUESTION] >= MIN_MARGIN:
+        return RouteDecision("local", intent_id, confidence)
+    return RouteDecision("llm", intent_id, confidence)
+
+
+class RouteStats:
+    """Per-route request counts and latency percentiles for get_ai_response."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+        self.latency = ModelLatencyTracker(window=500)
+
+    def record(self, route: str, seconds: float) -> None:
+        with self._lock:
+            self.counts[route] = self.counts.get(route, 0) + 1
+            self.latency.record(route, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self.counts)
+            latency = self.latency.snapshot()
+        total = sum(counts.values())
+        return {
+            "total": total,
+            "local_hit_rate": round(counts.get("local", 0) / total, 4) if total else 0.0,
+            "routes": {
+                route: {"count": count, "share": round(count / total, 4), **latency.get(route, {})}
+                for route, count in counts.items()
+            },
+        }
+
+
+route_stats = RouteStats()
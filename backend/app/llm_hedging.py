@@ -0,0 +1,170 @@
+"""Hedged (raced) requests across LLM model candidates with adaptive ordering."""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from .metrics import LLM_CALL_LATENCY
+from .provider_health import ProviderHealthRegistry
+
+LATENCY_WINDOW = 50
+
+
+class ModelLatencyTracker:
+    """Rolling per-model latency samples used to put the fastest healthy model first."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, model_id: str, seconds: float) -> None:
+        self._samples.setdefault(model_id, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, model_id: str, pct: float) -> Optional[float]:
+        samples = self._samples.get(model_id)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def order(self, candidates: Sequence[str]) -> List[str]:
+        """Sort by p50; unmeasured models rank with the best measured one so they get tried."""
+        p50 = {m: self.percentile(m, 50) for m in candidates}
+        known = [v for v in p50.values() if v is not None]
+        floor = min(known) if known else 0.0
+        return sorted(candidates, key=lambda m: p50[m] if p50[m] is not None else floor)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            model_id: {
+                "samples": len(samples),
+                "p50_ms": round(self.percentile(model_id, 50) * 1000, 1),
+                "p95_ms": round(self.percentile(model_id, 95) * 1000, 1),
+            }
+            for model_id, samples in self._samples.items()
+            if samples
+        }
+
+
+class AllCandidatesFailed(Exception):
+    def __init__(self, errors: List[str]):
+        super().__init__(" | ".join(errors))
+        self.errors = errors
+
+
+async def hedged_call(
+    candidates: Sequence[str],
+    call: Callable[[str], Awaitable[Any]],
+    hedge_delay: Optional[float],
+    tracker: Optional[ModelLatencyTracker] = None,
+    failure_latency: float = 30.0,
+    health: Optional[ProviderHealthRegistry] = None,
+    endpoint: str = "",
+    admit: Optional[Callable[[bool], Awaitable[bool]]] = None,
+) -> Tuple[str, Any]:
+    """
+    Race model candidates and return (model_id, result) from the first success.
+
+    The next candidate starts after `hedge_delay` seconds without a result, or as
+    soon as a running attempt fails; `hedge_delay=None` gives plain sequential
+    failover and `0` starts every candidate at once. `call` must raise on an
+    unusable response. Losers are cancelled. With a `health` registry, models
+    whose circuit breaker for `endpoint` is open are skipped without a call.
+
+    `admit(wait)` is awaited before every attempt after the first (the caller's
+    own admission covers the first), so each upstream request is rate limited.
+    A hedge alongside running attempts passes wait=False and is skipped for now
+    when admit returns False; an attempt with nothing else running waits.
+    """
+    ordered = tracker.order(candidates) if tracker else list(candidates)
+    pending: Dict[asyncio.Task, Tuple[str, float, Optional[object]]] = {}
+    errors: List[str] = []
+    next_idx = 0
+    launched = 0
+
+    async def launch() -> bool:
+        nonlocal next_idx, launched
+        while next_idx < len(ordered):
+            model_id = ordered[next_idx]
+            permit = health.allow(endpoint, model_id) if health else None
+            if health and permit is None:
+                next_idx += 1
+                errors.append(f"{model_id}: circuit open")
+                continue
+            if admit and launched:
+                try:
+                    admitted = await admit(not pending)
+                except BaseException:
+                    if health:
+                        health.release(endpoint, model_id, permit)
+                    raise
+                if not admitted:
+                    if health:
+                        health.release(endpoint, model_id, permit)
+                    return False
+            next_idx += 1
+            launched += 1
+            pending[asyncio.ensure_future(call(model_id))] = (model_id, time.perf_counter(), permit)
+            return True
+        return False
+
+    try:
+        await launch()
+        while pending:
+            if hedge_delay == 0:
+                while next_idx < len(ordered) and await launch():
+                    pass
+            timeout = hedge_delay if hedge_delay and next_idx < len(ordered) else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                await launch()  # hedge: primary is slow, start the next candidate alongside it
+                continue
+            # Settle every finished task, not only the first: a candidate that failed
+            # in the same wakeup as the winner still reports its failure to health.
+            winner: Optional[Tuple[str, Any]] = None
+            failed = False
+            for task in done:
+                model_id, started, _ = pending.pop(task)
+                elapsed = time.perf_counter() - started
+                exc = task.exception()
+                if exc is None:
+                    LLM_CALL_LATENCY.observe(elapsed, model_id, "success")
+                    if tracker:
+                        tracker.record(model_id, elapsed)
+                    if health:
+                        health.record_success(endpoint, model_id)
+                    if winner is None:
+                        winner = (model_id, task.result())
+                    continue
+                LLM_CALL_LATENCY.observe(elapsed, model_id, "failure")
+                if tracker:
+                    tracker.record(model_id, max(elapsed, failure_latency))
+                if health:
+                    health.record_failure(endpoint, model_id, str(exc))
+                errors.append(f"{model_id}: {exc}")
+                failed = True
+            if winner is not None:
+                return winner
+            if failed and next_idx < len(ordered):
+                await launch()
+    finally:
+        now = time.perf_counter()
+        for task, (model_id, started, permit) in pending.items():
+            task.cancel()
+            LLM_CALL_LATENCY.observe(now - started, model_id, "cancelled")
+            if tracker:
+                # A cancelled loser took at least this long. Below its p50 that bound says
+                # nothing and would drag the median down, so only longer stalls (or a first
+                # sample for an unmeasured model) are recorded.
+                p50 = tracker.percentile(model_id, 50)
+                if p50 is None or now - started > p50:
+                    tracker.record(model_id, now - started)
+            if health:
+                health.release(endpoint, model_id, permit)
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    raise AllCandidatesFailed(errors)
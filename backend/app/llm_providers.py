@@ -0,0 +1,302 @@
+"""
+Pluggable LLM providers behind the chatbot and the AI crop planner.
+
+- "huggingface": the HF router's OpenAI-compatible chat completions; the
+  chat/plan modules race their model candidates through hedged_call.
+- "openai": any OpenAI-compatible server (llama.cpp, vLLM, Ollama, or the
+  bundled app.local_llm_server) at llm_base_url.
+- "template": a deterministic in-process generator built on the rule
+  engines. No network, no token; for offline runs and as a fast degraded
+  mode (llm_fallback_provider=template).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from .chatbot_rules import get_response as rule_response
+from .config import settings
+from .crop_rules import CROP_DB, generate_plan
+from .http_clients import HUGGINGFACE, OPENAI_COMPATIBLE, http_clients, timeout
+
+Messages = List[Dict[str, str]]
+
+
+class LLMProvider:
+    name = "base"
+    # Remote providers go through llm_scheduler (rate/concurrency) and the
+    # per-endpoint circuit breakers; local ones are called directly.
+    remote = True
+
+    @property
+    def endpoint(self) -> str:
+        return self.name
+
+    def available(self) -> bool:
+        return True
+
+    def models(self, task: str, defaults: Sequence[str]) -> List[str]:
+        """Model candidates for "chat" or "plan"; `defaults` are the caller's built-in list."""
+        return list(defaults)
+
+    async def complete(
+        self,
+        messages: Messages,
+        *,
+        model: str,
+        max_tokens: int,
+        temperature: float = 0.7,
+        top_p: float = 0.95,
+        response_format: Optional[Dict[str, str]] = None,
+        timeout_seconds: float = 30.0,
+    ) -> str:
+        """Return the assistant message text; raise on an unusable response."""
+        raise NotImplementedError
+
+    async def stream(self, messages: Messages, *, model: str, max_tokens: int, **options: Any) -> AsyncIterator[str]:
+        """Yield content deltas. Providers without native streaming yield the whole reply once."""
+        yield await self.complete(messages, model=model, max_tokens=max_tokens, **options)
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        api_key: str,
+        upstream: str,
+        chat_models: Sequence[str] = (),
+        plan_models: Sequence[str] = (),
+        requires_key: bool = True,
+    ):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.api_key = (api_key or "").strip()
+        self.upstream = upstream
+        self._models = {"chat": list(chat_models), "plan": list(plan_models)}
+        self.requires_key = requires_key
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.base_url}/chat/completions"
+
+    def available(self) -> bool:
+        return bool(self.api_key) or not self.requires_key
+
+    def models(self, task: str, defaults: Sequence[str]) -> List[str]:
+        return self._models.get(task) or list(defaults)
+
+    def _request(self, messages: Messages, model: str, max_tokens: int, temperature: float, top_p: float,
+                 response_format: Optional[Dict[str, str]], stream: bool) -> Dict[str, Any]:
+        body: Dict[str, Any] = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+        }
+        if response_format:
+            body["response_format"] = response_format
+        if stream:
+            body["stream"] = True
+        return body
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    async def complete(
+        self,
+        messages: Messages,
+        *,
+        model: str,
+        max_tokens: int,
+        temperature: float = 0.7,
+        top_p: float = 0.95,
+        response_format: Optional[Dict[str, str]] = None,
+        timeout_seconds: float = 30.0,
+    ) -> str:
+        response = await http_clients.async_client(self.upstream).post(
+            self.endpoint,
+            timeout=timeout(timeout_seconds),
+            headers=self._headers(),
+            json=self._request(messages, model, max_tokens, temperature, top_p, response_format, stream=False),
+        )
+        if response.status_code != 200:
+            raise ValueError(f"{response.status_code}: {response.text[:200]}")
+        payload = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
+        content = (
+            ((payload.get("choices") or [{}])[0].get("message") or {}).get("content", "")
+            if isinstance(payload, dict)
+            else ""
+        ).strip()
+        if not content:
+            raise ValueError("empty content")
+        return content
+
+    async def stream(self, messages: Messages, *, model: str, max_tokens: int, **options: Any) -> AsyncIterator[str]:
+        body = self._request(
+            messages, model, max_tokens, options.get("temperature", 0.7), options.get("top_p", 0.95),
+            options.get("response_format"), stream=True,
+        )
+        client = http_clients.async_client(self.upstream)
+        async with client.stream(
+            "POST", self.endpoint, json=body, headers=self._headers(),
+            timeout=timeout(options.get("timeout_seconds", 30.0)),
+        ) as response:
+            if response.status_code != 200:
+                raise ValueError(f"{response.status_code}: {(await response.aread())[:200]!r}")
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                delta = ((json.loads(data).get("choices") or [{}])[0].get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+
+
+# ---- template generator ----------------------------------------------------------
+
+_PROFILE_FIELDS = {
+    "crop": re.compile(r"^- Crop:\s*(.+)$", re.MULTILINE),
+    "area": re.compile(r"^- Land area \(acres\):\s*([\d.]+)", re.MULTILINE),
+    "soil": re.compile(r"^- Soil type:\s*(.+)$", re.MULTILINE),
+    "water": re.compile(r"^- Water availability:\s*(\w+)", re.MULTILINE),
+    "investment": re.compile(r"^- Investment level:\s*(\w+)", re.MULTILINE),
+}
+_CURRENT_CROP = re.compile(r"Current crop:\s*([^\n]+)")
+_KNOWN_CROPS = sorted(CROP_DB, key=len, reverse=True)
+
+
+def _profile_value(name: str, text: str, default: str) -> str:
+    match = _PROFILE_FIELDS[name].search(text)
+    return match.group(1).strip() if match else default
+
+
+def _crop_in(text: str) -> str:
+    match = _CURRENT_CROP.search(text)
+    if match:
+        return match.group(1).strip()
+    lowered = text.lower()
+    return next((crop for crop in _KNOWN_CROPS if crop in lowered), "")
+
+
+def template_plan(prompt: str) -> Dict[str, Any]:
+    """The rule-based plan for the prompt's farm profile, in the AI plan schema (stage tasks grouped by month)."""
+    crop = _profile_value("crop", prompt, "Wheat")
+    rule_plan = generate_plan(
+        land_area_acres=float(_profile_value("area", prompt, "1")),
+        soil_type=_profile_value("soil", prompt, "alluvial"),
+        crop_name=crop,
+        water_availability=_profile_value("water", prompt, "medium"),
+        investment_level=_profile_value("investment", prompt, "medium"),
+    )
+    months: Dict[int, List[Dict[str, Any]]] = {}
+    for item in rule_plan["day_plan"]:
+        month, day = divmod(int(item["day"]) - 1, 30)
+        months.setdefault(month + 1, []).append({**item, "day": day + 1})
+    rule_plan["monthly_plans"] = [
+        {"month_number": number, "month_label": f"Month {number}", "focus": items[0]["title"], "day_plan": items}
+        for number, items in sorted(months.items())
+    ]
+    del rule_plan["day_plan"]
+    return rule_plan
+
+
+class TemplateProvider(LLMProvider):
+    """
+    Deterministic stand-in: the same messages always produce the same reply.
+    Plan prompts get the rule-based plan as JSON; chat gets the rule-based
+    answer for the last user turn; response_format json_object wraps chat
+    replies as {"answer": ...}.
+    """
+
+    name = "template"
+    remote = False
+
+    def models(self, task: str, defaults: Sequence[str]) -> List[str]:
+        return ["template"]
+
+    def generate(self, messages: Messages, response_format: Optional[Dict[str, str]] = None) -> str:
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        if "Output JSON schema" in prompt:
+            return json.dumps(template_plan(prompt))
+        last_user = next((str(m.get("content", "")) for m in reversed(messages) if m.get("role") == "user"), "")
+        answer = rule_response(last_user, _crop_in(prompt))
+        if response_format and response_format.get("type") == "json_object":
+            return json.dumps({"answer": answer})
+        return answer
+
+    async def complete(self, messages: Messages, *, model: str, max_tokens: int, **options: Any) -> str:
+        return self.generate(messages, options.get("response_format"))
+
+    async def stream(self, messages: Messages, *, model: str, max_tokens: int, **options: Any) -> AsyncIterator[str]:
+        for chunk in split_chunks(self.generate(messages, options.get("response_format"))):
+            yield chunk
+
+
+def split_chunks(text: str) -> List[str]:
+    """Word-sized deltas (keeping whitespace) so streamed output reassembles exactly."""
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+def reply_id(messages: Messages) -> str:
+    return "tmpl-" + hashlib.sha1(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+# ---- selection ----------------------------------------------------------------------
+
+def _build(name: str) -> Optional[LLMProvider]:
+    if name == "huggingface":
+        return OpenAICompatibleProvider(
+            "huggingface", f"{settings.hf_router_base_url}/v1", settings.hf_token, HUGGINGFACE
+        )
+    if name == "openai":
+        return OpenAICompatibleProvider(
+            "openai",
+            settings.llm_base_url,
+            settings.llm_api_key,
+            OPENAI_COMPATIBLE,
+            chat_models=[m.strip() for m in settings.llm_chat_models.split(",") if m.strip()],
+            plan_models=[m.strip() for m in settings.llm_plan_models.split(",") if m.strip()],
+            requires_key=False,
+        )
+    if name == "template":
+        return TemplateProvider()
+    return None
+
+
+_providers: Dict[str, Optional[LLMProvider]] = {}
+
+
+def get_provider(name: str) -> Optional[LLMProvider]:
+    if name not in _providers:
+        _providers[name] = _build(name)
+    return _providers[name]
+
+
+def primary_provider() -> LLMProvider:
+    provider = get_provider(settings.llm_provider)
+    if provider is None:
+        raise ValueError(f"Unknown LLM_PROVIDER {settings.llm_provider!r} (huggingface, openai or template)")
+    return provider
+
+
+def fallback_provider() -> Optional[LLMProvider]:
+    """Degraded-mode provider used when the primary is unconfigured or every candidate failed."""
+    name = settings.llm_fallback_provider
+    if not name or name == settings.llm_provider:
+        return None
+    return get_provider(name)
+
+
+def ai_plans_enabled() -> bool:
+    """Whether background AI plan jobs can run (the primary or the fallback provider is usable)."""
+    fallback = fallback_provider()
+    return primary_provider().available() or (fallback is not None and fallback.available())
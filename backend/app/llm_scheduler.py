@@ -0,0 +1,229 @@
+"""Shared admission control for upstream LLM calls: in-flight cap, rate limit, priority lanes."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+from .config import settings
+from .llm_hedging import ModelLatencyTracker
+
+# Lower value = served first.
+CHAT = 0
+PLAN = 1
+LANE_NAMES = {CHAT: "chat", PLAN: "plan"}
+
+# Seed for the per-lane service-time average before any call has completed.
+INITIAL_SERVICE_SECONDS = {CHAT: 3.0, PLAN: 20.0}
+SERVICE_EWMA_ALPHA = 0.2
+
+
+class LoadShed(Exception):
+    """Raised instead of queueing when the wait would exceed the caller's budget."""
+
+
+@dataclass(eq=False)
+class Ticket:
+    lane: int
+    granted_at: float
+
+
+class LLMScheduler:
+    """
+    Admits LLM calls when an in-flight slot and enough rate tokens are free.
+    Waiters are served strictly by lane, then FIFO, so interactive chat
+    overtakes queued plan generation. Callers that pass `max_wait` are shed
+    up front when the estimated wait exceeds it, or once they have waited
+    that long.
+    """
+
+    def __init__(
+        self,
+        max_inflight: int,
+        requests_per_minute: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_inflight = max(1, max_inflight)
+        self.rate = requests_per_minute / 60.0 if requests_per_minute > 0 else 0.0
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._refilled = clock()
+        self.inflight = 0
+        self._active: Set[Ticket] = set()
+        self._waiters: List[list] = []  # heap of [lane, seq, future, cost, needs_slot]
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._service = dict(INITIAL_SERVICE_SECONDS)
+        self.wait_times = ModelLatencyTracker(window=500)
+        self.granted = {lane: 0 for lane in LANE_NAMES}
+        self.shed = {lane: 0 for lane in LANE_NAMES}
+
+    def _refill(self) -> None:
+        now = self._clock()
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        else:
+            self._tokens = float(self.burst)
+        self._refilled = now
+
+    def _queued(self, up_to_lane: int) -> int:
+        return sum(1 for lane, _, fut, _, _ in self._waiters if lane <= up_to_lane and not fut.done())
+
+    def estimate_wait(self, lane: int, cost: int = 1) -> float:
+        """Rough seconds until a new `lane` call would be admitted."""
+        self._refill()
+        ahead = self._queued(lane)
+        needed = ahead + 1 - (self.max_inflight - self.inflight)
+        slot_wait = 0.0
+        if needed > 0:
+            # Slots free up as in-flight calls finish; each is expected to take its lane's average.
+            now = self._clock()
+            remaining = sorted(
+                max(0.0, self._service[t.lane] - (now - t.granted_at)) for t in self._active
+            ) or [0.0]
+            if needed <= len(remaining):
+                slot_wait = remaining[needed - 1]
+            else:
+                rounds = math.ceil((needed - len(remaining)) / self.max_inflight)
+                slot_wait = remaining[-1] + rounds * self._service[lane]
+        token_wait = 0.0
+        if self.rate:
+            token_wait = max(0.0, ahead + cost - self._tokens) / self.rate
+        return max(slot_wait, token_wait)
+
+    def _grant(self, lane: int, cost: int) -> Ticket:
+        self._tokens -= cost
+        self.inflight += 1
+        self.granted[lane] += 1
+        ticket = Ticket(lane=lane, granted_at=self._clock())
+        self._active.add(ticket)
+        return ticket
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        while self._waiters:
+            lane, _, fut, cost, needs_slot = self._waiters[0]
+            if fut.done():  # cancelled or timed out
+                heapq.heappop(self._waiters)
+                continue
+            if needs_slot and self.inflight >= self.max_inflight:
+                return
+            self._refill()
+            if self._tokens < cost:
+                delay = (cost - self._tokens) / self.rate
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            if needs_slot:
+                fut.set_result(self._grant(lane, cost))
+            else:
+                self._tokens -= cost
+                fut.set_result(None)
+
+    async def _wait_turn(self, lane: int, cost: int, max_wait: Optional[float], needs_slot: bool):
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [lane, next(self._seq), fut, cost, needs_slot])
+        if self._timer is None:
+            self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout=max_wait)
+        except asyncio.TimeoutError:
+            if not (fut.done() and not fut.cancelled()):
+                fut.cancel()
+                self.shed[lane] += 1
+                raise LoadShed(f"{LANE_NAMES[lane]} queue wait exceeded {max_wait:.1f}s")
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                if needs_slot:
+                    self._release_slot(fut.result())
+                else:
+                    self._tokens += cost
+            else:
+                fut.cancel()
+            raise
+        return fut.result()
+
+    async def acquire(self, lane: int, cost: int = 1, max_wait: Optional[float] = None) -> Ticket:
+        cost = min(max(1, cost), self.burst)
+        started = self._clock()
+        if max_wait is not None and self.estimate_wait(lane, cost) > max_wait:
+            self.shed[lane] += 1
+            raise LoadShed(f"estimated {LANE_NAMES[lane]} queue wait exceeds {max_wait:.1f}s")
+
+        self._refill()
+        if not self._waiters and self.inflight < self.max_inflight and self._tokens >= cost:
+            ticket = self._grant(lane, cost)
+        else:
+            ticket = await self._wait_turn(lane, cost, max_wait, needs_slot=True)
+        self.wait_times.record(LANE_NAMES[lane], ticket.granted_at - started)
+        return ticket
+
+    async def spend(self, lane: int, cost: int = 1, wait: bool = True, max_wait: Optional[float] = None) -> bool:
+        """
+        Take rate tokens for an extra upstream request made under a ticket the
+        caller already holds (a hedge or failover attempt, a legacy endpoint).
+        With wait=False return False at once when tokens are short; otherwise
+        queue behind earlier waiters of the same or a higher-priority lane.
+        """
+        cost = min(max(1, cost), self.burst)
+        self._refill()
+        if not self._waiters and self._tokens >= cost:
+            self._tokens -= cost
+            return True
+        if not wait:
+            return False
+        await self._wait_turn(lane, cost, max_wait, needs_slot=False)
+        return True
+
+    def _release_slot(self, ticket: Ticket) -> None:
+        self._active.discard(ticket)
+        self.inflight = max(0, self.inflight - 1)
+        if self._timer is None:
+            self._dispatch()
+
+    def release(self, ticket: Ticket) -> None:
+        elapsed = self._clock() - ticket.granted_at
+        self._service[ticket.lane] += SERVICE_EWMA_ALPHA * (elapsed - self._service[ticket.lane])
+        self._release_slot(ticket)
+
+    @asynccontextmanager
+    async def slot(self, lane: int, cost: int = 1, max_wait: Optional[float] = None) -> AsyncIterator[Ticket]:
+        ticket = await self.acquire(lane, cost, max_wait)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._refill()
+        waits = self.wait_times.snapshot()
+        return {
+            "inflight": self.inflight,
+            "max_inflight": self.max_inflight,
+            "tokens": round(self._tokens, 2),
+            "lanes": {
+                name: {
+                    "queued": sum(1 for l, _, fut, _, _ in self._waiters if l == lane and not fut.done()),
+                    "granted": self.granted[lane],
+                    "shed": self.shed[lane],
+                    "avg_service_s": round(self._service[lane], 2),
+                    "wait_p50_ms": waits.get(name, {}).get("p50_ms", 0.0),
+                    "wait_p95_ms": waits.get(name, {}).get("p95_ms", 0.0),
+                }
+                for lane, name in LANE_NAMES.items()
+            },
+        }
+
+
+llm_scheduler = LLMScheduler(
+    max_inflight=settings.llm_max_inflight,
+    requests_per_minute=settings.llm_requests_per_minute,
+    burst=settings.llm_rate_burst,
+)
@@ -0,0 +1,99 @@
+"""
+OpenAI-compatible stand-in LLM server backed by the deterministic template provider.
+
+Serves POST /v1/chat/completions (including "stream": true as server-sent
+events and "response_format": {"type": "json_object"}) and GET /v1/models,
+so the app can run its real provider path with no HuggingFace access:
+
+    uvicorn app.local_llm_server:app --port 8081
+    LLM_PROVIDER=openai LLM_BASE_URL=http://127.0.0.1:8081/v1 uvicorn app.main:app
+
+LOCAL_LLM_LATENCY_MS and LOCAL_LLM_TOKENS_PER_SECOND simulate model speed
+(time to first token, then per-chunk pacing).
+"""
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from .config import settings
+from .llm_providers import TemplateProvider, reply_id, split_chunks
+
+app = FastAPI(title="AgriAI local LLM", docs_url=None, redoc_url=None)
+_provider = TemplateProvider()
+
+
+class ChatMessage(BaseModel):
+    role: str
+    content: str = ""
+
+
+class ChatCompletionRequest(BaseModel):
+    model: str = "local"
+    messages: List[ChatMessage]
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    top_p: Optional[float] = None
+    stream: bool = False
+    response_format: Optional[Dict[str, Any]] = None
+
+
+async def _pace(chunks: int) -> None:
+    if settings.local_llm_tokens_per_second > 0 and chunks:
+        await asyncio.sleep(chunks / settings.local_llm_tokens_per_second)
+
+
+def _usage(messages: List[Dict[str, str]], chunks: List[str]) -> Dict[str, int]:
+    prompt = sum(len(m["content"].split()) for m in messages)
+    return {"prompt_tokens": prompt, "completion_tokens": len(chunks), "total_tokens": prompt + len(chunks)}
+
+
+@app.get("/v1/models")
+def list_models():
+    return {"object": "list", "data": [{"id": "local", "object": "model", "owned_by": "agriai"}]}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(body: ChatCompletionRequest):
+    messages = [m.model_dump() for m in body.messages]
+    content = _provider.generate(messages, body.response_format)
+    chunks = split_chunks(content)
+    completion_id = reply_id(messages)
+    created = int(time.time())
+    if settings.local_llm_latency_ms > 0:
+        await asyncio.sleep(settings.local_llm_latency_ms / 1000.0)
+
+    if not body.stream:
+        await _pace(len(chunks))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": body.model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": _usage(messages, chunks),
+        }
+
+    async def events() -> AsyncIterator[str]:
+        def event(delta: Dict[str, str], finish_reason: Optional[str] = None) -> str:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body.model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(chunk)}\n\n"
+
+        yield event({"role": "assistant"})
+        for piece in chunks:
+            await _pace(1)
+            yield event({"content": piece})
+        yield event({}, "stop")
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -0,0 +1,207 @@
+"""
+Structured logging: JSON lines written by a background thread.
+
+Request handlers only format the message and put the record on a bounded
+queue (QueueHandler); a QueueListener thread does the stdout writes, so a
+slow terminal or log shipper never blocks the event loop. When the queue is
+full records are dropped and counted rather than waited on. Every record
+carries the current request id (X-Request-ID in, echoed out).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from .config import settings
+from .metrics import registry
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+_DROPPED = registry.counter("log_records_dropped_total", "Log records dropped because the log queue was full.")
+
+# Attributes every LogRecord has; anything else came in through `extra=` and is emitted as a field.
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+access_logger = logging.getLogger("app.access")
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def _parse_pairs(spec: str) -> Dict[str, str]:
+    """'app.ai_chatbot=DEBUG, httpx=WARNING' -> {'app.ai_chatbot': 'DEBUG', 'httpx': 'WARNING'}"""
+    pairs = {}
+    for item in spec.split(","):
+        name, sep, value = item.partition("=")
+        if sep and name.strip() and value.strip():
+            pairs[name.strip()] = value.strip()
+    return pairs
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.request_id != "-":
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _ContextFilter(logging.Filter):
+    """
+    Runs on the calling thread: stamps the request id and applies per-logger
+    sampling to records below WARNING (warnings and errors are always kept).
+    """
+
+    def __init__(self, sample_rates: Dict[str, float]):
+        super().__init__()
+        self._rates = sample_rates
+        self._resolved: Dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            # Longest configured prefix wins: "app" covers "app.ai_chatbot" unless that has its own rate.
+            probe = name
+            rate = 1.0
+            while probe:
+                if probe in self._rates:
+                    rate = self._rates[probe]
+                    break
+                probe = probe.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING and self._rates:
+            rate = self._rate(record.name)
+            if rate < 1.0 and random.random() >= rate:
+                return False
+        record.request_id = _request_id.get() or "-"
+        return True
+
+
+class _DroppingQueueHandler(QueueHandler):
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DROPPED.inc()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve args and tracebacks here (they may not be picklable or
+        # thread-safe later) but leave formatting to the listener thread.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging() -> None:
+    """Install the queue handler on the root logger. Idempotent."""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    if settings.log_format == "json":
+        output.setFormatter(JSONFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+
+    handler = _DroppingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+    handler.addFilter(_ContextFilter({name: float(rate) for name, rate in _parse_pairs(settings.log_sample_rates).items()}))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(settings.log_level.upper())
+    # SQL statements go through the same pipeline instead of engine echo.
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if settings.log_sql else logging.WARNING)
+    # httpx logs every outbound request at INFO; outbound latency is already in /metrics.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    for name, level in _parse_pairs(settings.log_levels).items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = QueueListener(handler.queue, output, respect_handler_level=False)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread (app shutdown)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestIdMiddleware:
+    """
+    Pure ASGI middleware: takes X-Request-ID from the client (or mints one),
+    exposes it to logging through a contextvar, echoes it on the response and
+    writes one access record per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = _request_id.set(request_id)
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            access_logger.info(
+                "%s %s %s",
+                scope["method"],
+                scope["path"],
+                status,
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                },
+            )
+            _request_id.reset(token)
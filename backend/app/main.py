@@ -1,17 +1,48 @@
 """FastAPI entry point for AgriAI backend."""
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 
+from .ai_chatbot import chat_latency
+from .ai_crop_planner import plan_latency
 from .config import settings
-from .database import init_db
-from .routers import auth, crops, chat, plan, recommend
+from .database import engine, init_db
+from .fast_json import default_response_class
+from .http_clients import http_clients
+from .intent_router import route_stats
+from .llm_scheduler import llm_scheduler
+from .logging_setup import RequestIdMiddleware, configure_logging, shutdown_logging
+from .metrics import CONTENT_TYPE, MetricsMiddleware, instrument_engine, register_cache, registry
+from .plan_jobs import plan_jobs
+from .plan_render_cache import plan_render_cache
+from .plan_weather import adjustment_cache_stats
+from .portfolio_allocator import allocation_cache_stats
+from .profiling import ProfilingMiddleware, authorized, profiler
+from .provider_health import provider_health
+from .response_cache import chat_response_cache
+from .recommendation_engine import weather_cache_stats
+from .routers import auth, crops, chat, plan, recommend, sync
+from .sync import backfill_change_log
+from .weather_prefetch import prefetcher
+
+configure_logging()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    configure_logging()
     init_db()
+    backfill_change_log()
+    plan_jobs.start()
+    if settings.weather_api_key and settings.weather_prefetch_enabled:
+        prefetcher.start()
     yield
+    await prefetcher.stop()
+    await plan_jobs.stop()
+    await http_clients.aclose()
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -19,6 +50,7 @@ app = FastAPI(
     description="Smart agriculture assistant for Indian farmers",
     version="2.0.0",
     lifespan=lifespan,
+    default_response_class=default_response_class(),
 )
 
 app.add_middleware(
@@ -27,13 +59,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
+app.add_middleware(RequestIdMiddleware)
+
+if settings.profiling_enabled:
+    # Inside the metrics middleware, so its own cost is not part of a profile.
+    app.add_middleware(ProfilingMiddleware)
+
+if settings.metrics_enabled:
+    # Added last so it wraps CORS too and times the whole request.
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine)
+    register_cache("weather", weather_cache_stats)
+    register_cache("chat_response", chat_response_cache.stats)
+    register_cache("plan_render", plan_render_cache.stats)
+    register_cache("plan_weather", adjustment_cache_stats)
+    register_cache("allocation", allocation_cache_stats)
+
 app.include_router(auth.router)
 app.include_router(crops.router)
 app.include_router(chat.router)
 app.include_router(plan.router)
 app.include_router(recommend.router)
+app.include_router(sync.router)
 
 
 @app.get("/")
@@ -43,4 +93,56 @@ def root():
 
 @app.get("/health")
 def health():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "weather_cache": weather_cache_stats(),
+        "weather_prefetch": prefetcher.status(),
+        "llm_latency": {"chat": chat_latency.snapshot(), "plan": plan_latency.snapshot()},
+        "llm_providers": provider_health.snapshot(),
+        "llm_scheduler": llm_scheduler.snapshot(),
+        "http_clients": http_clients.snapshot(),
+        "chat_cache": chat_response_cache.stats(),
+        "chat_routing": route_stats.snapshot(),
+        "plan_jobs": plan_jobs.status(),
+        "plan_render_cache": plan_render_cache.stats(),
+    }
+
+
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
+
+if settings.profiling_enabled:
+    def _require_profile_access(request: Request) -> None:
+        if not authorized(request.headers):
+            raise HTTPException(status_code=403, detail="Profile access requires X-Profile-Token")
+
+    @app.get("/debug/profiles", include_in_schema=False)
+    def profiles(request: Request):
+        _require_profile_access(request)
+        return profiler.summary()
+
+    @app.get("/debug/profiles/download", include_in_schema=False)
+    def download_profile(request: Request, route: Optional[str] = None, format: str = "collapsed"):
+        """Aggregated profile for one route ("GET /api/plan/{field_id}") or all routes."""
+        _require_profile_access(request)
+        if format == "speedscope":
+            return JSONResponse(
+                profiler.speedscope(route),
+                headers={"Content-Disposition": 'attachment; filename="profile.speedscope.json"'},
+            )
+        if format != "collapsed":
+            raise HTTPException(status_code=400, detail="format must be collapsed or speedscope")
+        return Response(
+            content=profiler.collapsed(route),
+            media_type="text/plain; charset=utf-8",
+            headers={"Content-Disposition": 'attachment; filename="profile.collapsed.txt"'},
+        )
+
+    @app.delete("/debug/profiles", include_in_schema=False)
+    def reset_profiles(request: Request):
+        _require_profile_access(request)
+        profiler.reset()
+        return {"status": "reset"}
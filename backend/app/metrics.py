@@ -0,0 +1,377 @@
+"""
+In-process metrics registry exposed in Prometheus text format on /metrics.
+
+Deliberately small: counters and fixed-bucket histograms keyed by label
+tuples, one lock per metric, and gauges that read existing stats() dicts
+at scrape time. Recording is a dict lookup, a bisect and a few adds, so it
+stays on in production.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_label_text(self.labels, key)} {_number(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label tuple -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[idx] += 1
+            series[-1] += value
+
+    def time(self, *label_values: str) -> "_Timer":
+        return _Timer(self, label_values)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, key, le)} {cumulative}")
+            labels = _label_text(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class CallbackGauge(_Metric):
+    """Values produced at scrape time by `collect()`: {label_values: value}."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str],
+        collect: Callable[[], Dict[Tuple[str, ...], float]],
+        kind: str = "gauge",
+    ):
+        super().__init__(name, help_text, labels)
+        self.kind = kind
+        self._collect = collect
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_label_text(self.labels, key)} {_number(value)}"
+            for key, value in sorted(self._collect().items())
+        ]
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_labels", "_started")
+
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._histogram.observe(time.perf_counter() - self._started, *self._labels)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labels))
+
+    def histogram(
+        self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def gauge_callback(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str],
+        collect: Callable[[], Dict[Tuple[str, ...], float]],
+        kind: str = "gauge",
+    ) -> CallbackGauge:
+        return self.register(CallbackGauge(name, help_text, labels, collect, kind))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            try:
+                samples = metric.samples()
+            except Exception:  # a broken stats() callback must not take down the scrape
+                continue
+            lines.extend(metric.header())
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Request latency by route template.", ("method", "route", "status")
+)
+REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries", "Database queries issued per request.", ("route",), COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = registry.histogram(
+    "http_request_db_seconds", "Time spent in database queries per request.", ("route",), FAST_BUCKETS
+)
+DB_QUERY_LATENCY = registry.histogram(
+    "db_query_duration_seconds", "Database query latency by statement type.", ("operation",), FAST_BUCKETS
+)
+OUTBOUND_LATENCY = registry.histogram(
+    "outbound_http_duration_seconds",
+    "Outbound HTTP time to response headers by upstream and host.",
+    ("upstream", "host", "status"),
+)
+LLM_CALL_LATENCY = registry.histogram(
+    "llm_call_duration_seconds", "LLM attempt latency by model and outcome.", ("model", "outcome")
+)
+STAGE_LATENCY = registry.histogram(
+    "stage_duration_seconds", "CPU-bound stage timings (scoring, plan normalization, prompts).", ("stage",), FAST_BUCKETS
+)
+
+
+# ---- per-request DB accounting ------------------------------------------------
+
+class _RequestDBStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# Set by MetricsMiddleware; sync endpoints run in a threadpool with a copy of
+# this context, so their queries land on the same object.
+_request_db: ContextVar[Optional[_RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+
+def _operation(statement: str) -> str:
+    head = statement.lstrip()[:6].upper()
+    return head if head in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every cursor execute on `engine` and charge it to the current request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        # The execution context is per statement, so this is safe on a shared connection.
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        DB_QUERY_LATENCY.observe(elapsed, _operation(statement))
+        stats = _request_db.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+
+# ---- request latency ------------------------------------------------------------
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task/stream overhead). The
+    route label is the matched template, e.g. /api/crops/{field_id}/plan,
+    read from scope["route"] after routing; unmatched paths share one label.
+    """
+
+    def __init__(self, app, exclude: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude = set(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        db_stats = _RequestDBStats()
+        token = _request_db.set(db_stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_db.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            REQUEST_LATENCY.observe(elapsed, scope["method"], route, str(status))
+            REQUEST_DB_QUERIES.observe(db_stats.queries, route)
+            REQUEST_DB_SECONDS.observe(db_stats.seconds, route)
+
+
+# ---- outbound HTTP ----------------------------------------------------------------
+
+def outbound_hooks(upstream: str):
+    """(on_request, on_response) httpx hooks timing each call to response headers."""
+
+    def on_request(request) -> None:
+        request.extensions["metrics_started"] = time.perf_counter()
+
+    def on_response(response) -> None:
+        request = response.request
+        started = request.extensions.get("metrics_started")
+        if started is not None:
+            OUTBOUND_LATENCY.observe(time.perf_counter() - started, upstream, request.url.host, str(response.status_code))
+
+    return on_request, on_response
+
+
+# ---- stage timings -----------------------------------------------------------------
+
+def timed(stage: str) -> Callable:
+    """Decorator recording a function's wall time under stage_duration_seconds{stage=...}."""
+
+    def decorate(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                STAGE_LATENCY.observe(time.perf_counter() - started, stage)
+
+        return wrapper
+
+    return decorate
+
+
+# ---- caches -------------------------------------------------------------------------
+
+_cache_sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register_cache(name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+    """Expose a cache's stats() dict (hits/misses or exact_hits/semantic_hits/misses)."""
+    _cache_sources[name] = stats
+
+
+def _cache_values() -> Iterator[Tuple[str, int, int]]:
+    for name, source in list(_cache_sources.items()):
+        stats = source()
+        hits = stats.get("hits", stats.get("exact_hits", 0) + stats.get("semantic_hits", 0))
+        yield name, hits, stats.get("misses", 0)
+
+
+registry.gauge_callback(
+    "cache_hits_total", "Cache hits.", ("cache",), lambda: {(n,): h for n, h, _ in _cache_values()}, kind="counter"
+)
+registry.gauge_callback(
+    "cache_misses_total", "Cache misses.", ("cache",), lambda: {(n,): m for n, _, m in _cache_values()}, kind="counter"
+)
+registry.gauge_callback(
+    "cache_hit_ratio",
+    "Cache hits / lookups since start.",
+    ("cache",),
+    lambda: {(n,): round(h / (h + m), 4) if h + m else 0.0 for n, h, m in _cache_values()},
+)
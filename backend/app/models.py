@@ -1,9 +1,11 @@
 """ORM models for AgriAI."""
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, JSON, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, ForeignKey, Text, JSON, Boolean, Index, event
 from sqlalchemy.orm import relationship
 from datetime import datetime
+import time
 
 from .database import Base
+from .schemas import PLAN_SCHEMA_VERSION, canonical_plan
 
 
 class FarmerProfile(Base):
@@ -34,11 +36,29 @@ class Field(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     plan_json = Column(JSON, nullable=True)  # Generated plan stored here
+    plan_version = Column(BigInteger, nullable=True)  # Bumped on every plan_json write; keys the plan render cache
+    plan_schema_version = Column(Integer, nullable=True)  # PLAN_SCHEMA_VERSION when plan_json is a canonical CropPlan
+    chat_summary = Column(Text, nullable=True)  # Rolling summary of older chat turns
+    chat_summary_upto = Column(Integer, nullable=True)  # Last ChatMessage.id folded into the summary
 
     farmer = relationship("FarmerProfile", back_populates="fields")
     chat_messages = relationship("ChatMessage", back_populates="field", cascade="all, delete-orphan")
 
 
+@event.listens_for(Field.plan_json, "set")
+def _bump_plan_version(target, value, oldvalue, initiator):
+    # Never below the microsecond clock, so a SQLite rowid reused after a delete cannot repeat an old version.
+    target.plan_version = max((target.plan_version or 0) + 1, time.time_ns() // 1000)
+
+
+@event.listens_for(Field.plan_json, "set", retval=True)
+def _canonical_plan(target, value, oldvalue, initiator):
+    # Validated once here, on write: a valid plan is stored exactly as CropPlan serializes it
+    # and flagged, so reads can send the stored JSON without parsing it.
+    canonical = canonical_plan(value)
+    target.plan_schema_version = PLAN_SCHEMA_VERSION if canonical is not None else None
+    return canonical if canonical is not None else value
+
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
 
@@ -92,3 +112,37 @@ class SoilCropMatrix(Base):
     water_need = Column(String(20), nullable=False, default="medium")
     is_active = Column(Boolean, nullable=False, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class PlanJob(Base):
+    __tablename__ = "plan_jobs"
+
+    id = Column(String(32), primary_key=True)
+    field_id = Column(Integer, nullable=False, index=True)
+    farmer_id = Column(Integer, nullable=False, index=True)
+    crop_name = Column(String(100), nullable=False)
+    dedup_key = Column(String(64), nullable=False, index=True)
+    inputs = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, succeeded, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    retryable = Column(Boolean, nullable=False, default=True)  # False for config/validation failures
+    result_json = Column(JSON, nullable=True)
+    owner = Column(String(32), nullable=True)  # worker process holding the lease
+    lease_expires_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class SyncChange(Base):
+    """Append-only change log behind GET /api/sync; the id is the client's sync cursor."""
+    __tablename__ = "sync_changes"
+
+    id = Column(Integer, primary_key=True)
+    farmer_id = Column(Integer, nullable=False)
+    entity = Column(String(20), nullable=False)  # field, chat_message, recommendation
+    entity_id = Column(Integer, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False)  # True = tombstone
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_sync_changes_farmer_cursor", "farmer_id", "id"),)
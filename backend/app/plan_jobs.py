@@ -0,0 +1,525 @@
+"""Background queue for AI plan generation with pluggable job storage."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+import uuid
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, or_, update
+
+from .ai_crop_planner import generate_ai_crop_plan
+from .config import settings
+from .database import SessionLocal
+from .models import Field, PlanJob
+from .plan_render_cache import plan_render_cache
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+PLAN_INPUT_KEYS = ("land_area_acres", "soil_type", "water_availability", "investment_level")
+
+
+@dataclass
+class PlanJobState:
+    id: str
+    field_id: int
+    farmer_id: int
+    crop_name: str
+    dedup_key: str
+    inputs: Dict[str, Any]
+    status: str = QUEUED
+    attempts: int = 0
+    error: Optional[str] = None
+    retryable: bool = True
+    result_json: Optional[Dict[str, Any]] = field(default=None, repr=False)
+    owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+
+
+def plan_inputs(field_row: Field) -> Dict[str, Any]:
+    return {key: getattr(field_row, key) for key in PLAN_INPUT_KEYS}
+
+
+def dedup_key(field_id: int, crop_name: str, inputs: Dict[str, Any]) -> str:
+    parts = [str(field_id), crop_name.strip().lower()] + [str(inputs[k]).strip().lower() for k in PLAN_INPUT_KEYS]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def _lease_until(seconds: float) -> datetime:
+    return datetime.utcnow() + timedelta(seconds=seconds)
+
+
+def _claimable(job: PlanJobState, owner: str, now: datetime) -> bool:
+    """A queued job that is unowned, ours or past its lease; a running job only once its lease expired."""
+    expired = job.lease_expires_at is None or job.lease_expires_at < now
+    if job.status == QUEUED:
+        return job.owner is None or job.owner == owner or expired
+    return job.status == RUNNING and expired
+
+
+class MemoryJobStore:
+    """
+    Process-local job storage; jobs are lost on restart. Same claim/lease
+    semantics as DatabaseJobStore, under a lock instead of a conditional UPDATE.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, PlanJobState] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: PlanJobState) -> None:
+        with self._lock:
+            self._jobs[job.id] = replace(job)
+
+    def get(self, job_id: str) -> Optional[PlanJobState]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job) if job else None
+
+    def update(self, job: PlanJobState) -> bool:
+        """Write the job back unless another worker has taken it over."""
+        job.updated_at = datetime.utcnow()
+        with self._lock:
+            current = self._jobs.get(job.id)
+            if current is None or current.owner != job.owner:
+                return False
+            self._jobs[job.id] = replace(job)
+            return True
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float) -> Optional[PlanJobState]:
+        now = datetime.utcnow()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not _claimable(job, owner, now):
+                return None
+            job.status, job.owner, job.attempts = RUNNING, owner, job.attempts + 1
+            job.lease_expires_at = now + timedelta(seconds=lease_seconds)
+            job.updated_at = now
+            return replace(job)
+
+    def renew(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.owner != owner or job.status not in ACTIVE_STATUSES:
+                return False
+            job.lease_expires_at = _lease_until(lease_seconds)
+            return True
+
+    def find_active(self, key: str) -> Optional[PlanJobState]:
+        with self._lock:
+            for job in self._jobs.values():
+                if job.dedup_key == key and job.status in ACTIVE_STATUSES:
+                    return replace(job)
+        return None
+
+    def purge(self, before: datetime) -> int:
+        """Delete finished jobs last updated before `before`; returns how many were removed."""
+        with self._lock:
+            old = [
+                job_id for job_id, job in self._jobs.items()
+                if job.status not in ACTIVE_STATUSES and job.updated_at < before
+            ]
+            for job_id in old:
+                del self._jobs[job_id]
+            return len(old)
+
+    def expired(self, now: datetime) -> List[str]:
+        """Active jobs nobody holds a live lease on (their owner stopped or crashed)."""
+        with self._lock:
+            return [
+                job.id for job in sorted(self._jobs.values(), key=lambda j: j.created_at)
+                if job.status in ACTIVE_STATUSES and (job.lease_expires_at is None or job.lease_expires_at < now)
+            ]
+
+
+class DatabaseJobStore:
+    """
+    Jobs persisted in the plan_jobs table, so queued work survives a restart.
+    Several worker processes can share the table: a job is claimed with a
+    conditional UPDATE that sets its owner and lease, and other processes
+    only take it over once that lease has expired.
+    """
+
+    @staticmethod
+    def _to_state(row: PlanJob) -> PlanJobState:
+        return PlanJobState(
+            id=row.id,
+            field_id=row.field_id,
+            farmer_id=row.farmer_id,
+            crop_name=row.crop_name,
+            dedup_key=row.dedup_key,
+            inputs=row.inputs,
+            status=row.status,
+            attempts=row.attempts,
+            error=row.error,
+            retryable=row.retryable,
+            result_json=row.result_json,
+            owner=row.owner,
+            lease_expires_at=row.lease_expires_at,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+        )
+
+    def create(self, job: PlanJobState) -> None:
+        db = SessionLocal()
+        try:
+            db.add(PlanJob(
+                id=job.id,
+                field_id=job.field_id,
+                farmer_id=job.farmer_id,
+                crop_name=job.crop_name,
+                dedup_key=job.dedup_key,
+                inputs=job.inputs,
+                status=job.status,
+                attempts=job.attempts,
+                owner=job.owner,
+                lease_expires_at=job.lease_expires_at,
+                created_at=job.created_at,
+                updated_at=job.updated_at,
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    def get(self, job_id: str) -> Optional[PlanJobState]:
+        db = SessionLocal()
+        try:
+            row = db.get(PlanJob, job_id)
+            return self._to_state(row) if row else None
+        finally:
+            db.close()
+
+    def update(self, job: PlanJobState) -> bool:
+        """Write the job back unless another worker has taken it over."""
+        job.updated_at = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                update(PlanJob)
+                .where(PlanJob.id == job.id, PlanJob.owner == job.owner)
+                .values(
+                    status=job.status,
+                    attempts=job.attempts,
+                    error=job.error,
+                    retryable=job.retryable,
+                    result_json=job.result_json,
+                    lease_expires_at=job.lease_expires_at,
+                    updated_at=job.updated_at,
+                )
+            )
+            db.commit()
+            return result.rowcount == 1
+        finally:
+            db.close()
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float) -> Optional[PlanJobState]:
+        now = datetime.utcnow()
+        expired = or_(PlanJob.lease_expires_at.is_(None), PlanJob.lease_expires_at < now)
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                update(PlanJob)
+                .where(
+                    PlanJob.id == job_id,
+                    or_(
+                        and_(PlanJob.status == QUEUED, or_(PlanJob.owner.is_(None), PlanJob.owner == owner, expired)),
+                        and_(PlanJob.status == RUNNING, expired),
+                    ),
+                )
+                .values(
+                    status=RUNNING,
+                    owner=owner,
+                    attempts=PlanJob.attempts + 1,
+                    lease_expires_at=now + timedelta(seconds=lease_seconds),
+                    updated_at=now,
+                )
+            )
+            db.commit()
+            if result.rowcount != 1:
+                return None
+            row = db.get(PlanJob, job_id)
+            return self._to_state(row) if row else None
+        finally:
+            db.close()
+
+    def renew(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                update(PlanJob)
+                .where(PlanJob.id == job_id, PlanJob.owner == owner, PlanJob.status.in_(ACTIVE_STATUSES))
+                .values(lease_expires_at=_lease_until(lease_seconds))
+            )
+            db.commit()
+            return result.rowcount == 1
+        finally:
+            db.close()
+
+    def find_active(self, key: str) -> Optional[PlanJobState]:
+        db = SessionLocal()
+        try:
+            row = (
+                db.query(PlanJob)
+                .filter(PlanJob.dedup_key == key, PlanJob.status.in_(ACTIVE_STATUSES))
+                .order_by(PlanJob.created_at.desc())
+                .first()
+            )
+            return self._to_state(row) if row else None
+        finally:
+            db.close()
+
+    def purge(self, before: datetime) -> int:
+        """Delete finished jobs last updated before `before`; returns how many were removed."""
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                delete(PlanJob).where(PlanJob.status.notin_(ACTIVE_STATUSES), PlanJob.updated_at < before)
+            )
+            db.commit()
+            return result.rowcount
+        finally:
+            db.close()
+
+    def expired(self, now: datetime) -> List[str]:
+        """Active jobs nobody holds a live lease on (their owner stopped or crashed)."""
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(PlanJob.id)
+                .filter(
+                    PlanJob.status.in_(ACTIVE_STATUSES),
+                    or_(PlanJob.lease_expires_at.is_(None), PlanJob.lease_expires_at < now),
+                )
+                .order_by(PlanJob.created_at)
+                .all()
+            )
+            return [row.id for row in rows]
+        finally:
+            db.close()
+
+
+def _make_store():
+    if settings.plan_job_backend == "memory":
+        return MemoryJobStore()
+    return DatabaseJobStore()
+
+
+class PlanJobQueue:
+    """
+    In-process asyncio queue drained by a fixed number of workers. Jobs are
+    deduplicated by (field, crop, plan inputs) while queued or running, and
+    retried with exponential backoff on upstream failures. `enqueue` is safe
+    to call from sync endpoints running in the threadpool.
+
+    Each queue has its own owner id. A job is created under its enqueuer's
+    lease and run only after a worker claims it; the lease is renewed while
+    it runs, and jobs whose lease expired (another process died) are picked
+    up by the periodic maintenance task, which also deletes finished jobs
+    older than plan_job_retention_hours.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or _make_store()
+        self.owner = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._maintenance: Optional[asyncio.Task] = None
+        self._done: Dict[str, asyncio.Event] = {}
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.deduplicated = 0
+        self.purged = 0
+
+    def enqueue(self, field_row: Field, crop_name: Optional[str] = None) -> Tuple[PlanJobState, bool]:
+        """Return (job, created); an identical active job is returned instead of a new one."""
+        crop = (crop_name or field_row.crop_name).strip()
+        inputs = plan_inputs(field_row)
+        key = dedup_key(field_row.id, crop, inputs)
+        with self._lock:
+            existing = self.store.find_active(key)
+            if existing:
+                self.deduplicated += 1
+                return existing, False
+            job = PlanJobState(
+                id=uuid.uuid4().hex,
+                field_id=field_row.id,
+                farmer_id=field_row.farmer_id,
+                crop_name=crop,
+                dedup_key=key,
+                inputs=inputs,
+                # Not started yet: leave it unowned so whichever queue recovers first runs it.
+                owner=self.owner if self._loop else None,
+                lease_expires_at=_lease_until(settings.plan_job_lease_seconds) if self._loop else None,
+            )
+            self.store.create(job)
+        self._submit(job.id)
+        return job, True
+
+    def _submit(self, job_id: str) -> None:
+        # Without a running loop the job stays queued in the store and is picked up on start().
+        if self._loop is None or self._queue is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._queue.put_nowait(job_id)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, job_id)
+
+    def get(self, job_id: str) -> Optional[PlanJobState]:
+        return self.store.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[PlanJobState]:
+        """Wait up to `timeout` seconds for the job to finish and return its latest state."""
+        event = self._done.setdefault(job_id, asyncio.Event())
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None or job.status not in ACTIVE_STATUSES:
+            self._done.pop(job_id, None)
+            return job
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    # Store calls and _save_to_field are blocking (SQLAlchemy, SQLite busy timeout), so
+    # everything below that runs on the event loop hands them to a worker thread.
+
+    async def _run(self, job: PlanJobState) -> None:
+        """Run a job this queue has claimed (status RUNNING, attempts already counted)."""
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        try:
+            plan = await generate_ai_crop_plan(crop_name=job.crop_name, **job.inputs)
+        except ValueError as exc:
+            # Configuration/validation problems will not fix themselves; fail without retrying.
+            job.retryable = False
+            await self._finish(job, FAILED, error=str(exc))
+            return
+        except Exception as exc:
+            if job.attempts < settings.plan_job_max_attempts:
+                delay = settings.plan_job_retry_backoff_seconds * 2 ** (job.attempts - 1)
+                job.status = QUEUED
+                job.error = str(exc)
+                # Keep the lease through the backoff so no other process picks the retry up early.
+                job.lease_expires_at = _lease_until(delay + settings.plan_job_lease_seconds)
+                await asyncio.to_thread(self.store.update, job)
+                self.retries += 1
+                self._loop.call_later(delay, self._queue.put_nowait, job.id)
+                return
+            await self._finish(job, FAILED, error=str(exc))
+            return
+        finally:
+            heartbeat.cancel()
+        await asyncio.to_thread(self._save_to_field, job, plan)
+        await self._finish(job, SUCCEEDED, result=plan)
+
+    @staticmethod
+    def _save_to_field(job: PlanJobState, plan: Dict[str, Any]) -> None:
+        """Store the plan on the field unless the field was changed or deleted meanwhile."""
+        db = SessionLocal()
+        try:
+            field_row = db.get(Field, job.field_id)
+            if field_row is None or field_row.crop_name.strip().lower() != job.crop_name.lower():
+                return
+            if dedup_key(field_row.id, field_row.crop_name, plan_inputs(field_row)) != job.dedup_key:
+                return
+            field_row.plan_json = plan
+            db.commit()
+            plan_render_cache.invalidate(field_row.id)
+        finally:
+            db.close()
+
+    async def _finish(self, job: PlanJobState, status: str, error: Optional[str] = None, result=None) -> None:
+        job.status = status
+        job.error = error
+        job.result_json = result
+        await asyncio.to_thread(self.store.update, job)
+        if status == SUCCEEDED:
+            self.completed += 1
+        else:
+            self.failed += 1
+        event = self._done.pop(job.id, None)
+        if event:
+            event.set()
+
+    async def _heartbeat(self, job_id: str) -> None:
+        lease = settings.plan_job_lease_seconds
+        while True:
+            await asyncio.sleep(lease / 3)
+            if not await asyncio.to_thread(self.store.renew, job_id, self.owner, lease):
+                return  # taken over; our final update will be rejected
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = await asyncio.to_thread(self.store.claim, job_id, self.owner, settings.plan_job_lease_seconds)
+                if job:
+                    await self._run(job)
+            except Exception as exc:
+                job = await asyncio.to_thread(self.store.get, job_id)
+                if job and job.owner == self.owner:
+                    await self._finish(job, FAILED, error=f"worker error: {exc}")
+            finally:
+                self._queue.task_done()
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(max(1, settings.plan_job_workers))]
+        self._maintenance = asyncio.create_task(self._maintain())
+
+    async def _maintain(self) -> None:
+        """
+        Queue active jobs whose lease expired (owner restarted or died; the claim
+        decides who runs them) and delete finished jobs past the retention window.
+        """
+        while True:
+            now = datetime.utcnow()
+            for job_id in await asyncio.to_thread(self.store.expired, now):
+                self._queue.put_nowait(job_id)
+            cutoff = now - timedelta(hours=settings.plan_job_retention_hours)
+            self.purged += await asyncio.to_thread(self.store.purge, cutoff)
+            await asyncio.sleep(settings.plan_job_lease_seconds)
+
+    async def stop(self) -> None:
+        tasks = self._workers + ([self._maintenance] if self._maintenance else [])
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._maintenance = None
+        self._loop = None
+        self._queue = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.store).__name__,
+            "workers": len(self._workers),
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "deduplicated": self.deduplicated,
+            "purged": self.purged,
+        }
+
+
+plan_jobs = PlanJobQueue()
@@ -0,0 +1,101 @@
+"""Rendered plan JSON keyed by (field_id, plan_version, variant), in memory with an optional disk tier."""
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .cache import LRUCache
+from .config import settings
+
+# Variant for the whole plan document (GET /api/crops/{id}/plan); month views use "m<month>[-<overlay>]".
+FULL_PLAN = "full"
+
+
+class PlanRenderCache:
+    """
+    Bytes-level cache of rendered plan documents.
+
+    Field.plan_version is bumped on every plan_json write, so an entry can
+    never be served for a newer plan; invalidate() only reclaims the space.
+    That also makes the disk tier safe to share between worker processes:
+    a worker whose memory tier still holds an old version simply never asks
+    for that key again.
+    """
+
+    def __init__(self, maxsize: int, disk_dir: Optional[str] = None):
+        self.enabled = maxsize > 0
+        self._memory = LRUCache(maxsize=max(1, maxsize))
+        self._dir = Path(disk_dir) if disk_dir else None
+        if self._dir:
+            self._dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.disk_errors = 0
+
+    def _path(self, field_id: int, version: int, variant: str) -> Path:
+        return self._dir / f"{field_id}-{version}-{variant}.json"
+
+    def get(self, field_id: int, version: int, variant: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        key = (field_id, version, variant)
+        body = self._memory.get(key)
+        if body is not None or not self._dir:
+            return body
+        try:
+            body = self._path(*key).read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError:
+            with self._lock:
+                self.disk_errors += 1
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        self._memory.set(key, body)
+        return body
+
+    def set(self, field_id: int, version: int, variant: str, body: bytes) -> None:
+        if not self.enabled:
+            return
+        key = (field_id, version, variant)
+        self._memory.set(key, body)
+        if not self._dir:
+            return
+        try:
+            # Write-then-rename so other workers never read a partial file.
+            fd, tmp = tempfile.mkstemp(dir=self._dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(body)
+            os.replace(tmp, self._path(*key))
+        except OSError:
+            with self._lock:
+                self.disk_errors += 1
+
+    def invalidate(self, field_id: int) -> None:
+        """Drop every rendered version of a field's plan."""
+        self._memory.discard_where(lambda key: key[0] == field_id)
+        if not self._dir:
+            return
+        for path in self._dir.glob(f"{field_id}-*.json"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._memory.stats()
+        stats["enabled"] = self.enabled
+        stats["disk"] = str(self._dir) if self._dir else None
+        stats["disk_hits"] = self.disk_hits
+        stats["disk_errors"] = self.disk_errors
+        return stats
+
+
+plan_render_cache = PlanRenderCache(
+    maxsize=settings.plan_render_cache_size,
+    disk_dir=settings.plan_render_cache_dir or None,
+)
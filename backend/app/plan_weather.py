@@ -0,0 +1,113 @@
+"""Forecast-driven adjustments overlaid on day plans at read time."""
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import LRUCache
+from .recommendation_engine import WeatherSummary, weather_cache_key
+from .weather_series import WeatherSeries
+
+# Rain on a day (or the day before) that makes irrigation unnecessary.
+RAIN_SKIP_IRRIGATION_MM = 5.0
+# Sustained wind above ~20 km/h causes spray drift.
+WIND_NO_SPRAY_MS = 5.5
+
+# Task kinds are read from the title's words: descriptions of unrelated tasks mention
+# irrigation, pests or disease in passing ("plan next day irrigation", "reduce pest pressure").
+_IRRIGATION_WORDS = frozenset(("irrigation", "irrigate", "irrigating", "watering"))
+_SPRAY_WORDS = frozenset(("spray", "spraying", "sprays", "fungicide", "insecticide", "pesticide", "herbicide"))
+
+# location cell -> (forecast fingerprint, adjustments by date)
+_adjustment_cache = LRUCache(maxsize=2048)
+
+
+def adjustment_cache_stats() -> Dict[str, Any]:
+    return _adjustment_cache.stats()
+
+
+def forecast_fingerprint(series: WeatherSeries, days: int) -> Tuple:
+    return tuple((d.date, round(d.rain_mm), round(d.wind_max_ms, 0)) for d in series.daily[:days])
+
+
+# Icons are not task kinds either: the rule plan assigns them by day range ("water" on
+# every day 15-60 row).
+def _title_words(item: Dict[str, Any]) -> frozenset:
+    return frozenset(re.findall(r"[a-z]+", str(item.get("title", "")).lower()))
+
+
+def _is_irrigation(item: Dict[str, Any]) -> bool:
+    return not _title_words(item).isdisjoint(_IRRIGATION_WORDS)
+
+
+def _is_spraying(item: Dict[str, Any]) -> bool:
+    return not _title_words(item).isdisjoint(_SPRAY_WORDS)
+
+
+def compute_adjustments(series: WeatherSeries, days: int) -> Dict[str, List[Dict[str, str]]]:
+    """Adjustments keyed by plan date (DD/MM/YYYY) for the next `days` forecast days."""
+    daily = series.daily[:days]
+    adjustments: Dict[str, List[Dict[str, str]]] = {}
+    for idx, day in enumerate(daily):
+        key = day.date.strftime("%d/%m/%Y")
+        rain_today = day.rain_mm
+        rain_before = daily[idx - 1].rain_mm if idx > 0 else 0.0
+        if max(rain_today, rain_before) >= RAIN_SKIP_IRRIGATION_MM:
+            when = "today" if rain_today >= RAIN_SKIP_IRRIGATION_MM else "yesterday"
+            adjustments.setdefault(key, []).append(
+                {
+                    "kind": "skip_irrigation",
+                    "note": f"Skip irrigation: {max(rain_today, rain_before):.0f} mm rain forecast {when}. Check soil moisture first.",
+                }
+            )
+        if day.wind_max_ms >= WIND_NO_SPRAY_MS:
+            calm = next((d for d in daily[idx + 1:] if d.wind_max_ms < WIND_NO_SPRAY_MS and d.rain_mm < RAIN_SKIP_IRRIGATION_MM), None)
+            move_to = f" Move spraying to {calm.date.strftime('%d/%m/%Y')}." if calm else " Spray on the next calm morning."
+            adjustments.setdefault(key, []).append(
+                {
+                    "kind": "postpone_spraying",
+                    "note": f"Windy ({day.wind_max_ms * 3.6:.0f} km/h): avoid spraying today.{move_to}",
+                }
+            )
+    return adjustments
+
+
+def adjustments_for(weather: WeatherSummary, days: int) -> Dict[str, List[Dict[str, str]]]:
+    """Cached per location cell; recomputed only when that cell's forecast changes."""
+    series = weather.series
+    if series is None or not len(series):
+        return {}
+    cell = weather_cache_key(weather.location)
+    fingerprint = forecast_fingerprint(series, days)
+    cached = _adjustment_cache.get(cell)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    adjustments = compute_adjustments(series, days)
+    _adjustment_cache.set(cell, (fingerprint, adjustments))
+    return adjustments
+
+
+def apply_weather_overlay(
+    day_plan: List[Dict[str, Any]],
+    adjustments: Dict[str, List[Dict[str, str]]],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Return the day plan with adjustments applied, plus the applied diff.
+
+    Only affected items are copied; the stored plan is never modified.
+    """
+    if not adjustments:
+        return day_plan, []
+    overlaid: List[Dict[str, Any]] = []
+    applied: List[Dict[str, Any]] = []
+    for item in day_plan:
+        notes: Optional[List[str]] = None
+        for adj in adjustments.get(str(item.get("date")), ()):
+            relevant = _is_irrigation(item) if adj["kind"] == "skip_irrigation" else _is_spraying(item)
+            if relevant:
+                notes = (notes or []) + [adj["note"]]
+                applied.append({"day": item.get("day"), "date": item.get("date"), **adj})
+        if notes:
+            item = {**item, "description": " ".join(notes) + " " + str(item.get("description", ""))}
+        overlaid.append(item)
+    return overlaid, applied
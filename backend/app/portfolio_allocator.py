@@ -0,0 +1,197 @@
+"""Acreage allocation across a farmer's fields under investment and water caps."""
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .cache import LRUCache
+from .metrics import timed
+from .recommendation_engine import (
+    BASE_FINANCIALS,
+    WATER_SENSITIVITY,
+    WeatherSummary,
+    fetch_weather,
+    score_candidates,
+)
+from .rotation_planner import WATER_UNITS
+
+# Multiplier grids for the Lagrangian relaxation: rupees of profit given up per rupee
+# invested, and per water unit used per acre.
+_INVESTMENT_PRICES = np.concatenate(([0.0], np.geomspace(0.01, 20.0, 16)))
+_WATER_PRICES = np.concatenate(([0.0], np.geomspace(50.0, 200000.0, 16)))
+
+_allocation_cache = LRUCache(maxsize=512, ttl=600)
+
+
+def allocation_cache_stats() -> Dict[str, Any]:
+    return _allocation_cache.stats()
+
+
+def default_water_cap(fields: Sequence[Any]) -> float:
+    return float(sum(f.land_area_acres * WATER_UNITS.get(f.water_availability, 2) for f in fields))
+
+
+@timed("portfolio_allocate")
+def solve_allocation(
+    areas: np.ndarray,
+    profit: np.ndarray,
+    cost: np.ndarray,
+    water: np.ndarray,
+    investment_cap: float,
+    water_cap: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Allocate acres of at most one crop per field to maximize total profit.
+
+    `profit` and `cost` are per-acre (fields x crops, NaN where a crop is not
+    allowed), `water` is units per acre per crop. Whole-field assignments come
+    from a batched Lagrangian relaxation over both caps; leftover budget is then
+    spent greedily on partial acreage of unplanted fields. Returns the chosen crop
+    index per field (-1 for fallow) and the acres planted.
+    """
+    allowed = ~np.isnan(profit)
+    p = np.where(allowed, profit, -np.inf)
+    c = np.where(allowed, cost, 0.0)
+
+    # reduced[l, m, f, k] = profit - lambda_l * cost - mu_m * water
+    reduced = (
+        p[None, None, :, :]
+        - _INVESTMENT_PRICES[:, None, None, None] * c[None, None, :, :]
+        - _WATER_PRICES[None, :, None, None] * water[None, None, None, :]
+    )
+    choice = reduced.argmax(axis=3)
+    take = np.take_along_axis(reduced, choice[..., None], axis=3)[..., 0] > 0
+
+    field_idx = np.arange(len(areas))
+    acres = np.where(take, areas[None, None, :], 0.0)
+    total_profit = (acres * p[field_idx, choice].clip(min=0)).sum(axis=2)
+    total_cost = (acres * c[field_idx, choice]).sum(axis=2)
+    total_water = (acres * water[choice]).sum(axis=2)
+    feasible = (total_cost <= investment_cap) & (total_water <= water_cap)
+
+    chosen = np.full(len(areas), -1, dtype=int)
+    planted = np.zeros(len(areas))
+    if feasible.any():
+        l, m = np.unravel_index(np.where(feasible, total_profit, -np.inf).argmax(), feasible.shape)
+        chosen = np.where(take[l, m], choice[l, m], -1)
+        planted = acres[l, m].copy()
+
+    spent_cost = float((planted * c[field_idx, chosen.clip(min=0)]).sum())
+    spent_water = float((planted * water[chosen.clip(min=0)]).sum())
+    remaining_cost = investment_cap - spent_cost
+    remaining_water = water_cap - spent_water
+
+    open_fields = np.flatnonzero(chosen < 0)
+    if len(open_fields) and remaining_cost > 0 and remaining_water > 0:
+        best = p[open_fields].argmax(axis=1)
+        best_profit = p[open_fields, best]
+        best_cost = c[open_fields, best]
+        ratio = np.where(best_cost > 0, best_profit / np.maximum(best_cost, 1e-9), best_profit)
+        for i in np.argsort(-ratio):
+            if best_profit[i] <= 0:
+                continue
+            f, k = open_fields[i], best[i]
+            limit = areas[f]
+            if best_cost[i] > 0:
+                limit = min(limit, remaining_cost / best_cost[i])
+            if water[k] > 0:
+                limit = min(limit, remaining_water / water[k])
+            if limit < 0.01:
+                continue
+            chosen[f] = k
+            planted[f] = limit
+            remaining_cost -= limit * best_cost[i]
+            remaining_water -= limit * water[k]
+
+    return chosen, planted
+
+
+def _per_acre_tables(
+    fields: Sequence[Any],
+    crops: List[str],
+    season: str,
+    weather: WeatherSummary,
+) -> Tuple[np.ndarray, np.ndarray]:
+    profit = np.full((len(fields), len(crops)), np.nan)
+    cost = np.full((len(fields), len(crops)), np.nan)
+    column = {name: i for i, name in enumerate(crops)}
+    scored_rows: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+    for row, f in enumerate(fields):
+        key = (f.soil_type, f.water_availability, f.investment_level)
+        if key not in scored_rows:
+            scored_rows[key] = score_candidates(
+                soil_type=f.soil_type,
+                area_acres=1.0,
+                season=season,
+                water_availability=f.water_availability,
+                investment_level=f.investment_level,
+                weather=weather,
+            )
+        for item in scored_rows[key]:
+            col = column.get(item["crop_name"])
+            if col is None:
+                continue
+            profit[row, col] = (item["estimated_profit_min"] + item["estimated_profit_max"]) / 2.0
+            cost[row, col] = item["estimated_investment_cost"]
+    return profit, cost
+
+
+def allocate_portfolio(
+    farmer_id: int,
+    fields: Sequence[Any],
+    location: str,
+    season: str,
+    investment_cap: float,
+    water_cap: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Split each of the farmer's fields across crops; cached per farmer and field state."""
+    water_cap = water_cap if water_cap is not None else default_water_cap(fields)
+    signature = tuple((f.id, f.land_area_acres, f.soil_type, f.water_availability, f.investment_level) for f in fields)
+    cache_key = (farmer_id, signature, location.strip().lower(), season, float(investment_cap), float(water_cap))
+    cached = _allocation_cache.get(cache_key)
+    if cached is not None:
+        return {**cached, "cached": True}
+
+    start = time.perf_counter()
+    weather = fetch_weather(location)
+    crops = list(BASE_FINANCIALS)
+    profit, cost = _per_acre_tables(fields, crops, season, weather)
+    water = np.array([WATER_UNITS.get(WATER_SENSITIVITY.get(name, "medium"), 2) for name in crops], dtype=float)
+    areas = np.array([f.land_area_acres for f in fields], dtype=float)
+
+    chosen, planted = solve_allocation(areas, profit, cost, water, float(investment_cap), float(water_cap))
+
+    allocations: List[Dict[str, Any]] = []
+    totals = {"expected_profit": 0.0, "investment_cost": 0.0, "water_units": 0.0}
+    for row, f in enumerate(fields):
+        k = int(chosen[row])
+        acres = float(planted[row]) if k >= 0 else 0.0
+        item = {
+            "field_id": f.id,
+            "field_name": f.name,
+            "crop_name": crops[k] if k >= 0 else None,
+            "acres": round(acres, 2),
+            "fallow_acres": round(f.land_area_acres - acres, 2),
+            "expected_profit": round(acres * profit[row, k]) if k >= 0 else 0,
+            "investment_cost": round(acres * cost[row, k]) if k >= 0 else 0,
+            "water_units": round(acres * water[k], 2) if k >= 0 else 0.0,
+        }
+        totals["expected_profit"] += item["expected_profit"]
+        totals["investment_cost"] += item["investment_cost"]
+        totals["water_units"] += item["water_units"]
+        allocations.append(item)
+
+    result = {
+        "allocations": allocations,
+        "total_expected_profit": round(totals["expected_profit"]),
+        "total_investment_cost": round(totals["investment_cost"]),
+        "total_water_units": round(totals["water_units"], 2),
+        "investment_cap": float(investment_cap),
+        "water_cap": float(water_cap),
+        "solve_ms": round((time.perf_counter() - start) * 1000, 2),
+        "cached": False,
+    }
+    _allocation_cache.set(cache_key, result)
+    return result
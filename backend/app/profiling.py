@@ -0,0 +1,282 @@
+"""
+Opt-in sampling profiler for individual requests, aggregated per route.
+
+ProfilingMiddleware profiles a random `profiling_sample_rate` fraction of
+requests, plus any request carrying `X-Profile-Token: <profiling_token>`.
+While at least one profiled request is in flight a daemon thread samples
+`sys._current_frames()` every `profiling_interval_ms`; with none in flight
+it exits, so unprofiled traffic costs one random() call per request.
+
+Samples are attributed exactly rather than by time window:
+- event-loop samples count only when the stack passes through the profiled
+  request's own middleware frame (async endpoints and dependencies);
+- worker-thread samples count when the thread is running a call dispatched
+  from the request's context (sync endpoints, run_in_threadpool,
+  asyncio.to_thread);
+- ticks where the request has no frame on any stack are recorded as
+  "[await]", so the profile covers wall time, not only CPU.
+
+Stacks are kept as collapsed-stack counts per route ("GET /api/plan/{field_id}")
+and exported as collapsed text (flamegraph.pl, speedscope, inferno) or a
+speedscope JSON document from GET /debug/profiles/download.
+"""
+import hmac
+import random
+import sys
+import threading
+import time
+from collections import Counter as StackCounter
+from contextvars import Context, ContextVar
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import settings
+from .metrics import registry
+
+_AWAIT = "[await]"
+_TRUNCATED = "[truncated]"
+_WORKER = "[worker thread]"  # root of stacks sampled on threadpool threads
+_TOKEN_HEADER = b"x-profile-token"
+
+PROFILED_REQUESTS = registry.counter(
+    "profiled_requests_total", "Requests captured by the sampling profiler", ["route", "trigger"]
+)
+
+_session_var: ContextVar[Optional["_Session"]] = ContextVar("profile_session", default=None)
+
+
+class _Session:
+    __slots__ = ("root", "samples", "awaiting")
+
+    def __init__(self, root):
+        self.root = root  # the middleware's frame; every frame of the request's task sits above it
+        self.samples: List[Tuple[str, ...]] = []
+        self.awaiting = 0
+
+
+_labels: Dict[Any, str] = {}
+
+
+def _label(code) -> str:
+    label = _labels.get(code)
+    if label is None:
+        path = code.co_filename.replace("\\", "/")
+        marker = path.rfind("/app/")
+        short = path[marker + 1:] if marker >= 0 else "/".join(path.rsplit("/", 2)[-2:])
+        label = f"{code.co_name} ({short}:{code.co_firstlineno})".replace(";", ":")
+        _labels[code] = label
+    return label
+
+
+def _stack_above(frame, stop) -> Optional[List[Any]]:
+    """Frames from `frame` down to (excluding) `stop`, leaf first; None if `stop` is not on the stack."""
+    frames = []
+    while frame is not None:
+        if frame is stop:
+            return frames
+        frames.append(frame)
+        frame = frame.f_back
+    return None
+
+
+def _dispatched_session(frame) -> Tuple[Optional[_Session], Optional[Any]]:
+    """
+    For a worker thread, the session of the call it is running and the
+    dispatching frame. anyio's WorkerThread.run keeps the copied context in a
+    local; concurrent.futures (asyncio.to_thread) wraps it as partial(ctx.run, ...).
+    """
+    while frame is not None:
+        if frame.f_code.co_name == "run":
+            local_vars = frame.f_locals
+            context = local_vars.get("context")
+            if not isinstance(context, Context):
+                fn = getattr(local_vars.get("self"), "fn", None)
+                context = getattr(fn.func, "__self__", None) if isinstance(fn, partial) else None
+            if isinstance(context, Context):
+                return context.get(_session_var), frame
+        frame = frame.f_back
+    return None, None
+
+
+class Profiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: Dict[_Session, int] = {}  # session -> event-loop thread id
+        self._thread: Optional[threading.Thread] = None
+        self._routes: Dict[str, StackCounter] = {}
+        self._requests: Dict[str, int] = {}
+
+    # ---- sessions ----------------------------------------------------------------
+
+    def begin(self, root) -> Optional[_Session]:
+        with self._lock:
+            if len(self._active) >= settings.profiling_max_concurrent:
+                return None
+            session = _Session(root)
+            self._active[session] = threading.get_ident()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+            return session
+
+    def end(self, session: _Session, route: str) -> None:
+        with self._lock:
+            self._active.pop(session, None)
+            stacks = self._routes.setdefault(route, StackCounter())
+            for sample in session.samples:
+                key = ";".join(sample)
+                if key not in stacks and len(stacks) >= settings.profiling_max_stacks_per_route:
+                    key = _TRUNCATED
+                stacks[key] += 1
+            if session.awaiting:
+                stacks[_AWAIT] += session.awaiting
+            self._requests[route] = self._requests.get(route, 0) + 1
+
+    # ---- sampling ----------------------------------------------------------------
+
+    def _run(self) -> None:
+        interval = settings.profiling_interval_ms / 1000.0
+        me = threading.get_ident()
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                # Under the lock so end() never merges a session mid-sample.
+                self._sample(sys._current_frames(), self._active, me)
+
+    def _sample(self, frames: Dict[int, Any], active: Dict[_Session, int], me: int) -> None:
+        seen = set()
+        loop_threads = set(active.values())
+        for thread_id, frame in frames.items():
+            if thread_id == me:
+                continue
+            if thread_id in loop_threads:
+                for session, loop_thread in active.items():
+                    if loop_thread == thread_id:
+                        stack = _stack_above(frame, session.root)
+                        if stack is not None:
+                            if stack:
+                                session.samples.append(tuple(_label(f.f_code) for f in reversed(stack)))
+                            seen.add(session)
+                            break
+                continue
+            session, dispatch = _dispatched_session(frame)
+            if session in active:
+                stack = _stack_above(frame, dispatch)
+                if stack:
+                    session.samples.append((_WORKER,) + tuple(_label(f.f_code) for f in reversed(stack)))
+                seen.add(session)
+        for session in active:
+            if session not in seen:
+                session.awaiting += 1
+
+    # ---- export ------------------------------------------------------------------
+
+    def _merged(self, route: Optional[str]) -> StackCounter:
+        with self._lock:
+            if route is not None:
+                return StackCounter(self._routes.get(route, {}))
+            merged = StackCounter()
+            for name, stacks in self._routes.items():
+                for stack, count in stacks.items():
+                    merged[f"{name};{stack}"] += count
+            return merged
+
+    def summary(self) -> Dict[str, Any]:
+        interval_ms = settings.profiling_interval_ms
+        with self._lock:
+            return {
+                "interval_ms": interval_ms,
+                "active": len(self._active),
+                "routes": {
+                    route: {
+                        "requests": self._requests.get(route, 0),
+                        "samples": sum(stacks.values()),
+                        "sampled_seconds": round(sum(stacks.values()) * interval_ms / 1000.0, 3),
+                        "await_share": round(stacks.get(_AWAIT, 0) / max(1, sum(stacks.values())), 4),
+                    }
+                    for route, stacks in sorted(self._routes.items())
+                },
+            }
+
+    def collapsed(self, route: Optional[str] = None) -> str:
+        """Brendan Gregg's collapsed-stack format: "root;child;leaf count" per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self._merged(route).items()))
+
+    def speedscope(self, route: Optional[str] = None) -> Dict[str, Any]:
+        """A speedscope "sampled" profile (https://www.speedscope.app/file-format-schema.json), weights in ms."""
+        frame_index: Dict[str, int] = {}
+        samples, weights = [], []
+        for stack, count in sorted(self._merged(route).items()):
+            samples.append([frame_index.setdefault(name, len(frame_index)) for name in stack.split(";")])
+            weights.append(count * settings.profiling_interval_ms)
+        name = route or "all routes"
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"AgriAI {name}",
+            "exporter": "agriai-profiler",
+            "shared": {"frames": [{"name": frame} for frame in frame_index]},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._requests.clear()
+
+
+profiler = Profiler()
+
+
+def authorized(headers) -> bool:
+    """X-Profile-Token matches profiling_token; without a token only ENV=development is allowed."""
+    if not settings.profiling_token:
+        return settings.env == "development"
+    return hmac.compare_digest(headers.get("x-profile-token", ""), settings.profiling_token)
+
+
+class ProfilingMiddleware:
+    """Pure ASGI; the route key is read from scope["route"] after routing, as in MetricsMiddleware."""
+
+    def __init__(self, app, exclude=("/metrics", "/debug/profiles", "/debug/profiles/download")):
+        self.app = app
+        self.exclude = set(exclude)
+        self._token = settings.profiling_token.encode("latin-1")
+
+    def _trigger(self, scope) -> Optional[str]:
+        if self._token:
+            for name, value in scope["headers"]:
+                if name == _TOKEN_HEADER and hmac.compare_digest(value, self._token):
+                    return "header"
+        if settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+        trigger = self._trigger(scope)
+        session = profiler.begin(sys._getframe()) if trigger else None
+        if session is None:
+            await self.app(scope, receive, send)
+            return
+
+        token = _session_var.set(session)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _session_var.reset(token)
+            route = f'{scope["method"]} {getattr(scope.get("route"), "path", None) or "unmatched"}'
+            profiler.end(session, route)
+            PROFILED_REQUESTS.inc(route, trigger)
@@ -0,0 +1,106 @@
+"""Token-budgeted chat prompt assembly and rolling per-field conversation summaries."""
+from __future__ import annotations
+
+import math
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .metrics import timed
+
+_PIECES = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_SENTENCE_END = re.compile(r"(?<=[.!?।])\s")
+ELLIPSIS = "…"
+
+
+def _piece_tokens(piece: str) -> int:
+    # BPE vocabularies of the 7B chat models average ~4 chars per token for
+    # English but split Indic scripts much finer, so non-ASCII counts double.
+    if piece.isascii():
+        return max(1, math.ceil(len(piece) / 4))
+    return max(1, math.ceil(len(piece) / 2))
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate; deliberately errs on the high side."""
+    return sum(_piece_tokens(m.group()) for m in _PIECES.finditer(text or ""))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    used = 0
+    for m in _PIECES.finditer(text or ""):
+        used += _piece_tokens(m.group())
+        if used > max_tokens:
+            return text[: m.start()].rstrip() + ELLIPSIS
+    return text
+
+
+def _gist(text: str, max_tokens: int) -> str:
+    """First sentence of a message, capped at max_tokens."""
+    flat = " ".join((text or "").split())
+    first = _SENTENCE_END.split(flat, maxsplit=1)[0]
+    return truncate_to_tokens(first, max_tokens)
+
+
+def fold_into_summary(
+    summary: Optional[str],
+    messages: Sequence[Dict[str, str]],
+    max_tokens: int,
+    line_tokens: int = 40,
+) -> str:
+    """
+    Append one gist line per message to the rolling summary, dropping the
+    oldest lines once the summary exceeds max_tokens. Purely local: no LLM call.
+    """
+    lines = [line for line in (summary or "").splitlines() if line.strip()]
+    for msg in messages:
+        speaker = "Farmer" if msg.get("role") == "user" else "AgriAI"
+        gist = _gist(msg.get("content", ""), line_tokens)
+        if gist:
+            lines.append(f"{speaker}: {gist}")
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+@timed("chat_prompt")
+def build_messages(
+    system_prompt: str,
+    context: str,
+    summary: Optional[str],
+    recent_history: Sequence[Dict[str, str]],
+    user_message: str,
+    budget: int,
+    user_message_max_tokens: int,
+) -> Tuple[List[Dict[str, str]], int]:
+    """
+    Assemble chat messages within `budget` estimated tokens and return
+    (messages, estimated_tokens). The system prompt and the (capped) user
+    message always go in; context, the conversation summary and the most
+    recent raw turns are added in that order while they fit.
+    """
+    user_content = truncate_to_tokens(user_message, user_message_max_tokens)
+    head = [{"role": "system", "content": system_prompt}]
+    used = estimate_tokens(system_prompt) + estimate_tokens(user_content)
+
+    for label, block in (("Context", context), ("Conversation so far", summary)):
+        if not block:
+            continue
+        content = f"{label}: {block}"
+        cost = estimate_tokens(content)
+        if used + cost > budget:
+            content = truncate_to_tokens(content, budget - used)
+            cost = estimate_tokens(content)
+            if cost <= 1:
+                continue
+        head.append({"role": "system", "content": content})
+        used += cost
+
+    history: List[Dict[str, str]] = []
+    for msg in reversed(recent_history):
+        cost = estimate_tokens(msg["content"])
+        if used + cost > budget:
+            break
+        history.insert(0, {"role": msg["role"], "content": msg["content"]})
+        used += cost
+
+    return head + history + [{"role": "user", "content": user_content}], used
@@ -0,0 +1,134 @@
+"""Per-(endpoint, model) circuit breakers shared by the LLM callers."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# allow() returns a permit: this shared one for ordinary calls, a fresh object for the half-open probe.
+_PASS = object()
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures. Once the cooldown
+    elapses a single half-open probe is let through: success closes the
+    breaker, failure re-opens it with the cooldown doubled (up to the max).
+
+    allow() returns a permit (None when the call is refused). Only the probe's
+    own permit can release its slot, so a cancelled ordinary call never frees
+    a probe that is still running.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        cooldown: float,
+        max_cooldown: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opens = 0
+        self.cooldown = cooldown
+        self.opened_at = 0.0
+        self._probe: Optional[object] = None  # permit of the half-open probe in flight
+        self.last_error = ""
+
+    def allow(self) -> Optional[object]:
+        if self.state == CLOSED:
+            return _PASS
+        if self.state == OPEN and self._clock() - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+            self._probe = None
+        if self.state == HALF_OPEN and self._probe is None:
+            self._probe = object()
+            return self._probe
+        return None
+
+    def release(self, permit: Optional[object]) -> None:
+        """Give back a half-open probe slot without a verdict (e.g. the call was cancelled)."""
+        if permit is not None and permit is self._probe:
+            self._probe = None
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown = self.base_cooldown
+        self._probe = None
+
+    def record_failure(self, error: str = "") -> None:
+        self.last_error = error[:200]
+        self._probe = None
+        if self.state == HALF_OPEN:
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            self._open()
+            return
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opens += 1
+        self.opened_at = self._clock()
+
+    def snapshot(self) -> Dict[str, Any]:
+        retry_in = max(0.0, self.cooldown - (self._clock() - self.opened_at)) if self.state == OPEN else 0.0
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opens": self.opens,
+            "cooldown_s": round(self.cooldown, 1),
+            "retry_in_s": round(retry_in, 1),
+            "last_error": self.last_error,
+        }
+
+
+class ProviderHealthRegistry:
+    def __init__(self):
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, endpoint: str, model_id: str) -> CircuitBreaker:
+        key = (endpoint, model_id)
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    failure_threshold=settings.llm_breaker_failure_threshold,
+                    cooldown=settings.llm_breaker_cooldown_seconds,
+                    max_cooldown=settings.llm_breaker_max_cooldown_seconds,
+                )
+                self._breakers[key] = breaker
+            return breaker
+
+    def allow(self, endpoint: str, model_id: str) -> Optional[object]:
+        return self.breaker(endpoint, model_id).allow()
+
+    def record_success(self, endpoint: str, model_id: str) -> None:
+        self.breaker(endpoint, model_id).record_success()
+
+    def record_failure(self, endpoint: str, model_id: str, error: str = "") -> None:
+        self.breaker(endpoint, model_id).record_failure(error)
+
+    def release(self, endpoint: str, model_id: str, permit: Optional[object]) -> None:
+        self.breaker(endpoint, model_id).release(permit)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            items = list(self._breakers.items())
+        return {f"{endpoint} [{model_id}]": breaker.snapshot() for (endpoint, model_id), breaker in items}
+
+
+provider_health = ProviderHealthRegistry()
@@ -1,12 +1,14 @@
 """AI-style crop recommendation and weather scoring utilities."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from typing import Any, Dict, List, Optional
 
-import httpx
-
+from .cache import LRUCache
 from .config import settings
+from .http_clients import OPENWEATHER, http_clients
+from .metrics import timed
+from .weather_series import WeatherSeries
 
 
 @dataclass
@@ -16,6 +18,7 @@ class WeatherSummary:
     rainfall_mm: float
     condition: str
     source: str = "fallback"
+    series: Optional[WeatherSeries] = field(default=None, repr=False, compare=False)
 
 
 SOIL_CROP_MATRIX: Dict[str, Dict[str, int]] = {
@@ -88,14 +91,48 @@ def _season_key(season: str) -> str:
     return value if value in SEASON_BONUS else "kharif"
 
 
+_weather_cache = LRUCache(maxsize=1024, ttl=settings.weather_cache_ttl_seconds)
+
+
+def weather_cache_key(location: str) -> str:
+    return " ".join((location or "").lower().split())
+
+
+def weather_cache_stats() -> Dict[str, Any]:
+    return _weather_cache.stats()
+
+
+def cached_weather(location: str) -> Optional[WeatherSummary]:
+    """Weather from the cache only (never calls upstream); None on a miss."""
+    cached = _weather_cache.get(weather_cache_key(location))
+    return replace(cached, location=location) if cached is not None else None
+
+
 def fetch_weather(location: str) -> WeatherSummary:
+    """Weather summary for a location, served from the weather cache when warm."""
+    cached = _weather_cache.get(weather_cache_key(location))
+    if cached is not None:
+        return replace(cached, location=location)
+    return refresh_weather(location)
+
+
+def refresh_weather(location: str) -> WeatherSummary:
+    """Fetch weather upstream and store live results in the weather cache."""
+    summary = _fetch_weather_upstream(location)
+    if summary.source != "fallback":
+        _weather_cache.set(weather_cache_key(location), summary)
+    return summary
+
+
+def _fetch_weather_upstream(location: str) -> WeatherSummary:
     api_key = settings.weather_api_key
     if not api_key:
         return WeatherSummary(location=location, temperature_c=28.0, rainfall_mm=2.0, condition="Partly Cloudy")
 
+    client = http_clients.sync_client(OPENWEATHER)
     try:
-        geo_url = "https://api.openweathermap.org/geo/1.0/direct"
-        geo = httpx.get(geo_url, params={"q": location, "limit": 1, "appid": api_key}, timeout=8.0)
+        geo_url = f"{settings.openweather_base_url}/geo/1.0/direct"
+        geo = client.get(geo_url, params={"q": location, "limit": 1, "appid": api_key}, timeout=settings.weather_timeout_seconds)
         geo.raise_for_status()
         geodata = geo.json() or []
         if not geodata:
@@ -103,18 +140,18 @@ def fetch_weather(location: str) -> WeatherSummary:
         lat = geodata[0]["lat"]
         lon = geodata[0]["lon"]
 
-        weather_url = "https://api.openweathermap.org/data/2.5/weather"
-        weather = httpx.get(weather_url, params={"lat": lat, "lon": lon, "units": "metric", "appid": api_key}, timeout=8.0)
+        weather_url = f"{settings.openweather_base_url}/data/2.5/weather"
+        weather = client.get(weather_url, params={"lat": lat, "lon": lon, "units": "metric", "appid": api_key}, timeout=settings.weather_timeout_seconds)
         weather.raise_for_status()
         weather_json = weather.json()
 
-        forecast_url = "https://api.openweathermap.org/data/2.5/forecast"
-        forecast = httpx.get(forecast_url, params={"lat": lat, "lon": lon, "units": "metric", "appid": api_key}, timeout=8.0)
+        forecast_url = f"{settings.openweather_base_url}/data/2.5/forecast"
+        forecast = client.get(forecast_url, params={"lat": lat, "lon": lon, "units": "metric", "appid": api_key}, timeout=settings.weather_timeout_seconds)
         rainfall_mm = 0.0
+        series = None
         if forecast.is_success:
-            forecast_json = forecast.json()
-            items = (forecast_json or {}).get("list", [])[:8]
-            rainfall_mm = round(sum((item.get("rain") or {}).get("3h", 0.0) for item in items), 2)
+            series = WeatherSeries.from_forecast(location, forecast.json())
+            rainfall_mm = series.rain_window(24)
 
         return WeatherSummary(
             location=location,
@@ -122,6 +159,7 @@ def fetch_weather(location: str) -> WeatherSummary:
             rainfall_mm=rainfall_mm,
             condition=((weather_json.get("weather") or [{}])[0]).get("main", "Clear"),
             source="openweather",
+            series=series,
         )
     except Exception:
         return WeatherSummary(location=location, temperature_c=28.0, rainfall_mm=2.0, condition="Partly Cloudy")
@@ -193,16 +231,16 @@ def _financials(crop_name: str, area_acres: float, investment_level: str, suitab
     }
 
 
-def generate_recommendations(
+@timed("score_candidates")
+def score_candidates(
     soil_type: str,
     area_acres: float,
-    location: str,
     season: str,
     water_availability: str,
     investment_level: str,
-    weather: Optional[WeatherSummary] = None,
+    weather: WeatherSummary,
 ) -> List[Dict[str, Any]]:
-    weather = weather or fetch_weather(location)
+    """Score every candidate crop for the soil, best first."""
     soil_key = _normalize_soil(soil_type)
     season_key = _season_key(season)
     candidates = SOIL_CROP_MATRIX.get(soil_key, SOIL_CROP_MATRIX["alluvial"])
@@ -225,7 +263,27 @@ def generate_recommendations(
         )
 
     scored.sort(key=lambda item: item["suitability_score"], reverse=True)
-    return scored[:3]
+    return scored
+
+
+def generate_recommendations(
+    soil_type: str,
+    area_acres: float,
+    location: str,
+    season: str,
+    water_availability: str,
+    investment_level: str,
+    weather: Optional[WeatherSummary] = None,
+) -> List[Dict[str, Any]]:
+    weather = weather or fetch_weather(location)
+    return score_candidates(
+        soil_type=soil_type,
+        area_acres=area_acres,
+        season=season,
+        water_availability=water_availability,
+        investment_level=investment_level,
+        weather=weather,
+    )[:3]
 
 
 def score_single_crop(
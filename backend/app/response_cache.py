@@ -0,0 +1,219 @@
+"""Exact and near-duplicate response cache for chatbot answers."""
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import settings
+
+VECTOR_DIM = 2048
+MIN_CACHEABLE_WORDS = 3
+
+_PUNCT = re.compile(r"[^\w\s]", re.UNICODE)
+
+# Function words carry no intent; dropping them before embedding keeps
+# "when should I irrigate paddy" and "when to irrigate my paddy" together.
+_STOPWORDS = frozenset(
+    "a an the to for of on in at by with and or is are was be do does did can could should would will "
+    "i me my we our you your it its this that these those what which when how why where much many "
+    "please tell give about some any".split()
+)
+
+
+def normalize_question(text: str) -> str:
+    return " ".join(_PUNCT.sub(" ", (text or "").lower()).split())
+
+
+def _stem(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def context_hash(context: str) -> str:
+    return hashlib.sha1((context or "").encode("utf-8")).hexdigest()[:16]
+
+
+def embed(normalized: str) -> np.ndarray:
+    """
+    Hashed bag of word unigrams/bigrams and character trigrams, L2-normalized.
+
+    CPU-only and dependency-free; good enough to catch rephrasings such as
+    "when should I irrigate paddy" vs "when to irrigate my paddy".
+    """
+    vec = np.zeros(VECTOR_DIM, dtype=np.float32)
+    words = [_stem(w) for w in normalized.split() if w not in _STOPWORDS] or normalized.split()
+    weighted: List[Tuple[str, float]] = [(w, 2.0) for w in words]
+    weighted += [(f"{a} {b}", 1.0) for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f" {w} "
+        weighted += [(padded[i:i + 3], 0.25) for i in range(len(padded) - 2)]
+    for feat, weight in weighted:
+        vec[zlib.crc32(feat.encode("utf-8")) % VECTOR_DIM] += weight
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+@dataclass
+class _Bucket:
+    """Entries sharing (crop, context hash); vectors are stacked for one matmul per lookup."""
+
+    keys: List[str] = field(default_factory=list)
+    answers: List[str] = field(default_factory=list)
+    expires: List[float] = field(default_factory=list)
+    vectors: Optional[np.ndarray] = None
+
+    def _keep(self, keep: List[int]) -> None:
+        self.keys = [self.keys[i] for i in keep]
+        self.answers = [self.answers[i] for i in keep]
+        self.expires = [self.expires[i] for i in keep]
+        self.vectors = self.vectors[keep] if keep and self.vectors is not None else None
+
+    def drop_expired(self, now: float) -> int:
+        """Remove expired entries; returns how many were removed."""
+        keep = [i for i, exp in enumerate(self.expires) if exp > now]
+        removed = len(self.keys) - len(keep)
+        if removed:
+            self._keep(keep)
+        return removed
+
+    def drop_oldest(self) -> None:
+        """Remove the entry stored (or refreshed) longest ago, i.e. the one expiring first."""
+        oldest = min(range(len(self.expires)), key=self.expires.__getitem__)
+        self._keep([i for i in range(len(self.keys)) if i != oldest])
+
+
+class ChatResponseCache:
+    """
+    Answers bucketed by (crop, context hash). Each bucket holds at most
+    `max_entries_per_bucket` entries and the cache `max_entries` in total;
+    over either limit single entries are evicted (expired ones first, then the
+    oldest), so the bucket being written to never evicts itself wholesale.
+    """
+
+    def __init__(self, ttl: float, threshold: float, max_entries: int, max_entries_per_bucket: int):
+        self.ttl = ttl
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_entries_per_bucket = max(1, min(max_entries_per_bucket, max_entries))
+        self._buckets: "OrderedDict[Tuple[str, str], _Bucket]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @staticmethod
+    def cacheable(user_message: str) -> bool:
+        lowered = (user_message or "").lower()
+        if "[image attached:" in lowered or "[video attached:" in lowered:
+            return False
+        return len(normalize_question(user_message).split()) >= MIN_CACHEABLE_WORDS
+
+    def lookup(self, crop_name: str, user_message: str, context: str) -> Optional[str]:
+        normalized = normalize_question(user_message)
+        bucket_key = ((crop_name or "").strip().lower(), context_hash(context))
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(bucket_key)
+            if bucket is None:
+                self.misses += 1
+                return None
+            self._size -= bucket.drop_expired(now)
+            if not bucket.keys:
+                del self._buckets[bucket_key]
+                self.misses += 1
+                return None
+            self._buckets.move_to_end(bucket_key)
+            if normalized in bucket.keys:
+                self.exact_hits += 1
+                return bucket.answers[bucket.keys.index(normalized)]
+            if bucket.vectors is not None and len(bucket.keys):
+                scores = bucket.vectors @ embed(normalized)
+                best = int(scores.argmax())
+                if scores[best] >= self.threshold:
+                    self.semantic_hits += 1
+                    return bucket.answers[best]
+            self.misses += 1
+            return None
+
+    def store(self, crop_name: str, user_message: str, context: str, answer: str) -> None:
+        normalized = normalize_question(user_message)
+        bucket_key = ((crop_name or "").strip().lower(), context_hash(context))
+        vector = embed(normalized)[None, :]
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.setdefault(bucket_key, _Bucket())
+            self._buckets.move_to_end(bucket_key)
+            self._size -= bucket.drop_expired(now)
+            if normalized in bucket.keys:
+                idx = bucket.keys.index(normalized)
+                bucket.answers[idx] = answer
+                bucket.expires[idx] = now + self.ttl
+                return
+            if len(bucket.keys) >= self.max_entries_per_bucket:
+                bucket.drop_oldest()
+                self._size -= 1
+                self.evictions += 1
+            bucket.keys.append(normalized)
+            bucket.answers.append(answer)
+            bucket.expires.append(now + self.ttl)
+            bucket.vectors = vector if bucket.vectors is None else np.vstack([bucket.vectors, vector])
+            self._size += 1
+            self.stores += 1
+            if self._size > self.max_entries:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries everywhere, then the oldest entries of the least recently used buckets."""
+        for key in list(self._buckets):
+            bucket = self._buckets[key]
+            self._size -= bucket.drop_expired(now)
+            if not bucket.keys:
+                del self._buckets[key]
+        for key in list(self._buckets):  # least recently used first; the bucket just written is last
+            if self._size <= self.max_entries:
+                return
+            bucket = self._buckets[key]
+            while self._size > self.max_entries and bucket.keys:
+                bucket.drop_oldest()
+                self._size -= 1
+                self.evictions += 1
+            if not bucket.keys:
+                del self._buckets[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, float]:
+        hits = self.exact_hits + self.semantic_hits
+        lookups = hits + self.misses
+        return {
+            "entries": self._size,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "buckets": len(self._buckets),
+            "llm_calls_avoided": hits,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+chat_response_cache = ChatResponseCache(
+    ttl=settings.chat_cache_ttl_seconds,
+    threshold=settings.chat_cache_similarity_threshold,
+    max_entries=settings.chat_cache_max_entries,
+    max_entries_per_bucket=settings.chat_cache_max_entries_per_bucket,
+)
@@ -0,0 +1,129 @@
+"""Monte Carlo profit/risk simulation around the deterministic recommendation figures."""
+from __future__ import annotations
+
+import zlib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .metrics import timed
+from .recommendation_engine import (
+    BASE_FINANCIALS,
+    SEASON_BONUS,
+    SOIL_CROP_MATRIX,
+    WATER_SENSITIVITY,
+    WeatherSummary,
+    _investment_adjustment,
+    _normalize_soil,
+    _season_key,
+    _water_adjustment,
+)
+
+DEFAULT_SAMPLES = 10_000
+
+# Spread of the sampled drivers around the point forecast.
+TEMPERATURE_SD_C = 2.5
+RAIN_SHAPE = 2.0
+YIELD_SIGMA = 0.18
+PRICE_SIGMA = 0.12
+COST_SIGMA = 0.05
+CROP_FAILURE_PROB = 0.03
+CROP_FAILURE_YIELD = 0.4
+
+_INVESTMENT_FACTOR = {"low": 0.9, "medium": 1.0, "high": 1.2}
+_NEED_CODE = {"low": 0, "medium": 1, "high": 2}
+
+
+def simulation_seed(*parts: Any) -> int:
+    """Stable seed from the request inputs so repeated calls give identical bands."""
+    return zlib.crc32("|".join(str(p) for p in parts).encode("utf-8"))
+
+
+def _weather_adjustment_batch(need: np.ndarray, rain: np.ndarray, temp: np.ndarray) -> np.ndarray:
+    """Vectorized twin of recommendation_engine._weather_adjustment."""
+    high, low = need == 2, need == 0
+    score = np.select(
+        [high & (rain >= 6), high & (rain <= 1), low & (rain <= 4), low & (rain >= 10)],
+        [6, -7, 5, -5],
+        default=0,
+    )
+    score += np.select([(temp >= 22) & (temp <= 32), (temp > 38) | (temp < 14)], [4, -6], default=0)
+    return score
+
+
+@timed("profit_simulation")
+def simulate_profit(
+    crop_names: List[str],
+    soil_type: str,
+    area_acres: float,
+    season: str,
+    water_availability: str,
+    investment_level: str,
+    weather: WeatherSummary,
+    samples: int = DEFAULT_SAMPLES,
+    seed: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Sample weather, yield and price for every crop at once; one summary per crop."""
+    rng = np.random.default_rng(seed)
+    k = len(crop_names)
+    if k == 0:
+        return []
+
+    soil_scores = SOIL_CROP_MATRIX.get(_normalize_soil(soil_type), SOIL_CROP_MATRIX["alluvial"])
+    season_bonus = SEASON_BONUS.get(_season_key(season), {})
+    static_score = np.array(
+        [
+            soil_scores.get(name, 60)
+            + season_bonus.get(name, 0)
+            + _water_adjustment(name, water_availability)
+            + _investment_adjustment(name, investment_level)
+            for name in crop_names
+        ],
+        dtype=float,
+    )[:, None]
+    need = np.array([_NEED_CODE[WATER_SENSITIVITY.get(name, "medium")] for name in crop_names])[:, None]
+    base = [BASE_FINANCIALS.get(name, BASE_FINANCIALS["Paddy"]) for name in crop_names]
+    base_cost = np.array([b["cost"] for b in base], dtype=float)[:, None]
+    base_profit = np.array([(b["profit_low"] + b["profit_high"]) / 2.0 for b in base], dtype=float)[:, None]
+    investment_factor = _INVESTMENT_FACTOR.get(investment_level, 1.0)
+
+    # Weather is shared across crops within a sample; yield, price and cost are per crop.
+    rain = rng.gamma(RAIN_SHAPE, max(weather.rainfall_mm, 0.5) / RAIN_SHAPE, size=(1, samples))
+    temp = rng.normal(weather.temperature_c, TEMPERATURE_SD_C, size=(1, samples))
+    suitability = np.clip(static_score + _weather_adjustment_batch(need, rain, temp), 40, 99)
+    score_factor = np.clip(suitability / 85.0, 0.7, 1.25)
+
+    yield_mult = rng.lognormal(0.0, YIELD_SIGMA, size=(k, samples))
+    yield_mult = np.where(rng.random((k, samples)) < CROP_FAILURE_PROB, yield_mult * CROP_FAILURE_YIELD, yield_mult)
+    price_mult = rng.lognormal(0.0, PRICE_SIGMA, size=(k, samples))
+    # Centred on recommendation_engine._financials: with every multiplier at its
+    # median the sample is exactly the deterministic cost and mid-range profit.
+    expected_cost = base_cost * area_acres * investment_factor
+    expected_profit = base_profit * area_acres * score_factor
+    cost = expected_cost * rng.lognormal(0.0, COST_SIGMA, size=(k, samples))
+    revenue = (expected_cost + expected_profit) * yield_mult * price_mult
+    profit = revenue - cost
+
+    p10, p50, p90 = np.percentile(profit, [10, 50, 90], axis=1)
+    mean = profit.mean(axis=1)
+    prob_loss = (profit < 0).mean(axis=1)
+    spread = (p50 - p10) / np.maximum(np.abs(p50), 1.0)
+    risk_index = np.clip(100.0 * (0.5 * prob_loss + 0.5 * np.minimum(spread, 1.0)), 0, 100)
+
+    results: List[Dict[str, Any]] = []
+    for i, name in enumerate(crop_names):
+        risk = float(risk_index[i])
+        results.append(
+            {
+                "crop_name": name,
+                "samples": samples,
+                "profit_mean": round(float(mean[i])),
+                "profit_p10": round(float(p10[i])),
+                "profit_p50": round(float(p50[i])),
+                "profit_p90": round(float(p90[i])),
+                "probability_of_loss": round(float(prob_loss[i]), 4),
+                "risk_index": round(risk, 1),
+                "risk_score": "Low" if risk < 20 else "Medium" if risk < 40 else "High",
+            }
+        )
+    return results
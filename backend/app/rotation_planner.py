@@ -0,0 +1,193 @@
+"""Multi-season crop rotation planner built on the recommendation scores."""
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .crop_rules import _get_crop_data
+from .metrics import timed
+from .recommendation_engine import WATER_SENSITIVITY, WeatherSummary, fetch_weather, score_candidates
+
+DEFAULT_SEASON_ORDER = ["kharif", "rabi", "zaid"]
+
+# Approximate length of each sowing window in days (Jun-Sep, Oct-Feb, Mar-May).
+SEASON_WINDOW_DAYS: Dict[str, int] = {"kharif": 120, "rabi": 150, "zaid": 95}
+
+# A crop may run this many days into the next window and still leave it plantable.
+ROTATION_SLACK_DAYS = 20
+
+WATER_UNITS: Dict[str, int] = {"low": 1, "medium": 2, "high": 3}
+
+FALLOW = "Fallow"
+
+# A partial path: (objective, profit, cost, risk_sum, planted_count, steps)
+_Path = Tuple[float, float, float, float, int, Tuple[Dict[str, Any], ...]]
+
+
+def crop_duration(crop_name: str) -> int:
+    return int(_get_crop_data(crop_name)["duration"])
+
+
+def default_water_budget(water_availability: str, seasons: int) -> int:
+    return WATER_UNITS.get(water_availability, 2) * seasons
+
+
+def _objective(profit: float, suitability: int, risk_aversion: float) -> float:
+    return profit * (1.0 - risk_aversion * (1.0 - suitability / 100.0))
+
+
+@timed("rotation_optimize")
+def optimize_rotation(
+    season_scores: List[Tuple[str, List[Dict[str, Any]]]],
+    water_budget: int,
+    top_k: int = 3,
+    risk_aversion: float = 0.5,
+    time_budget_ms: Optional[float] = None,
+    durations: Optional[Dict[str, int]] = None,
+    water_needs: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Search crop sequences across seasons with a top-k dynamic program.
+
+    State per season is (days still occupied by the previous crop, water units used);
+    each state keeps only its k best partial paths, so the work grows linearly with
+    the catalogue size instead of exponentially with the number of seasons.
+    """
+    durations = durations or {}
+    water_needs = water_needs or WATER_SENSITIVITY
+    deadline = time.perf_counter() + time_budget_ms / 1000.0 if time_budget_ms else None
+    truncated = False
+
+    states: Dict[Tuple[int, int], List[_Path]] = {(0, 0): [(0.0, 0.0, 0.0, 0.0, 0, ())]}
+    for season, candidates in season_scores:
+        window = SEASON_WINDOW_DAYS.get(season, 120)
+        beam = top_k
+        if deadline and time.perf_counter() > deadline:
+            truncated = True
+            beam = 1
+        next_states: Dict[Tuple[int, int], List[_Path]] = {}
+
+        def push(key: Tuple[int, int], path: _Path) -> None:
+            bucket = next_states.setdefault(key, [])
+            bucket.append(path)
+            if len(bucket) > beam * 2:
+                bucket.sort(key=lambda p: p[0], reverse=True)
+                del bucket[beam:]
+
+        for (carry, water_used), paths in states.items():
+            if carry > ROTATION_SLACK_DAYS:
+                step = {"season": season, "crop_name": None, "status": "occupied"}
+                for path in paths:
+                    push((max(0, carry - window), water_used), path[:5] + (path[5] + (step,),))
+                continue
+
+            fallow = {"season": season, "crop_name": FALLOW, "status": "fallow"}
+            for path in paths:
+                push((0, water_used), path[:5] + (path[5] + (fallow,),))
+
+            for item in candidates:
+                crop_name = item["crop_name"]
+                water = WATER_UNITS.get(water_needs.get(crop_name, "medium"), 2)
+                if water_used + water > water_budget:
+                    continue
+                duration = durations.get(crop_name) or crop_duration(crop_name)
+                profit = (item["estimated_profit_min"] + item["estimated_profit_max"]) / 2.0
+                cost = float(item["estimated_investment_cost"])
+                suitability = int(item["suitability_score"])
+                gain = _objective(profit, suitability, risk_aversion)
+                step = {
+                    "season": season,
+                    "crop_name": crop_name,
+                    "status": "planted",
+                    "duration_days": duration,
+                    "suitability_score": suitability,
+                    "risk_score": item["risk_score"],
+                    "expected_profit": round(profit),
+                    "estimated_investment_cost": round(cost),
+                }
+                key = (max(0, carry + duration - window), water_used + water)
+                for obj, total_profit, total_cost, risk_sum, planted, steps in paths:
+                    push(
+                        key,
+                        (
+                            obj + gain,
+                            total_profit + profit,
+                            total_cost + cost,
+                            risk_sum + (100 - suitability),
+                            planted + 1,
+                            steps + (step,),
+                        ),
+                    )
+
+        for bucket in next_states.values():
+            bucket.sort(key=lambda p: p[0], reverse=True)
+            del bucket[beam:]
+        states = next_states
+
+    # Prefer rotations that leave the field free for the next cycle's first season.
+    closed = [bucket for (carry, _), bucket in states.items() if carry <= ROTATION_SLACK_DAYS]
+    finals = sorted((p for bucket in (closed or states.values()) for p in bucket), key=lambda p: p[0], reverse=True)
+    sequences: List[Dict[str, Any]] = []
+    seen = set()
+    for obj, total_profit, total_cost, risk_sum, planted, steps in finals:
+        signature = tuple(step["crop_name"] for step in steps)
+        if signature in seen:
+            continue
+        seen.add(signature)
+        avg_risk = risk_sum / planted if planted else 100.0
+        sequences.append(
+            {
+                "steps": list(steps),
+                "expected_profit": round(total_profit),
+                "estimated_investment_cost": round(total_cost),
+                "risk_index": round(avg_risk, 1),
+                "objective": round(obj),
+            }
+        )
+        if len(sequences) >= top_k:
+            break
+
+    return {"sequences": sequences, "truncated": truncated}
+
+
+def plan_rotation(
+    soil_type: str,
+    area_acres: float,
+    location: str,
+    water_availability: str,
+    investment_level: str,
+    seasons: Optional[List[str]] = None,
+    water_budget: Optional[int] = None,
+    top_k: int = 3,
+    risk_aversion: float = 0.5,
+    time_budget_ms: Optional[float] = 200.0,
+    weather: Optional[WeatherSummary] = None,
+) -> Dict[str, Any]:
+    """Score each season with the recommendation engine and return the best rotations."""
+    weather = weather or fetch_weather(location)
+    seasons = seasons or DEFAULT_SEASON_ORDER
+    budget = water_budget if water_budget is not None else default_water_budget(water_availability, len(seasons))
+    season_scores = [
+        (
+            season,
+            score_candidates(
+                soil_type=soil_type,
+                area_acres=area_acres,
+                season=season,
+                water_availability=water_availability,
+                investment_level=investment_level,
+                weather=weather,
+            ),
+        )
+        for season in seasons
+    ]
+    result = optimize_rotation(
+        season_scores,
+        water_budget=budget,
+        top_k=top_k,
+        risk_aversion=risk_aversion,
+        time_budget_ms=time_budget_ms,
+    )
+    result["water_budget"] = budget
+    result["weather"] = weather
+    return result
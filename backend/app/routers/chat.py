@@ -7,6 +7,12 @@ from ..auth import get_current_user
 from ..models import FarmerProfile, Field, ChatMessage, CropRecommendation
 from ..schemas import ChatMessageCreate, ChatMessageResponse, ChatResponse
 from ..ai_chatbot import get_ai_response
+from ..config import settings
+from ..fast_json import json_response
+from ..prompt_builder import fold_into_summary
+
+# Unsummarized messages read per request; anything older would fall out of the summary anyway.
+FOLD_WINDOW = 20
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
@@ -35,18 +41,30 @@ async def send_message(
         .first()
     )
     
-    # Get recent chat history for context
-    recent_msgs = (
+    # Keep the last few turns raw; fold older ones into the field's rolling summary
+    keep_raw = settings.chat_history_raw_messages
+    unsummarized = list(reversed(
         db.query(ChatMessage)
-        .filter(ChatMessage.field_id == field.id)
-        .order_by(ChatMessage.created_at.desc())
-        .limit(6)
+        .filter(
+            ChatMessage.field_id == field.id,
+            ChatMessage.id > (field.chat_summary_upto or 0),
+            ChatMessage.id != user_msg.id,  # Exclude current message
+        )
+        .order_by(ChatMessage.id.desc())
+        .limit(keep_raw + FOLD_WINDOW)
         .all()
-    )
-    chat_history = [
-        {"role": msg.role, "content": msg.content}
-        for msg in reversed(recent_msgs[1:])  # Exclude current message
-    ]
+    ))
+    fold_count = max(0, len(unsummarized) - keep_raw)
+    if fold_count:
+        to_fold = unsummarized[:fold_count]
+        field.chat_summary = fold_into_summary(
+            field.chat_summary,
+            [{"role": msg.role, "content": msg.content} for msg in to_fold],
+            settings.chat_summary_max_tokens,
+        )
+        field.chat_summary_upto = to_fold[-1].id
+        db.commit()
+    chat_history = [{"role": msg.role, "content": msg.content} for msg in unsummarized[fold_count:]]
     
     # Get AI response with context
     ai_content = await get_ai_response(
@@ -54,6 +72,7 @@ async def send_message(
         field.crop_name,
         recommendations=(latest_recommendation.top_recommendations if latest_recommendation else None),
         chat_history=chat_history,
+        conversation_summary=field.chat_summary,
     )
     
     # Save AI response
@@ -78,4 +97,4 @@ def get_history(
     if not field:
         raise HTTPException(status_code=404, detail="Crop/Field not found")
     msgs = db.query(ChatMessage).filter(ChatMessage.field_id == field_id).order_by(ChatMessage.created_at).all()
-    return [ChatMessageResponse.model_validate(m) for m in msgs]
+    return json_response([ChatMessageResponse.model_validate(m) for m in msgs], list[ChatMessageResponse])
@@ -1,24 +1,30 @@
 """Crops router: CRUD for fields, generate plan."""
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import Text, cast
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..auth import get_current_user
+from ..config import settings
 from ..models import FarmerProfile, Field, CropRecommendation
-from ..schemas import FieldCreate, FieldUpdate, FieldResponse, CropPlan, CropRecommendationItem
+from ..schemas import PLAN_SCHEMA_VERSION, FieldCreate, FieldUpdate, FieldResponse, CropPlan, CropRecommendationItem
+from ..fast_json import json_response, raw_json_response
 from ..crop_rules import generate_plan
+from ..llm_providers import ai_plans_enabled
+from ..plan_jobs import plan_jobs
+from ..plan_render_cache import FULL_PLAN, plan_render_cache
 from ..recommendation_engine import fetch_weather, generate_recommendations, score_single_crop
+from ..serializers import field_to_response
 
 router = APIRouter(prefix="/api/crops", tags=["crops"])
 
-
 @router.get("", response_model=list[FieldResponse])
 def list_crops(
     farmer: FarmerProfile = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     fields = db.query(Field).filter(Field.farmer_id == farmer.id).order_by(Field.created_at.desc()).all()
-    return [_field_to_response(f) for f in fields]
+    return json_response([field_to_response(f) for f in fields], list[FieldResponse])
 
 
 @router.post("", response_model=FieldResponse)
@@ -90,7 +96,9 @@ def create_crop(
         )
         db.commit()
 
-    return _field_to_response(field)
+    # The rule-based plan is returned now; the AI plan is generated in the background.
+    job_id = plan_jobs.enqueue(field)[0].id if ai_plans_enabled() else None
+    return field_to_response(field, plan_job_id=job_id)
 
 
 @router.put("/{field_id}", response_model=FieldResponse)
@@ -105,7 +113,8 @@ def update_crop(
         raise HTTPException(status_code=404, detail="Crop not found")
     for k, v in body.model_dump(exclude_unset=True).items():
         setattr(field, k, v)
-    if any(k in body.model_dump(exclude_unset=True) for k in ["land_area_acres", "soil_type", "crop_name", "water_availability", "investment_level"]):
+    plan_inputs_changed = any(k in body.model_dump(exclude_unset=True) for k in ["land_area_acres", "soil_type", "crop_name", "water_availability", "investment_level"])
+    if plan_inputs_changed:
         plan = generate_plan(
             land_area_acres=field.land_area_acres,
             soil_type=field.soil_type,
@@ -115,8 +124,11 @@ def update_crop(
         )
         field.plan_json = plan
     db.commit()
+    if plan_inputs_changed:
+        plan_render_cache.invalidate(field.id)
     db.refresh(field)
-    return _field_to_response(field)
+    job_id = plan_jobs.enqueue(field)[0].id if plan_inputs_changed and ai_plans_enabled() else None
+    return field_to_response(field, plan_job_id=job_id)
 
 
 @router.delete("/{field_id}")
@@ -130,6 +142,7 @@ def delete_crop(
         raise HTTPException(status_code=404, detail="Crop not found")
     db.delete(field)
     db.commit()
+    plan_render_cache.invalidate(field_id)
     return {"success": True}
 
 
@@ -139,9 +152,26 @@ def get_plan(
     farmer: FarmerProfile = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    field = db.query(Field).filter(Field.id == field_id, Field.farmer_id == farmer.id).first()
-    if not field:
+    row = (
+        db.query(Field.plan_version, Field.plan_schema_version)
+        .filter(Field.id == field_id, Field.farmer_id == farmer.id)
+        .first()
+    )
+    if not row:
         raise HTTPException(status_code=404, detail="Crop not found")
+    version = row.plan_version or 0
+    cached = plan_render_cache.get(field_id, version, FULL_PLAN)
+    if cached is not None:
+        return raw_json_response(cached)
+
+    # Flagged plans were checked against CropPlan when written: send the stored bytes unparsed.
+    if settings.fast_json_responses and row.plan_schema_version == PLAN_SCHEMA_VERSION:
+        raw_plan = db.query(cast(Field.plan_json, Text)).filter(Field.id == field_id).scalar()
+        if raw_plan:
+            plan_render_cache.set(field_id, version, FULL_PLAN, raw_plan.encode("utf-8"))
+            return raw_json_response(raw_plan)
+
+    field = db.get(Field, field_id)
     if not field.plan_json:
         plan = generate_plan(
             land_area_acres=field.land_area_acres,
@@ -152,7 +182,15 @@ def get_plan(
         )
         field.plan_json = plan
         db.commit()
-    return CropPlan(**field.plan_json)
+    plan = CropPlan(**field.plan_json)
+    if field.plan_schema_version != PLAN_SCHEMA_VERSION:
+        field.plan_json = plan.model_dump(mode="json")  # stored before the flag existed: rewrite it flagged
+        db.commit()
+    if not plan_render_cache.enabled:
+        return plan
+    body = plan.model_dump_json().encode("utf-8")
+    plan_render_cache.set(field_id, field.plan_version or 0, FULL_PLAN, body)
+    return raw_json_response(body)
 
 
 @router.get("/{field_id}/score", response_model=CropRecommendationItem)
@@ -186,17 +224,3 @@ def get_crop_score(
         weather=weather,
     )
     return CropRecommendationItem(**score)
-
-
-def _field_to_response(f: Field) -> FieldResponse:
-    return FieldResponse(
-        id=f.id,
-        name=f.name,
-        land_area_acres=f.land_area_acres,
-        soil_type=f.soil_type,
-        crop_name=f.crop_name,
-        water_availability=f.water_availability,
-        investment_level=f.investment_level,
-        created_at=f.created_at,
-        plan=CropPlan(**f.plan_json) if f.plan_json else None,
-    )
@@ -1,14 +1,25 @@
-"""Plan router: get full plan with weather placeholder."""
+"""Plan router: get full plan with forecast-adjusted upcoming days, AI plan job status."""
+import asyncio
+import hashlib
+import json
 from datetime import datetime
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.orm import Session, defer
+from sqlalchemy.orm.attributes import flag_modified
 
 from ..database import get_db
 from ..auth import get_current_user
-from ..models import FarmerProfile, Field
-from ..schemas import PlanResponse, CropPlan, WeatherPlaceholder
-from ..ai_crop_planner import generate_ai_crop_plan, ensure_plan_images
+from ..config import settings
+from ..models import FarmerProfile, Field, CropRecommendation
+from ..schemas import PlanResponse, PlanJobResponse, CropPlan, WeatherPlaceholder
+from ..ai_crop_planner import ensure_plan_images
+from ..crop_rules import generate_plan
+from ..fast_json import json_response
+from ..plan_jobs import FAILED, SUCCEEDED, PlanJobState, plan_jobs
+from ..plan_render_cache import plan_render_cache
+from ..plan_weather import adjustments_for, apply_weather_overlay
+from ..recommendation_engine import WeatherSummary, cached_weather
 
 router = APIRouter(prefix="/api/plan", tags=["plan"])
 
@@ -21,40 +32,80 @@ async def get_plan(
     farmer: FarmerProfile = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    field = db.query(Field).filter(Field.id == field_id, Field.farmer_id == farmer.id).first()
+    field = (
+        db.query(Field)
+        .options(defer(Field.plan_json))  # not needed when the rendered plan is cached
+        .filter(Field.id == field_id, Field.farmer_id == farmer.id)
+        .first()
+    )
     if not field:
         raise HTTPException(status_code=404, detail="Crop/Field not found")
     selected_crop = (crop_name or field.crop_name).strip() or field.crop_name
     plan_month = month if month and month > 0 else 1
+
+    rec = (
+        db.query(CropRecommendation.location)
+        .filter(CropRecommendation.farmer_id == farmer.id, CropRecommendation.field_id == field.id)
+        .order_by(CropRecommendation.created_at.desc())
+        .first()
+    )
+    # Cache only: a plan read never waits on OpenWeather. With no known location or
+    # no cached forecast there is no overlay and no badge.
+    weather = cached_weather(rec.location) if rec else None
+    adjustments = adjustments_for(weather, settings.plan_weather_overlay_days) if weather else {}
+    now = datetime.now()
+    envelope = dict(
+        crop_name=selected_crop,
+        weather=_weather_badge(weather) if weather else None,
+        current_date=now.strftime("%d %b %Y"),
+        current_time=now.strftime("%I:%M %p"),
+        duration_progress=min(1.0, 0.15),
+    )
+
+    # The stored plan for the field's own crop is rendered once per plan version, month and forecast overlay.
+    own_crop = selected_crop.lower() == field.crop_name.lower()
+    render_key = _render_key(plan_month, adjustments)
+    if own_crop:
+        cached = plan_render_cache.get(field.id, field.plan_version or 0, render_key)
+        if cached is not None:
+            return _spliced_response(PlanResponse.model_construct(**envelope), cached)
+
     should_regenerate = (
         not field.plan_json
         or not isinstance(field.plan_json, dict)
         or not field.plan_json.get("monthly_plans")
-        or selected_crop.lower() != field.crop_name.lower()
+        or not own_crop
     )
 
+    plan_job = None
     if should_regenerate:
-        try:
-            plan = await generate_ai_crop_plan(
-                land_area_acres=field.land_area_acres,
-                soil_type=field.soil_type,
-                crop_name=selected_crop,
-                water_availability=field.water_availability,
-                investment_level=field.investment_level,
-            )
-        except ValueError as exc:
-            raise HTTPException(status_code=400, detail=str(exc)) from exc
-        except RuntimeError as exc:
-            raise HTTPException(status_code=503, detail=str(exc)) from exc
-        if selected_crop.lower() == field.crop_name.lower():
-            field.plan_json = plan
-            db.commit()
+        job, _ = await asyncio.to_thread(plan_jobs.enqueue, field, selected_crop)
+        job = await plan_jobs.wait(job.id, settings.plan_job_wait_seconds)
+        if job is not None and job.status == SUCCEEDED:
+            plan = job.result_json
+        elif job is not None and job.status == FAILED:
+            raise HTTPException(status_code=503 if job.retryable else 400, detail=job.error)
+        else:
+            # Still generating (or the job row is already gone): serve the rule-based plan
+            # and let the client poll the job.
+            plan_job = _job_response(job) if job is not None else None
+            if own_crop and field.plan_json:
+                plan = field.plan_json
+            else:
+                plan = generate_plan(
+                    land_area_acres=field.land_area_acres,
+                    soil_type=field.soil_type,
+                    crop_name=selected_crop,
+                    water_availability=field.water_availability,
+                    investment_level=field.investment_level,
+                )
     else:
         plan = field.plan_json
 
     plan, images_changed = ensure_plan_images(plan, selected_crop)
-    if images_changed and selected_crop.lower() == field.crop_name.lower():
+    if images_changed and own_crop and not plan_job:
         field.plan_json = plan
+        flag_modified(field, "plan_json")  # changed in place
         db.commit()
 
     monthly_plans = plan.get("monthly_plans") or []
@@ -65,14 +116,65 @@ async def get_plan(
         )
         plan["day_plan"] = selected_month.get("day_plan", [])
 
-    now = datetime.now()
-    plan = CropPlan(**plan)
-    progress = min(1.0, 0.15)
-    return PlanResponse(
-        crop_name=selected_crop,
-        weather=WeatherPlaceholder(),
-        current_date=now.strftime("%d %b %Y"),
-        current_time=now.strftime("%I:%M %p"),
-        duration_progress=progress,
-        plan=plan,
+    plan_view = dict(plan)
+    plan_view["day_plan"], applied = apply_weather_overlay(plan.get("day_plan") or [], adjustments)
+    response = PlanResponse(
+        **envelope,
+        plan=CropPlan(**plan_view),
+        weather_adjustments=applied,
+        plan_job=plan_job,
     )
+    if should_regenerate or not plan_render_cache.enabled:
+        return json_response(response)
+    fragment = response.model_dump_json(include=_RENDERED_FIELDS).encode("utf-8")
+    plan_render_cache.set(field.id, field.plan_version or 0, render_key, fragment)
+    return _spliced_response(response, fragment)
+
+
+@router.get("/jobs/{job_id}", response_model=PlanJobResponse)
+def get_plan_job(
+    job_id: str,
+    farmer: FarmerProfile = Depends(get_current_user),
+):
+    job = plan_jobs.get(job_id)
+    if not job or job.farmer_id != farmer.id:
+        raise HTTPException(status_code=404, detail="Plan job not found")
+    return _job_response(job)
+
+
+def _job_response(job: PlanJobState) -> PlanJobResponse:
+    return PlanJobResponse(
+        id=job.id,
+        field_id=job.field_id,
+        crop_name=job.crop_name,
+        status=job.status,
+        attempts=job.attempts,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+_RENDERED_FIELDS = {"plan", "weather_adjustments"}
+
+
+def _render_key(month: int, adjustments: Dict[str, Any]) -> str:
+    """Render-cache month key; forecast adjustments change the rendered days, so they are part of it."""
+    if not adjustments:
+        return f"m{month}"
+    digest = hashlib.sha1(json.dumps(adjustments, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return f"m{month}-{digest}"
+
+
+def _spliced_response(envelope: PlanResponse, fragment: bytes) -> Response:
+    """Join the per-request fields with a cached {"plan": ..., "weather_adjustments": ...} fragment."""
+    head = envelope.model_dump_json(exclude=_RENDERED_FIELDS).encode("utf-8")
+    return Response(content=head[:-1] + b"," + fragment[1:], media_type="application/json")
+
+
+def _weather_badge(weather: WeatherSummary) -> WeatherPlaceholder:
+    if weather.source == "fallback":
+        return WeatherPlaceholder()
+    condition = weather.condition or "Clear"
+    icon = {"Rain": "cloud-rain", "Drizzle": "cloud-rain", "Thunderstorm": "cloud-lightning", "Clouds": "cloud"}.get(condition, "sun")
+    return WeatherPlaceholder(temp=f"{round(weather.temperature_c)}°C", condition=condition, icon=icon)
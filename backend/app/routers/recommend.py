@@ -1,17 +1,26 @@
 """Recommendation and weather APIs for AgriAI v2.0."""
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from ..auth import get_current_user
 from ..database import get_db
-from ..models import CropRecommendation, FarmerProfile, WeatherLog
+from ..fast_json import json_response
+from ..models import CropRecommendation, FarmerProfile, Field, WeatherLog
+from ..portfolio_allocator import allocate_portfolio
 from ..recommendation_engine import fetch_weather, generate_recommendations
+from ..risk_simulation import simulate_profit, simulation_seed
+from ..rotation_planner import plan_rotation
 from ..schemas import (
+    AllocationRequest,
+    AllocationResponse,
     RecommendationHistoryItem,
     RecommendRequest,
     RecommendResponse,
+    RotationRequest,
+    RotationResponse,
     WeatherResponse,
 )
+from ..serializers import history_item
 
 router = APIRouter(prefix="/api", tags=["recommendation"])
 
@@ -32,6 +41,30 @@ def recommend_crop(
         investment_level=body.investment_level,
         weather=weather,
     )
+    # The simulation is per request: returned in the response, not stored with the history row.
+    response_items = recommendations
+    if body.simulate:
+        seed = body.simulation_seed
+        if seed is None:
+            seed = simulation_seed(
+                body.soil_type, body.area_acres, body.season, body.water_availability,
+                body.investment_level, weather.temperature_c, weather.rainfall_mm,
+            )
+        simulations = simulate_profit(
+            crop_names=[item["crop_name"] for item in recommendations],
+            soil_type=body.soil_type,
+            area_acres=body.area_acres,
+            season=body.season,
+            water_availability=body.water_availability,
+            investment_level=body.investment_level,
+            weather=weather,
+            samples=body.simulation_samples,
+            seed=seed,
+        )
+        response_items = [
+            {**item, "simulation": {k: v for k, v in sim.items() if k != "crop_name"}}
+            for item, sim in zip(recommendations, simulations)
+        ]
 
     db.add(
         WeatherLog(
@@ -80,7 +113,62 @@ def recommend_crop(
             condition=weather.condition,
             source=weather.source,
         ),
-        recommendations=recommendations,
+        recommendations=response_items,
+    )
+
+
+@router.post("/recommend/rotation", response_model=RotationResponse)
+def recommend_rotation(
+    body: RotationRequest,
+    farmer: FarmerProfile = Depends(get_current_user),
+):
+    seasons = [s.strip().lower() for s in body.seasons]
+    invalid = [s for s in seasons if s not in ("kharif", "rabi", "zaid")]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Unknown season(s): {', '.join(invalid)}")
+
+    result = plan_rotation(
+        soil_type=body.soil_type,
+        area_acres=body.area_acres,
+        location=body.location,
+        water_availability=body.water_availability,
+        investment_level=body.investment_level,
+        seasons=seasons,
+        water_budget=body.water_budget,
+        top_k=body.top_k,
+        risk_aversion=body.risk_aversion,
+    )
+    weather = result["weather"]
+    return RotationResponse(
+        weather=WeatherResponse(
+            location=weather.location,
+            temperature_c=weather.temperature_c,
+            rainfall_mm=weather.rainfall_mm,
+            condition=weather.condition,
+            source=weather.source,
+        ),
+        water_budget=result["water_budget"],
+        truncated=result["truncated"],
+        sequences=result["sequences"],
+    )
+
+
+@router.post("/recommend/allocation", response_model=AllocationResponse)
+def recommend_allocation(
+    body: AllocationRequest,
+    farmer: FarmerProfile = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    fields = db.query(Field).filter(Field.farmer_id == farmer.id).order_by(Field.id).all()
+    if not fields:
+        raise HTTPException(status_code=404, detail="No fields found for this farmer")
+    return allocate_portfolio(
+        farmer_id=farmer.id,
+        fields=fields,
+        location=body.location,
+        season=body.season,
+        investment_cap=body.investment_cap,
+        water_cap=body.water_cap,
     )
 
 
@@ -95,25 +183,8 @@ def recommend_history(
         query = query.filter(CropRecommendation.field_id == field_id)
     rows = query.order_by(CropRecommendation.created_at.desc()).limit(20).all()
 
-    result = []
-    for row in rows:
-        weather = row.weather_snapshot or None
-        result.append(
-            RecommendationHistoryItem(
-                id=row.id,
-                field_id=row.field_id,
-                soil_type=row.soil_type,
-                area_acres=row.area_acres,
-                location=row.location,
-                season=row.season,
-                water_availability=row.water_availability,
-                investment_level=row.investment_level,
-                weather=weather,
-                recommendations=row.top_recommendations or [],
-                created_at=row.created_at,
-            )
-        )
-    return result
+    result = [history_item(row) for row in rows]
+    return json_response(result, list[RecommendationHistoryItem])
 
 
 @router.get("/weather/{location}", response_model=WeatherResponse)
@@ -145,4 +216,5 @@ def weather_by_location(
         rainfall_mm=weather.rainfall_mm,
         condition=weather.condition,
         source=weather.source,
+        forecast=weather.series.aggregates if weather.series else None,
     )
@@ -0,0 +1,71 @@
+"""Delta sync router: rows changed since the client's cursor, with tombstones for deletes."""
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.orm import Session
+
+from ..auth import get_current_user
+from ..config import settings
+from ..database import get_db
+from ..fast_json import compressed_json_response
+from ..models import ChatMessage, CropRecommendation, FarmerProfile, Field
+from ..schemas import SyncChatMessage, SyncResponse, SyncTombstones
+from ..serializers import field_to_response, history_item
+from ..sync import CHAT_MESSAGE, FIELD, RECOMMENDATION, changes_since, missing_ids, split_upserts
+
+router = APIRouter(prefix="/api/sync", tags=["sync"])
+
+
+@router.get("", response_model=SyncResponse)
+def sync(
+    request: Request,
+    since: int = Query(0, ge=0, description="Cursor from the previous sync; 0 for a full download"),
+    limit: Optional[int] = Query(None, ge=1),
+    farmer: FarmerProfile = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    page_size = min(limit or settings.sync_page_size, settings.sync_max_page_size)
+    changes, cursor, has_more = changes_since(db, farmer.id, since, page_size, settings.sync_settle_seconds)
+
+    field_ids, deleted_fields = split_upserts(changes[FIELD])
+    fields = (
+        db.query(Field).filter(Field.id.in_(field_ids), Field.farmer_id == farmer.id).order_by(Field.id).all()
+        if field_ids else []
+    )
+    message_ids, deleted_messages = split_upserts(changes[CHAT_MESSAGE])
+    messages = (
+        db.query(ChatMessage)
+        .join(Field, ChatMessage.field_id == Field.id)
+        .filter(ChatMessage.id.in_(message_ids), Field.farmer_id == farmer.id)
+        .order_by(ChatMessage.id)
+        .all()
+        if message_ids else []
+    )
+    rec_ids, deleted_recs = split_upserts(changes[RECOMMENDATION])
+    recs = (
+        db.query(CropRecommendation)
+        .filter(CropRecommendation.id.in_(rec_ids), CropRecommendation.farmer_id == farmer.id)
+        .order_by(CropRecommendation.id)
+        .all()
+        if rec_ids else []
+    )
+
+    response = SyncResponse(
+        cursor=cursor,
+        has_more=has_more,
+        fields=[field_to_response(f) for f in fields],
+        chat_messages=[
+            SyncChatMessage(id=m.id, field_id=m.field_id, role=m.role, content=m.content, created_at=m.created_at)
+            for m in messages
+        ],
+        recommendations=[history_item(r) for r in recs],
+        deleted=SyncTombstones(
+            fields=deleted_fields + missing_ids(field_ids, (f.id for f in fields)),
+            chat_messages=deleted_messages + missing_ids(message_ids, (m.id for m in messages)),
+            recommendations=deleted_recs + missing_ids(rec_ids, (r.id for r in recs)),
+        ),
+    )
+    return compressed_json_response(
+        response.model_dump_json().encode("utf-8"),
+        request.headers.get("accept-encoding", ""),
+        settings.sync_gzip_min_bytes,
+    )
@@ -1,7 +1,7 @@
 """Pydantic schemas for request/response."""
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional, List
+from pydantic import BaseModel, Field, ValidationError
 
 
 class AuthVerifyRequest(BaseModel):
@@ -68,6 +68,19 @@ class CropPlan(BaseModel):
     day_plan: List[DayPlanItem]
 
 
+# Bump when CropPlan or its nested models change shape: stored plans flagged with an
+# older version are validated again instead of being sent as stored.
+PLAN_SCHEMA_VERSION = 1
+
+
+def canonical_plan(plan: Any) -> Optional[Dict[str, Any]]:
+    """`plan` as CropPlan serializes it (every key, model value types), or None if it is not a valid plan."""
+    try:
+        return CropPlan.model_validate(plan).model_dump(mode="json")
+    except ValidationError:
+        return None
+
+
 class FieldResponse(BaseModel):
     id: int
     name: str
@@ -78,6 +91,7 @@ class FieldResponse(BaseModel):
     investment_level: str
     created_at: datetime
     plan: Optional[CropPlan] = None
+    plan_job_id: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -109,13 +123,33 @@ class WeatherPlaceholder(BaseModel):
     icon: str = "sun"
 
 
+class PlanWeatherAdjustment(BaseModel):
+    day: int
+    date: str
+    kind: str
+    note: str
+
+
+class PlanJobResponse(BaseModel):
+    id: str
+    field_id: int
+    crop_name: str
+    status: str  # queued, running, succeeded, failed
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
 class PlanResponse(BaseModel):
     crop_name: str
-    weather: WeatherPlaceholder
+    weather: Optional[WeatherPlaceholder] = None  # only when a cached forecast for the field's location exists
     current_date: str
     current_time: str
     duration_progress: float
     plan: CropPlan
+    weather_adjustments: List[PlanWeatherAdjustment] = []
+    plan_job: Optional[PlanJobResponse] = None  # set while AI generation is still in progress
 
 
 class WeatherResponse(BaseModel):
@@ -124,6 +158,18 @@ class WeatherResponse(BaseModel):
     rainfall_mm: float
     condition: str
     source: str
+    forecast: Optional[Dict[str, Optional[float]]] = None
+
+
+class ProfitSimulation(BaseModel):
+    samples: int
+    profit_mean: int
+    profit_p10: int
+    profit_p50: int
+    profit_p90: int
+    probability_of_loss: float
+    risk_index: float
+    risk_score: str
 
 
 class CropRecommendationItem(BaseModel):
@@ -134,6 +180,7 @@ class CropRecommendationItem(BaseModel):
     estimated_investment_cost: int
     estimated_profit_min: int
     estimated_profit_max: int
+    simulation: Optional[ProfitSimulation] = None
 
 
 class RecommendRequest(BaseModel):
@@ -144,6 +191,9 @@ class RecommendRequest(BaseModel):
     water_availability: str = Field(..., pattern="^(low|medium|high)$")
     investment_level: str = Field(..., pattern="^(low|medium|high)$")
     field_id: Optional[int] = None
+    simulate: bool = False
+    simulation_samples: int = Field(10000, ge=100, le=50000)
+    simulation_seed: Optional[int] = None
 
 
 class RecommendResponse(BaseModel):
@@ -167,3 +217,89 @@ class RecommendationHistoryItem(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class RotationRequest(BaseModel):
+    soil_type: str = Field(..., min_length=1, max_length=50)
+    area_acres: float = Field(..., gt=0, le=1000)
+    location: str = Field(..., min_length=2, max_length=255)
+    water_availability: str = Field(..., pattern="^(low|medium|high)$")
+    investment_level: str = Field(..., pattern="^(low|medium|high)$")
+    seasons: List[str] = Field(default_factory=lambda: ["kharif", "rabi", "zaid"], min_length=1, max_length=6)
+    water_budget: Optional[int] = Field(None, ge=0, le=30)
+    top_k: int = Field(3, ge=1, le=10)
+    risk_aversion: float = Field(0.5, ge=0, le=1)
+
+
+class RotationStep(BaseModel):
+    season: str
+    crop_name: Optional[str] = None
+    status: str
+    duration_days: Optional[int] = None
+    suitability_score: Optional[int] = None
+    risk_score: Optional[str] = None
+    expected_profit: Optional[int] = None
+    estimated_investment_cost: Optional[int] = None
+
+
+class RotationSequence(BaseModel):
+    steps: List[RotationStep]
+    expected_profit: int
+    estimated_investment_cost: int
+    risk_index: float
+    objective: int
+
+
+class RotationResponse(BaseModel):
+    weather: WeatherResponse
+    water_budget: int
+    truncated: bool = False
+    sequences: List[RotationSequence]
+
+
+class AllocationRequest(BaseModel):
+    location: str = Field("Hyderabad", min_length=2, max_length=255)
+    season: str = Field("kharif", pattern="^(kharif|rabi|zaid)$")
+    investment_cap: float = Field(..., gt=0)
+    water_cap: Optional[float] = Field(None, ge=0)
+
+
+class FieldAllocation(BaseModel):
+    field_id: int
+    field_name: str
+    crop_name: Optional[str] = None
+    acres: float
+    fallow_acres: float
+    expected_profit: int
+    investment_cost: int
+    water_units: float
+
+
+class AllocationResponse(BaseModel):
+    allocations: List[FieldAllocation]
+    total_expected_profit: int
+    total_investment_cost: int
+    total_water_units: float
+    investment_cap: float
+    water_cap: float
+    solve_ms: float
+    cached: bool = False
+
+
+class SyncChatMessage(ChatMessageResponse):
+    field_id: int
+
+
+class SyncTombstones(BaseModel):
+    fields: List[int] = []
+    chat_messages: List[int] = []
+    recommendations: List[int] = []
+
+
+class SyncResponse(BaseModel):
+    cursor: int  # pass back as ?since= on the next call
+    has_more: bool  # more changes are waiting; call again with the new cursor
+    fields: List[FieldResponse] = []
+    chat_messages: List[SyncChatMessage] = []
+    recommendations: List[RecommendationHistoryItem] = []
+    deleted: SyncTombstones = SyncTombstones()
@@ -0,0 +1,36 @@
+"""ORM row -> response schema conversions shared by several routers."""
+from typing import Optional
+
+from .models import CropRecommendation, Field
+from .schemas import CropPlan, FieldResponse, RecommendationHistoryItem
+
+
+def field_to_response(f: Field, plan_job_id: Optional[str] = None) -> FieldResponse:
+    return FieldResponse(
+        id=f.id,
+        name=f.name,
+        land_area_acres=f.land_area_acres,
+        soil_type=f.soil_type,
+        crop_name=f.crop_name,
+        water_availability=f.water_availability,
+        investment_level=f.investment_level,
+        created_at=f.created_at,
+        plan=CropPlan(**f.plan_json) if f.plan_json else None,
+        plan_job_id=plan_job_id,
+    )
+
+
+def history_item(row: CropRecommendation) -> RecommendationHistoryItem:
+    return RecommendationHistoryItem(
+        id=row.id,
+        field_id=row.field_id,
+        soil_type=row.soil_type,
+        area_acres=row.area_acres,
+        location=row.location,
+        season=row.season,
+        water_availability=row.water_availability,
+        investment_level=row.investment_level,
+        weather=row.weather_snapshot or None,
+        recommendations=row.top_recommendations or [],
+        created_at=row.created_at,
+    )
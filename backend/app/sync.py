@@ -0,0 +1,143 @@
+"""
+Change log for offline clients: every committed write to a synced table
+appends a SyncChange row in the same transaction, and GET /api/sync replays
+the log from the client's cursor.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import event, insert, inspect as sa_inspect, select
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .models import ChatMessage, CropRecommendation, Field, SyncChange
+
+FIELD = "field"
+CHAT_MESSAGE = "chat_message"
+RECOMMENDATION = "recommendation"
+ENTITY_MODELS = {FIELD: Field, CHAT_MESSAGE: ChatMessage, RECOMMENDATION: CropRecommendation}
+_ENTITY_NAMES = {model: name for name, model in ENTITY_MODELS.items()}
+
+# Field columns that clients never see; writes touching only these are not logged.
+_UNSYNCED_FIELD_COLUMNS = {"chat_summary", "chat_summary_upto", "updated_at"}
+
+
+def _has_synced_changes(obj) -> bool:
+    if not isinstance(obj, Field):
+        return True
+    state = sa_inspect(obj)
+    return any(
+        state.attrs[prop.key].history.has_changes()
+        for prop in state.mapper.column_attrs
+        if prop.key not in _UNSYNCED_FIELD_COLUMNS
+    )
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _record_changes(session: Session, flush_context) -> None:
+    # new/dirty/deleted and attribute history still describe this flush here.
+    touched: List[Tuple[object, bool]] = (
+        [(obj, False) for obj in session.new]
+        + [(obj, False) for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+        + [(obj, True) for obj in session.deleted]
+    )
+    touched = [(obj, deleted) for obj, deleted in touched if type(obj) in _ENTITY_NAMES]
+    if not touched:
+        return
+
+    # Chat messages carry only field_id; resolve owners without lazy loads on flushed objects.
+    field_owners = {obj.id: obj.farmer_id for obj, _ in touched if isinstance(obj, Field)}
+    missing = {obj.field_id for obj, _ in touched if isinstance(obj, ChatMessage)} - field_owners.keys()
+    if missing:
+        result = session.connection().execute(select(Field.id, Field.farmer_id).where(Field.id.in_(missing)))
+        field_owners.update(result.all())
+
+    rows = []
+    for obj, deleted in touched:
+        if not deleted and not _has_synced_changes(obj):
+            continue
+        farmer_id = field_owners.get(obj.field_id) if isinstance(obj, ChatMessage) else obj.farmer_id
+        if farmer_id is None:
+            continue
+        rows.append({
+            "farmer_id": farmer_id,
+            "entity": _ENTITY_NAMES[type(obj)],
+            "entity_id": obj.id,
+            "deleted": deleted,
+        })
+    if rows:
+        session.connection().execute(insert(SyncChange), rows)
+
+
+def backfill_change_log() -> int:
+    """Seed an empty log with every existing row once, so a first sync (since=0) is an ordinary replay."""
+    db = SessionLocal()
+    try:
+        if db.query(SyncChange.id).first() is not None:
+            return 0
+        rows: List[Dict] = []
+        rows += [
+            {"farmer_id": farmer_id, "entity": FIELD, "entity_id": id_}
+            for id_, farmer_id in db.query(Field.id, Field.farmer_id).order_by(Field.id)
+        ]
+        rows += [
+            {"farmer_id": farmer_id, "entity": RECOMMENDATION, "entity_id": id_}
+            for id_, farmer_id in db.query(CropRecommendation.id, CropRecommendation.farmer_id).order_by(CropRecommendation.id)
+        ]
+        rows += [
+            {"farmer_id": farmer_id, "entity": CHAT_MESSAGE, "entity_id": id_}
+            for id_, farmer_id in (
+                db.query(ChatMessage.id, Field.farmer_id)
+                .join(Field, ChatMessage.field_id == Field.id)
+                .order_by(ChatMessage.id)
+            )
+        ]
+        if rows:
+            db.execute(insert(SyncChange), rows)
+            db.commit()
+        return len(rows)
+    finally:
+        db.close()
+
+
+def changes_since(
+    db: Session,
+    farmer_id: int,
+    cursor: int,
+    limit: int,
+    settle_seconds: float = 0.0,
+) -> Tuple[Dict[str, Dict[int, bool]], int, bool]:
+    """
+    Return ({entity: {entity_id: deleted}}, next_cursor, has_more) for one page
+    of the farmer's log. Repeated changes to a row collapse to its last state.
+    `settle_seconds` holds back very recent entries, for databases where a
+    later id can commit before an earlier one.
+    """
+    query = db.query(SyncChange.id, SyncChange.entity, SyncChange.entity_id, SyncChange.deleted).filter(
+        SyncChange.farmer_id == farmer_id, SyncChange.id > cursor
+    )
+    if settle_seconds > 0:
+        query = query.filter(SyncChange.created_at <= datetime.utcnow() - timedelta(seconds=settle_seconds))
+    rows = query.order_by(SyncChange.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    latest: Dict[str, Dict[int, bool]] = {entity: {} for entity in ENTITY_MODELS}
+    for _, entity, entity_id, deleted in rows:
+        if entity in latest:
+            latest[entity][entity_id] = deleted
+    return latest, (rows[-1].id if rows else cursor), has_more
+
+
+def split_upserts(changes: Dict[int, bool]) -> Tuple[List[int], List[int]]:
+    """(ids to re-send, tombstoned ids)."""
+    upserts = [entity_id for entity_id, deleted in changes.items() if not deleted]
+    tombstones = [entity_id for entity_id, deleted in changes.items() if deleted]
+    return upserts, tombstones
+
+
+def missing_ids(requested: Iterable[int], found: Iterable[int]) -> List[int]:
+    """Rows logged as changed but gone by now are reported as deleted."""
+    present = set(found)
+    return [entity_id for entity_id in requested if entity_id not in present]
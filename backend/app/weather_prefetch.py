@@ -0,0 +1,138 @@
+"""Background weather prefetch for active farmer locations."""
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+
+from .config import settings
+from .database import SessionLocal
+from .models import CropRecommendation
+from .recommendation_engine import refresh_weather
+
+# geo + current weather + forecast
+CALLS_PER_LOCATION = 3
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursting up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+def active_locations(days: int) -> List[str]:
+    """Distinct locations from recommendations made in the last `days` days."""
+    since = datetime.utcnow() - timedelta(days=days)
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(func.min(CropRecommendation.location))
+            .filter(CropRecommendation.created_at >= since)
+            .group_by(func.lower(func.trim(CropRecommendation.location)))
+            .all()
+        )
+        return [row[0] for row in rows if row[0]]
+    finally:
+        db.close()
+
+
+class WeatherPrefetcher:
+    """Keeps the weather cache warm for active locations through the morning window."""
+
+    def __init__(self):
+        per_second = max(1, settings.weather_api_calls_per_minute) / 60.0
+        self.bucket = TokenBucket(rate=per_second, capacity=max(CALLS_PER_LOCATION, settings.weather_api_calls_per_minute // 4))
+        self.runs = 0
+        self.last_run: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _refresh_one(self, location: str, semaphore: asyncio.Semaphore) -> bool:
+        async with semaphore:
+            await self.bucket.acquire(CALLS_PER_LOCATION)
+            summary = await asyncio.to_thread(refresh_weather, location)
+            return summary.source != "fallback"
+
+    async def run_once(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        locations = await asyncio.to_thread(active_locations, settings.weather_prefetch_active_days)
+        semaphore = asyncio.Semaphore(max(1, settings.weather_prefetch_concurrency))
+        results = await asyncio.gather(
+            *(self._refresh_one(loc, semaphore) for loc in locations), return_exceptions=True
+        )
+        refreshed = sum(1 for r in results if r is True)
+        self.runs += 1
+        self.last_run = {
+            "started_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "locations": len(locations),
+            "refreshed": refreshed,
+            "failed": len(locations) - refreshed,
+            "coverage": round(refreshed / len(locations), 4) if locations else 1.0,
+        }
+        return self.last_run
+
+    @staticmethod
+    def _seconds_until_next_run(now: datetime) -> float:
+        start, end = settings.weather_prefetch_start_hour, settings.weather_prefetch_end_hour
+        interval = timedelta(minutes=max(1, settings.weather_prefetch_interval_minutes))
+        window_start = now.replace(hour=start, minute=0, second=0, microsecond=0)
+        window_end = now.replace(hour=end, minute=0, second=0, microsecond=0)
+        if now < window_start:
+            target = window_start
+        elif now < window_end:
+            steps = (now - window_start) // interval + 1
+            target = window_start + steps * interval
+            if target >= window_end:
+                target = window_start + timedelta(days=1)
+        else:
+            target = window_start + timedelta(days=1)
+        return max(1.0, (target - now).total_seconds())
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._seconds_until_next_run(datetime.now()))
+            try:
+                await self.run_once()
+            except Exception:
+                self.last_run = {"started_at": datetime.utcnow().isoformat(timespec="seconds"), "error": True}
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> Dict[str, Any]:
+        return {"running": self._task is not None, "runs": self.runs, "last_run": self.last_run}
+
+
+prefetcher = WeatherPrefetcher()
@@ -0,0 +1,133 @@
+"""Compact array-backed forecast time series with precomputed rolling aggregates."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+STEP_HOURS = 3
+STEPS_PER_DAY = 24 // STEP_HOURS
+GDD_BASE_C = 10.0
+
+
+@dataclass(frozen=True)
+class DailyWeather:
+    date: date
+    rain_mm: float
+    temp_min_c: float
+    temp_max_c: float
+    wind_max_ms: float
+    humidity_mean: float
+    samples: int = STEPS_PER_DAY  # 3-hourly readings in this local day; fewer at the forecast edges
+
+
+class WeatherSeries:
+    """
+    3-hourly forecast for one location (OpenWeather `/forecast`, up to 40 steps).
+
+    Values live in float32 arrays; daily buckets and the rolling aggregates are
+    computed once at construction so readers never rescan the payload.
+    """
+
+    __slots__ = ("location", "timestamps", "temp_c", "humidity", "wind_ms", "rain_mm", "utc_offset", "aggregates", "daily")
+
+    def __init__(
+        self,
+        location: str,
+        timestamps: np.ndarray,
+        temp_c: np.ndarray,
+        humidity: np.ndarray,
+        wind_ms: np.ndarray,
+        rain_mm: np.ndarray,
+        utc_offset: int = 0,
+    ):
+        self.location = location
+        self.timestamps = timestamps.astype(np.int64)
+        self.temp_c = temp_c.astype(np.float32)
+        self.humidity = humidity.astype(np.float32)
+        self.wind_ms = wind_ms.astype(np.float32)
+        self.rain_mm = rain_mm.astype(np.float32)
+        self.utc_offset = utc_offset
+        self.daily = self._daily_buckets()
+        self.aggregates = self._aggregates()
+
+    @classmethod
+    def from_forecast(cls, location: str, payload: Dict[str, Any]) -> "WeatherSeries":
+        items = (payload or {}).get("list") or []
+        offset = int(((payload or {}).get("city") or {}).get("timezone") or 0)
+        n = len(items)
+        timestamps = np.empty(n, dtype=np.int64)
+        temp = np.empty(n, dtype=np.float32)
+        humidity = np.empty(n, dtype=np.float32)
+        wind = np.empty(n, dtype=np.float32)
+        rain = np.empty(n, dtype=np.float32)
+        for i, item in enumerate(items):
+            main = item.get("main") or {}
+            timestamps[i] = int(item.get("dt") or 0)
+            temp[i] = float(main.get("temp", np.nan))
+            humidity[i] = float(main.get("humidity", np.nan))
+            wind[i] = float((item.get("wind") or {}).get("speed", 0.0))
+            rain[i] = float((item.get("rain") or {}).get("3h", 0.0))
+        return cls(location, timestamps, temp, humidity, wind, rain, utc_offset=offset)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def rain_window(self, hours: int) -> float:
+        """Total rain over the first `hours` of the forecast."""
+        steps = max(0, hours // STEP_HOURS)
+        return round(float(self.rain_mm[:steps].sum()), 2)
+
+    def _daily_buckets(self) -> List[DailyWeather]:
+        if not len(self.timestamps):
+            return []
+        day_index = (self.timestamps + self.utc_offset) // 86400
+        starts = np.flatnonzero(np.r_[True, day_index[1:] != day_index[:-1]])
+        rain = np.add.reduceat(self.rain_mm, starts)
+        tmin = np.fmin.reduceat(self.temp_c, starts)
+        tmax = np.fmax.reduceat(self.temp_c, starts)
+        wind = np.fmax.reduceat(self.wind_ms, starts)
+        counts = np.diff(np.r_[starts, len(self.timestamps)])
+        humidity = np.add.reduceat(np.nan_to_num(self.humidity), starts) / counts
+        epoch = date(1970, 1, 1)
+        return [
+            DailyWeather(
+                date=epoch + timedelta(days=int(day_index[s])),
+                rain_mm=round(float(rain[i]), 2),
+                temp_min_c=round(float(tmin[i]), 1),
+                temp_max_c=round(float(tmax[i]), 1),
+                wind_max_ms=round(float(wind[i]), 1),
+                humidity_mean=round(float(humidity[i]), 1),
+                samples=int(counts[i]),
+            )
+            for i, s in enumerate(starts)
+        ]
+
+    def _aggregates(self) -> Dict[str, Optional[float]]:
+        if not len(self.timestamps):
+            return {}
+        # Partial days at the forecast edges would count a few hours as a whole day.
+        gdd = sum(
+            max(0.0, (d.temp_min_c + d.temp_max_c) / 2.0 - GDD_BASE_C)
+            for d in self.daily
+            if d.samples == STEPS_PER_DAY and np.isfinite(d.temp_min_c) and np.isfinite(d.temp_max_c)
+        )
+        return {
+            "rain_24h_mm": self.rain_window(24),
+            "rain_72h_mm": self.rain_window(72),
+            "rain_120h_mm": self.rain_window(120),
+            "temp_min_c": _finite(self.temp_c, np.nanmin),
+            "temp_max_c": _finite(self.temp_c, np.nanmax),
+            "humidity_mean": _finite(self.humidity, np.nanmean),
+            "wind_max_ms": _finite(self.wind_ms, np.nanmax),
+            "gdd_base10": round(gdd, 1),
+        }
+
+
+def _finite(values: np.ndarray, reduce) -> Optional[float]:
+    """Rounded NaN-ignoring reduction; None when the forecast has no readings for it (NaN is not valid JSON)."""
+    if not np.isfinite(values).any():
+        return None
+    return round(float(reduce(values[np.isfinite(values)])), 1)
@@ -0,0 +1,38 @@
+"""Benchmark the portfolio allocation solver on 50 fields x 100 crops.
+
+Run from backend/: python -m benchmarks.bench_allocation
+"""
+import statistics
+import time
+
+import numpy as np
+
+from app.portfolio_allocator import solve_allocation
+
+FIELDS = 50
+CROPS = 100
+REPEATS = 30
+
+
+def main() -> None:
+    rng = np.random.default_rng(7)
+    areas = rng.uniform(0.5, 20.0, FIELDS)
+    cost = rng.uniform(10000, 60000, (FIELDS, CROPS))
+    profit = cost * rng.uniform(0.3, 1.4, (FIELDS, CROPS))
+    profit[rng.random((FIELDS, CROPS)) < 0.6] = np.nan  # most crops do not suit a given soil
+    water = rng.integers(1, 4, CROPS).astype(float)
+    investment_cap = float((areas * 30000).sum() * 0.5)
+    water_cap = float(areas.sum() * 2)
+
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        solve_allocation(areas, profit, cost, water, investment_cap, water_cap)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{FIELDS} fields x {CROPS} crops: p50 {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
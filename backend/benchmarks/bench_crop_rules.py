@@ -0,0 +1,42 @@
+"""Microbenchmarks for the rule-based plan generator (crop_rules.generate_plan).
+
+Run from backend/: python -m benchmarks.bench_crop_rules
+"""
+import itertools
+import statistics
+import time
+
+from app.crop_rules import CROP_DB, _get_crop_data, generate_plan
+
+ITERATIONS = 20000
+NAMES = {
+    "exact": list(CROP_DB),
+    "display names": ["Paddy", "Basmati Rice", "Ground Nut", "Sugar cane", "Chick Pea"],
+    "unknown": ["dragonfruit", "saffron", "vanilla"],
+}
+
+
+def _bench(label: str, fn) -> None:
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            fn()
+        timings.append((time.perf_counter() - start) / ITERATIONS * 1e6)
+    print(f"{label:<34} {statistics.median(timings):8.2f} us/call")
+
+
+def main() -> None:
+    for group, names in NAMES.items():
+        it = itertools.cycle(names)
+        _bench(f"_get_crop_data ({group})", lambda: _get_crop_data(next(it)))
+    for group, names in NAMES.items():
+        it = itertools.cycle(names)
+        _bench(
+            f"generate_plan ({group})",
+            lambda: generate_plan(2.5, "black", next(it), "medium", "medium"),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Microbenchmarks for the CPU-bound request hot paths, with baseline comparison.
+
+Covers generate_recommendations (weather supplied, no network), the rule plan
+generator, AI plan normalization, JSON extraction from model output and the
+rule-based chatbot. Per-call latencies are reported as percentiles.
+
+Run from backend/:
+    python -m benchmarks.bench_hotpaths
+    python -m benchmarks.bench_hotpaths --save benchmarks/baselines/hotpaths.json
+    python -m benchmarks.bench_hotpaths --baseline benchmarks/baselines/hotpaths.json
+"""
+import argparse
+import itertools
+import json
+import time
+
+from app.ai_crop_planner import _extract_json_object, _normalize_plan
+from app.chatbot_rules import get_response
+from app.crop_rules import generate_plan
+from app.recommendation_engine import WeatherSummary, generate_recommendations
+
+from .report import BASELINE_DIR, add_arguments, finish, print_table, summarize
+
+WEATHER = WeatherSummary(location="Hyderabad", temperature_c=29.0, rainfall_mm=4.0, condition="Clouds")
+SOILS = ["black", "red", "alluvial", "laterite", "sandy"]
+CROPS = ["Wheat", "Paddy", "Cotton", "Sugarcane", "Groundnut", "Tomato"]
+MESSAGES = [
+    "When should I irrigate my wheat?",
+    "Which fertilizer for cotton at flowering?",
+    "leaves turning yellow, what pest is this",
+    "What is the market price this week?",
+    "How do I prepare the soil before sowing?",
+    "hello",
+]
+
+
+def _ai_output() -> str:
+    """A model reply as the planner sees it: prose and a fenced 12-month plan."""
+    plan = _normalize_plan({"duration_days": 365}, "Sugarcane", 365)
+    return "Here is the plan you asked for:\n```json\n" + json.dumps(plan) + "\n```\nLet me know if you need changes."
+
+
+def _cases():
+    soils = itertools.cycle(SOILS)
+    crops = itertools.cycle(CROPS)
+    messages = itertools.cycle(MESSAGES)
+    raw = _ai_output()
+    return {
+        "generate_recommendations": (
+            lambda: generate_recommendations(next(soils), 2.5, "Hyderabad", "kharif", "medium", "medium", weather=WEATHER),
+            5000,
+        ),
+        "crop_rules.generate_plan": (lambda: generate_plan(2.5, "black", next(crops), "medium", "medium"), 5000),
+        "_normalize_plan (120 days)": (lambda: _normalize_plan({"duration_days": 120}, next(crops), 120), 500),
+        "_normalize_plan (365 days)": (lambda: _normalize_plan({"duration_days": 365}, next(crops), 365), 200),
+        "_extract_json_object (365-day plan)": (lambda: _extract_json_object(raw), 200),
+        "chatbot_rules.get_response": (lambda: get_response(next(messages), next(crops)), 5000),
+    }
+
+
+def run(scale: float) -> dict:
+    results = {}
+    for name, (fn, iterations) in _cases().items():
+        iterations = max(10, int(iterations * scale))
+        for _ in range(min(50, iterations)):  # warm caches and branch predictors
+            fn()
+        timings = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            call_started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - call_started)
+        elapsed = time.perf_counter() - started
+        row = summarize(timings)
+        row["ops_per_sec"] = round(iterations / elapsed, 1)
+        results[name] = row
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply iteration counts (default 1.0)")
+    add_arguments(parser, BASELINE_DIR / "hotpaths.json")
+    args = parser.parse_args()
+
+    results = run(args.scale)
+    print_table("hot path", results)
+    finish(results, "hotpaths", {"scale": args.scale}, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark intent matching: per-pattern regex loop vs the compiled automaton at 5k intents.
+
+Run from backend/: python -m benchmarks.bench_intents
+"""
+import random
+import re
+import statistics
+import time
+
+from app.chatbot_rules import INTENT_ENGINE
+from app.intent_engine import Intent, IntentEngine
+
+INTENT_COUNT = 5000
+KEYWORDS_PER_INTENT = 3
+MESSAGES = 500
+ALPHABETS = ("abcdefghijklmnopqrstuvwxyz", "कखगघचजटडतदनपबमयरलवसह", "కగచజటడతదనపబమయరలవస")
+
+
+def _word(rng: random.Random) -> str:
+    alphabet = rng.choice(ALPHABETS)
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(4, 9)))
+
+
+def _build(rng: random.Random):
+    intents = [
+        Intent(f"intent_{i}", tuple(_word(rng) for _ in range(KEYWORDS_PER_INTENT)), i, f"reply {i}")
+        for i in range(INTENT_COUNT)
+    ]
+    messages = []
+    for _ in range(MESSAGES):
+        words = [_word(rng) for _ in range(rng.randint(6, 20))]
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words)), rng.choice(rng.choice(intents).keywords))
+        messages.append(" ".join(words))
+    return intents, messages
+
+
+def _time(fn, messages):
+    timings = []
+    for message in messages:
+        start = time.perf_counter()
+        fn(message)
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95)]
+
+
+def main() -> None:
+    rng = random.Random(7)
+    intents, messages = _build(rng)
+
+    start = time.perf_counter()
+    compiled_regexes = [(re.compile("|".join(map(re.escape, i.keywords))), i) for i in intents]
+    regex_build = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    engine = IntentEngine(intents)
+    engine_build = (time.perf_counter() - start) * 1000
+
+    def regex_loop(message):
+        for pattern, intent in compiled_regexes:
+            if pattern.search(message):
+                return intent
+        return None
+
+    print(f"{INTENT_COUNT} intents x {KEYWORDS_PER_INTENT} keywords, {MESSAGES} messages")
+    print(f"build: regex list {regex_build:.1f} ms, automaton {engine_build:.1f} ms")
+    for name, fn in (("regex loop", regex_loop), ("automaton", engine.best)):
+        p50, p95 = _time(fn, messages)
+        print(f"{name:>10}: p50 {p50:8.1f} us, p95 {p95:8.1f} us")
+    p50, p95 = _time(INTENT_ENGINE.best, messages)
+    print(f"chatbot_rules engine ({len(INTENT_ENGINE.intents)} intents): p50 {p50:.1f} us, p95 {p95:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Microbenchmarks for AI plan normalization and plan model construction on 12-month plans.
+
+Run from backend/: python -m benchmarks.bench_plan_normalize
+"""
+import json
+import statistics
+import time
+
+from app.ai_crop_planner import _normalize_plan
+from app.schemas import CropPlan
+
+ITERATIONS = 200
+MONTHS = 12
+
+
+def _ai_plan(days_per_month: int) -> dict:
+    """An AI response covering `days_per_month` days of each month; the rest gets filled in."""
+    return {
+        "crop_name": "Sugarcane",
+        "duration_days": MONTHS * 30,
+        "estimated_cost": 60000,
+        "expected_yield": "400-500 quintals per acre",
+        "estimated_profit": 90000,
+        "fertilizer_recommendations": ["NPK 20:20:20", "Urea", "Compost"],
+        "irrigation_guidance": "Irrigate every 7-10 days.",
+        "monthly_plans": [
+            {
+                "month_number": month,
+                "month_label": f"Month {month}",
+                "focus": "Growth and protection",
+                "day_plan": [
+                    {
+                        "day": day,
+                        "date": f"{day:02d}/01/2026",
+                        "title": "Irrigation check",
+                        "description": "Check soil moisture and irrigate in the early morning if the topsoil is dry.",
+                        "icon": "water",
+                    }
+                    for day in range(1, days_per_month + 1)
+                ],
+            }
+            for month in range(1, MONTHS + 1)
+        ],
+    }
+
+
+def _bench(label: str, fn) -> None:
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            fn()
+        timings.append((time.perf_counter() - start) / ITERATIONS * 1e3)
+    print(f"{label:<40} {statistics.median(timings):8.3f} ms/call")
+
+
+def main() -> None:
+    for label, days in (("empty AI months", 0), ("half-filled AI months", 15), ("full AI months", 31)):
+        raw = _ai_plan(days)
+        _bench(f"_normalize_plan ({label})", lambda: _normalize_plan(raw, "Sugarcane", 120))
+
+    # Plans read back from the database are plain JSON.
+    stored = json.loads(json.dumps(_normalize_plan(_ai_plan(15), "Sugarcane", 120)))
+    _bench("CropPlan.model_validate", lambda: CropPlan.model_validate(stored))
+    validated = CropPlan.model_validate(stored)
+    _bench("model_dump_json", validated.model_dump_json)
+
+
+if __name__ == "__main__":
+    main()
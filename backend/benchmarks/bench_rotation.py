@@ -0,0 +1,57 @@
+"""Benchmark the rotation optimizer as the crop catalogue grows.
+
+Run from backend/: python -m benchmarks.bench_rotation
+"""
+import random
+import statistics
+import time
+
+from app.rotation_planner import DEFAULT_SEASON_ORDER, optimize_rotation
+
+CATALOGUE_SIZES = [12, 50, 200, 1000]
+REPEATS = 20
+
+
+def _synthetic_scores(size: int, rng: random.Random):
+    season_scores = []
+    durations = {}
+    water_needs = {}
+    for season in DEFAULT_SEASON_ORDER:
+        items = []
+        for idx in range(size):
+            name = f"Crop{idx}"
+            durations[name] = rng.choice([80, 90, 100, 110, 120, 150, 180, 365])
+            water_needs[name] = rng.choice(["low", "medium", "high"])
+            score = rng.randint(40, 99)
+            low = rng.randint(5000, 30000)
+            items.append(
+                {
+                    "crop_name": name,
+                    "suitability_score": score,
+                    "risk_score": "Low" if score >= 80 else "Medium" if score >= 60 else "High",
+                    "estimated_investment_cost": rng.randint(10000, 60000),
+                    "estimated_profit_min": low,
+                    "estimated_profit_max": low + rng.randint(5000, 40000),
+                }
+            )
+        season_scores.append((season, items))
+    return season_scores, durations, water_needs
+
+
+def main() -> None:
+    rng = random.Random(42)
+    print(f"{'crops':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for size in CATALOGUE_SIZES:
+        season_scores, durations, water_needs = _synthetic_scores(size, rng)
+        timings = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            optimize_rotation(season_scores, water_budget=6, top_k=5, durations=durations, water_needs=water_needs)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{size:>6} {statistics.median(timings):>9.2f} {p95:>9.2f} {timings[-1]:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Before/after latency of response serialization for large payloads.
+
+"default" is FastAPI's path for a returned model (response field validate +
+serialize, then JSONResponse/json.dumps); "fast" is fast_json.json_response;
+"raw" sends a stored plan's JSON text as-is.
+
+Run from backend/: python -m benchmarks.bench_serialization
+"""
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.ai_crop_planner import _normalize_plan
+from app.config import settings
+from app.fast_json import default_response_class, json_response, loads, raw_json_response
+from app.schemas import ChatMessageResponse, CropPlan, FieldResponse, PlanResponse, WeatherPlaceholder
+
+ITERATIONS = 200
+
+
+def _bench(label: str, fn) -> None:
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            fn()
+        timings.append((time.perf_counter() - start) / ITERATIONS * 1e3)
+    print(f"{label:<48} {statistics.median(timings):8.3f} ms/call")
+
+
+def _default_path(value, annotation):
+    field = create_response_field(name="response", type_=annotation)
+    loop = asyncio.new_event_loop()
+
+    def run():
+        content = loop.run_until_complete(serialize_response(field=field, response_content=value, is_coroutine=True))
+        return JSONResponse(content).body
+
+    return run
+
+
+def main() -> None:
+    settings.fast_json_responses = True
+    plan_dict = json.loads(json.dumps(_normalize_plan({"duration_days": 365}, "Sugarcane", 120)))
+    plan = CropPlan.model_validate(plan_dict)
+    now = datetime.now()
+    payloads = {
+        "12-month plan": (
+            PlanResponse(
+                crop_name="Sugarcane",
+                weather=WeatherPlaceholder(),
+                current_date="01 Jan 2026",
+                current_time="09:00 AM",
+                duration_progress=0.15,
+                plan=plan,
+            ),
+            PlanResponse,
+        ),
+        "20 fields with 12-month plans": (
+            [
+                FieldResponse(
+                    id=i,
+                    name=f"Field {i}",
+                    land_area_acres=2.5,
+                    soil_type="black",
+                    crop_name="Sugarcane",
+                    water_availability="medium",
+                    investment_level="medium",
+                    created_at=now,
+                    plan=plan,
+                )
+                for i in range(20)
+            ],
+            list[FieldResponse],
+        ),
+        "200 chat messages": (
+            [
+                ChatMessageResponse(id=i, role="assistant", content="Irrigate early in the morning. " * 8, created_at=now)
+                for i in range(200)
+            ],
+            list[ChatMessageResponse],
+        ),
+    }
+    for name, (value, annotation) in payloads.items():
+        _bench(f"{name}: default", _default_path(value, annotation))
+        _bench(f"{name}: fast", lambda: json_response(value, annotation).body)
+
+    raw = json.dumps(plan_dict)
+    response_class = default_response_class()
+    _bench("stored plan: validate + encode", lambda: JSONResponse(CropPlan.model_validate(json.loads(raw)).model_dump(mode="json")).body)
+    _bench(f"stored plan: decode + {response_class.__name__}", lambda: response_class(loads(raw)).body)
+    _bench("stored plan: raw passthrough (flagged at write)", lambda: raw_json_response(raw).body)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Benchmark the Monte Carlo profit simulation (10k samples x top-k crops).
+
+Run from backend/: python -m benchmarks.bench_simulation
+"""
+import statistics
+import time
+
+from app.recommendation_engine import BASE_FINANCIALS, WeatherSummary
+from app.risk_simulation import DEFAULT_SAMPLES, simulate_profit
+
+REPEATS = 30
+
+
+def main() -> None:
+    weather = WeatherSummary(location="Hyderabad", temperature_c=29.0, rainfall_mm=4.0, condition="Clouds")
+    catalogue = list(BASE_FINANCIALS)
+    for k in (3, len(catalogue)):
+        timings = []
+        for seed in range(REPEATS):
+            start = time.perf_counter()
+            simulate_profit(catalogue[:k], "black", 5.0, "kharif", "medium", "medium", weather, DEFAULT_SAMPLES, seed)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{DEFAULT_SAMPLES} samples x {k:>2} crops: p50 {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
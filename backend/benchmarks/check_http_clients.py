@@ -0,0 +1,63 @@
+"""Check that requests through the shared async and sync HTTP clients complete.
+
+Serves a local HTTP endpoint and sends requests through
+http_clients.async_client() and sync_client(), so a broken event hook or
+trace callback fails here instead of silently sending every LLM call to
+the rule-based fallback. Exits 1 on failure.
+
+Run from backend/: python -m benchmarks.check_http_clients
+"""
+import asyncio
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.http_clients import HUGGINGFACE, OPENWEATHER, http_clients, timeout
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def _check_async(url: str) -> None:
+    client = http_clients.async_client(HUGGINGFACE)
+    for _ in range(3):
+        response = await client.get(url, timeout=timeout(5.0))
+        assert response.status_code == 200 and response.json() == {"ok": True}, response.text
+    await http_clients.aclose()
+
+
+def main() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/ping"
+    try:
+        asyncio.run(_check_async(url))
+        response = http_clients.sync_client(OPENWEATHER).get(url, timeout=timeout(5.0))
+        assert response.status_code == 200, response.text
+        upstreams = http_clients.snapshot()["upstreams"]
+        for name in (HUGGINGFACE, OPENWEATHER):
+            stats = upstreams[name]
+            assert stats["requests"] >= 1 and stats["new_connections"] >= 1, (name, stats)
+    except Exception as exc:
+        print(f"FAILED: {exc!r}")
+        sys.exit(1)
+    finally:
+        server.shutdown()
+    print("ok: async and sync shared clients completed requests", upstreams)
+
+
+if __name__ == "__main__":
+    main()
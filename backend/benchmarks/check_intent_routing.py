@@ -0,0 +1,63 @@
+"""Check which chat messages the intent router answers locally and which go to the LLM.
+
+Greetings, thanks and recommendation phrases on their own are answered from
+the rules; the same words followed by a real question must reach the LLM.
+Exits 1 on failure.
+
+Run from backend/: python -m benchmarks.check_intent_routing
+"""
+import sys
+
+from app.config import settings
+from app.intent_router import route_message
+
+RECOMMENDATIONS = [{"crop_name": "Cotton", "estimated_profit_max": 90000, "risk_score": "Low"}]
+
+LOCAL = {
+    "hi": "greeting",
+    "hello agriai": "greeting",
+    "namaste ji": "greeting",
+    "thanks": "thanks",
+    "ok thanks": "thanks",
+    "thank you so much!": "thanks",
+    "thanks for the help": "thanks",
+    "which crop is best for me": "best_crop",
+    "best crop?": "best_crop",
+    "which crop gives high profit?": "high_profit",
+    "which crop needs less water": "less_water",
+}
+
+LLM = [
+    "thanks! what fertilizer now?",
+    "thank you, when do I spray for bollworm?",
+    "thanks, what should i do about whitefly",
+    "hi what pest is this",
+    "best crop but how to prepare the soil for it?",
+    "hello?",
+    "hi, my cotton leaves are curling",
+]
+
+
+def main() -> None:
+    failures = []
+    for message, intent_id in LOCAL.items():
+        decision = route_message(message, RECOMMENDATIONS, settings.chat_router_min_confidence)
+        if (decision.route, decision.intent_id) != ("local", intent_id):
+            failures.append(f"{message!r}: expected local {intent_id}, got {decision}")
+    for message in LLM:
+        decision = route_message(message, RECOMMENDATIONS, settings.chat_router_min_confidence)
+        if decision.route != "llm":
+            failures.append(f"{message!r}: expected llm, got {decision}")
+    # Without stored recommendations only small talk is answered locally.
+    decision = route_message("which crop is best for me", None, settings.chat_router_min_confidence)
+    if decision.route != "llm":
+        failures.append(f"best_crop without recommendations: expected llm, got {decision}")
+
+    if failures:
+        print("FAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print(f"ok: {len(LOCAL)} local and {len(LLM) + 1} llm routes as expected")
+
+
+if __name__ == "__main__":
+    main()
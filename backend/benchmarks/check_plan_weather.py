@@ -0,0 +1,57 @@
+"""Check which plan tasks the forecast overlay annotates.
+
+Rain and wind adjustments are applied to every task on a date; only real
+irrigation and spraying tasks may pick up a note. The filler tasks of AI
+plans and the rule-based skeleton mention irrigation, pests or disease in
+their descriptions and must be left alone. Exits 1 on failure.
+
+Run from backend/: python -m benchmarks.check_plan_weather
+"""
+import sys
+
+from app.ai_crop_planner import _DEFAULT_ACTIVITIES
+from app.crop_rules import _PHASES
+from app.plan_weather import apply_weather_overlay
+
+DATE = "01/07/2026"
+ADJUSTMENTS = {
+    DATE: [
+        {"kind": "skip_irrigation", "note": "Skip irrigation: 12 mm rain forecast today."},
+        {"kind": "postpone_spraying", "note": "Windy (25 km/h): avoid spraying today."},
+    ]
+}
+
+UNTOUCHED = [f"Cotton: {title}|{description}" for title, description, _ in _DEFAULT_ACTIVITIES] + [
+    f"{title}|{description}" for _, _, title, description in _PHASES if "irrigation" not in title.lower()
+]
+IRRIGATION = ["Irrigation and fertilizer|Regular irrigation and top dressing.", "Cotton: Drip irrigation|Run drip for 2 hours."]
+SPRAYING = ["Cotton: Spray neem oil|Spray 5 ml/l against aphids.", "Fungicide application|Apply mancozeb 2 g/l."]
+
+
+def _kinds(task: str) -> set:
+    title, description = task.split("|")
+    item = {"day": 1, "date": DATE, "title": title, "description": description, "icon": "water"}
+    _, applied = apply_weather_overlay([item], ADJUSTMENTS)
+    return {adj["kind"] for adj in applied}
+
+
+def main() -> None:
+    failures = []
+    for task in UNTOUCHED:
+        if _kinds(task):
+            failures.append(f"{task!r}: expected no adjustment, got {_kinds(task)}")
+    for task in IRRIGATION:
+        if _kinds(task) != {"skip_irrigation"}:
+            failures.append(f"{task!r}: expected skip_irrigation, got {_kinds(task)}")
+    for task in SPRAYING:
+        if _kinds(task) != {"postpone_spraying"}:
+            failures.append(f"{task!r}: expected postpone_spraying, got {_kinds(task)}")
+
+    if failures:
+        print("FAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print(f"ok: {len(UNTOUCHED)} filler tasks untouched, {len(IRRIGATION) + len(SPRAYING)} tasks adjusted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Check that every crop the recommendation engine can suggest has its own plan data.
+
+The rotation planner packs seasons by crop duration; a crop missing from
+CROP_DB would silently get paddy's 120 days. Every crop of SOIL_CROP_MATRIX,
+SEASON_BONUS and BASE_FINANCIALS must resolve to its own CROP_DB entry.
+Exits 1 on failure.
+
+Run from backend/: python -m benchmarks.check_rotation_durations
+"""
+import sys
+
+from app.crop_rules import CROP_DB, _normalize_crop, _resolve_crop
+from app.recommendation_engine import BASE_FINANCIALS, SEASON_BONUS, SOIL_CROP_MATRIX
+from app.rotation_planner import crop_duration
+
+CANDIDATES = sorted(
+    {crop for table in (*SOIL_CROP_MATRIX.values(), *SEASON_BONUS.values()) for crop in table} | set(BASE_FINANCIALS)
+)
+
+
+def main() -> None:
+    failures = []
+    for crop in CANDIDATES:
+        key = _normalize_crop(crop)
+        resolved = _resolve_crop(key)
+        if resolved != key:
+            failures.append(f"{crop}: resolves to {resolved!r}, not its own entry")
+        elif crop_duration(crop) != CROP_DB[key]["duration"]:
+            failures.append(f"{crop}: duration {crop_duration(crop)}, expected {CROP_DB[key]['duration']}")
+
+    if failures:
+        print("FAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print(f"ok: {len(CANDIDATES)} candidate crops resolve to their own duration")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""End-to-end load test: virtual farmers drive the API with dev tokens against mocked upstreams.
+
+Starts the mock OpenWeather/HuggingFace server, launches the app with a
+throwaway SQLite database pointed at it (uvicorn subprocess, or in-process
+over ASGI with --in-process), seeds one farmer per virtual user, then runs a
+weighted request mix for --duration seconds and reports throughput and
+latency percentiles per scenario.
+
+Run from backend/:
+    python -m benchmarks.load_test --users 20 --duration 30
+    python -m benchmarks.load_test --save benchmarks/baselines/load.json
+    python -m benchmarks.load_test --baseline benchmarks/baselines/load.json
+    python -m benchmarks.load_test --url http://127.0.0.1:8000   # existing server (ENV=development)
+    python -m benchmarks.load_test --llm-provider template        # in-app template LLM, no mock HF
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from typing import Dict, List, Optional
+
+import httpx
+
+from . import mock_upstreams
+from .report import BASELINE_DIR, add_arguments, finish, print_table, summarize
+
+SOILS = ["black", "red", "alluvial", "laterite"]
+CROPS = ["Wheat", "Paddy", "Cotton", "Sugarcane", "Groundnut"]
+LOCATIONS = ["Hyderabad", "Pune", "Nagpur", "Guntur"]
+CHAT_MESSAGES = [
+    "When should I irrigate?",  # answered locally by the intent router
+    "Which fertilizer should I apply this month?",
+    "My leaves have brown spots after the rain, the lower ones first, what should I spray and when?",  # LLM
+    "Is it a good week to harvest given the forecast and current mandi prices?",  # LLM
+]
+
+# name -> weight; weights roughly follow the mobile app's request mix.
+SCENARIOS = {
+    "list_fields": 20,
+    "field_plan": 15,
+    "month_plan": 15,
+    "chat_history": 10,
+    "sync": 10,
+    "recommend": 10,
+    "chat": 10,
+    "crop_score": 5,
+    "weather": 5,
+}
+
+
+class VirtualFarmer:
+    def __init__(self, index: int, client: httpx.AsyncClient, seed: int):
+        self.client = client
+        self.headers = {"Authorization": f"Bearer dev_load{index}"}
+        self.rng = random.Random(seed * 1000 + index)
+        self.field_ids: List[int] = []
+        self.location = LOCATIONS[index % len(LOCATIONS)]
+
+    def _profile(self) -> Dict:
+        return {
+            "soil_type": self.rng.choice(SOILS),
+            "water_availability": self.rng.choice(["low", "medium", "high"]),
+            "investment_level": self.rng.choice(["low", "medium", "high"]),
+        }
+
+    async def setup(self, fields: int, job_timeout: float = 120.0) -> None:
+        jobs = []
+        for i in range(fields):
+            body = {"name": f"Field {i + 1}", "land_area_acres": round(self.rng.uniform(0.5, 6.0), 1),
+                    "crop_name": self.rng.choice(CROPS), "location": self.location, **self._profile()}
+            response = await self.client.post("/api/crops", json=body, headers=self.headers)
+            response.raise_for_status()
+            self.field_ids.append(response.json()["id"])
+            if response.json().get("plan_job_id"):
+                jobs.append(response.json()["plan_job_id"])
+        # Let the seeded AI plan jobs finish so the run measures steady state, not the initial queue.
+        deadline = time.monotonic() + job_timeout
+        for job_id in jobs:
+            while time.monotonic() < deadline:
+                job = (await self.client.get(f"/api/plan/jobs/{job_id}", headers=self.headers)).json()
+                if job.get("status") not in ("queued", "running"):
+                    break
+                await asyncio.sleep(0.25)
+        response = await self.client.post("/api/recommend", headers=self.headers, json={
+            "area_acres": 2.5, "location": self.location, "season": "kharif",
+            "field_id": self.field_ids[0], **self._profile(),
+        })
+        response.raise_for_status()
+
+    async def request(self, scenario: str) -> httpx.Response:
+        field_id = self.rng.choice(self.field_ids)
+        get, post, h = self.client.get, self.client.post, self.headers
+        if scenario == "list_fields":
+            return await get("/api/crops", headers=h)
+        if scenario == "field_plan":
+            return await get(f"/api/crops/{field_id}/plan", headers=h)
+        if scenario == "month_plan":
+            return await get(f"/api/plan/{field_id}", params={"month": self.rng.randint(1, 4)}, headers=h)
+        if scenario == "chat_history":
+            return await get(f"/api/chat/{field_id}/history", headers=h)
+        if scenario == "sync":
+            return await get("/api/sync", headers=h)
+        if scenario == "recommend":
+            return await post("/api/recommend", headers=h, json={
+                "area_acres": round(self.rng.uniform(0.5, 6.0), 1), "location": self.location,
+                "season": self.rng.choice(["kharif", "rabi", "zaid"]), **self._profile(),
+            })
+        if scenario == "chat":
+            return await post("/api/chat", headers=h, json={"field_id": field_id, "content": self.rng.choice(CHAT_MESSAGES)})
+        if scenario == "crop_score":
+            return await get(f"/api/crops/{field_id}/score", params={"location": self.location}, headers=h)
+        if scenario == "weather":
+            return await get(f"/api/weather/{self.location}", headers=h)
+        raise ValueError(scenario)
+
+
+async def _run_user(
+    farmer: VirtualFarmer,
+    measure_from: float,
+    deadline: float,
+    latencies: Dict[str, List[float]],
+    errors: Dict[str, int],
+) -> None:
+    names = list(SCENARIOS)
+    weights = list(SCENARIOS.values())
+    while time.perf_counter() < deadline:
+        scenario = farmer.rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        try:
+            response = await farmer.request(scenario)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        if started < measure_from:
+            continue
+        if ok:
+            latencies[scenario].append(time.perf_counter() - started)
+        else:
+            errors[scenario] += 1
+
+
+def _app_env(db_path: str, upstream_url: Optional[str], log_level: str, llm_provider: str) -> Dict[str, str]:
+    env = {
+        "ENV": "development",
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "LOG_LEVEL": log_level,
+        "WEATHER_PREFETCH_ENABLED": "false",
+        "LLM_PROVIDER": llm_provider,
+    }
+    if upstream_url:
+        env.update(OPENWEATHER_BASE_URL=upstream_url, HF_ROUTER_BASE_URL=upstream_url, WEATHER_API_KEY="mock", HF_TOKEN="mock")
+    return env
+
+
+async def _wait_healthy(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError("app did not become healthy")
+        await asyncio.sleep(0.2)
+
+
+async def _open_client(stack: AsyncExitStack, args, env: Dict[str, str]) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=args.users * 2, max_keepalive_connections=args.users * 2)
+    timeout = httpx.Timeout(args.request_timeout)
+    if args.url:
+        return await stack.enter_async_context(httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout))
+
+    if args.in_process:
+        # Settings are read at import time, so the environment must be in place first.
+        os.environ.update(env)
+        from app.main import app
+
+        await stack.enter_async_context(app.router.lifespan_context(app))
+        transport = httpx.ASGITransport(app=app)
+        return await stack.enter_async_context(
+            httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout)
+        )
+
+    port = args.port
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--no-access-log", "--log-level", "warning"],
+        env={**os.environ, **env},
+    )
+    stack.callback(server.wait)
+    stack.callback(server.terminate)
+    client = await stack.enter_async_context(
+        httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=timeout)
+    )
+    await _wait_healthy(client)
+    return client
+
+
+async def run(args) -> Dict[str, Dict[str, float]]:
+    async with AsyncExitStack() as stack:
+        upstream_url = None
+        if not args.url:
+            mocks = mock_upstreams.from_args(args)
+            upstream_url = mocks.start()
+            stack.callback(mocks.stop)
+        workdir = stack.enter_context(tempfile.TemporaryDirectory(prefix="agriai-load-"))
+        env = _app_env(os.path.join(workdir, "load.db"), upstream_url, args.app_log_level, args.llm_provider)
+        client = await _open_client(stack, args, env)
+
+        farmers = [VirtualFarmer(i, client, args.seed) for i in range(args.users)]
+        await asyncio.gather(*(f.setup(args.fields) for f in farmers))
+
+        latencies: Dict[str, List[float]] = defaultdict(list)
+        errors: Dict[str, int] = defaultdict(int)
+        start = time.perf_counter()
+        measure_from = start + args.warmup
+        deadline = measure_from + args.duration
+        await asyncio.gather(*(_run_user(f, measure_from, deadline, latencies, errors) for f in farmers))
+        elapsed = time.perf_counter() - measure_from
+
+    results = {name: summarize(latencies[name], errors[name], elapsed) for name in SCENARIOS}
+    results["all"] = summarize(
+        [v for values in latencies.values() for v in values], sum(errors.values()), elapsed
+    )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual farmers (closed loop)")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before measuring")
+    parser.add_argument("--fields", type=int, default=2, help="fields seeded per farmer")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--request-timeout", type=float, default=60.0)
+    parser.add_argument("--url", help="target an already running app instead of starting one (no mocks)")
+    parser.add_argument("--in-process", action="store_true", help="drive the app over ASGI in this process")
+    parser.add_argument("--port", type=int, default=8765, help="port for the uvicorn subprocess")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--app-log-level", default="WARNING")
+    parser.add_argument("--llm-provider", default="huggingface", choices=["huggingface", "template"],
+                        help="huggingface = mocked HF router with --hf-latency-ms; template = in-app deterministic LLM")
+    mock_upstreams.add_arguments(parser)
+    add_arguments(parser, BASELINE_DIR / "load.json")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print_table(f"scenario ({args.users} users, {args.duration:g}s)", results)
+    params = {k: v for k, v in vars(args).items() if k not in ("save", "baseline", "tolerance", "url", "port")}
+    finish(results, "load", params, args)
+
+
+if __name__ == "__main__":
+    main()
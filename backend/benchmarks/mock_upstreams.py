@@ -0,0 +1,181 @@
+"""Local stand-ins for OpenWeather and the HuggingFace router, with injected latency and errors.
+
+One threaded HTTP server answers both upstreams' paths, so point both base
+URLs at it:
+
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8900 HF_ROUTER_BASE_URL=http://127.0.0.1:8900 \\
+    WEATHER_API_KEY=mock HF_TOKEN=mock uvicorn app.main:app
+
+Run from backend/: python -m benchmarks.mock_upstreams --port 8900 --hf-latency-ms 800 --hf-error-rate 0.05
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+CHAT_REPLY = (
+    "Irrigate early in the morning and check the soil moisture at root depth first. "
+    "Apply the second nitrogen split after the next rain and scout for leaf spots twice a week."
+)
+
+
+@dataclass
+class UpstreamProfile:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+
+    def delay(self, rng: random.Random) -> float:
+        return max(0.0, self.latency_ms + rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+
+
+def _forecast(now: int) -> Dict[str, Any]:
+    return {
+        "city": {"timezone": 19800},
+        "list": [
+            {
+                "dt": now + i * 10800,
+                "main": {"temp": 27.0 + (i % 8) * 0.8, "humidity": 60 + (i % 5) * 4},
+                "wind": {"speed": 2.5},
+                "rain": {"3h": 1.2 if i % 6 == 0 else 0.0},
+            }
+            for i in range(40)
+        ],
+    }
+
+
+def _plan_reply(prompt: str) -> str:
+    crop = "Wheat"
+    for line in prompt.splitlines():
+        if line.strip().startswith("- Crop:"):
+            crop = line.split(":", 1)[1].strip()
+    return json.dumps({"crop_name": crop, "duration_days": 120, "estimated_cost": 42000, "monthly_plans": []})
+
+
+def _chat_completion(body: Dict[str, Any]) -> Dict[str, Any]:
+    messages = body.get("messages") or []
+    prompt = "\n".join(str(m.get("content", "")) for m in messages)
+    content = _plan_reply(prompt) if "Output JSON schema" in prompt else CHAT_REPLY
+    return {
+        "id": "mock",
+        "object": "chat.completion",
+        "model": body.get("model", "mock"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+    }
+
+
+class MockUpstreams:
+    def __init__(self, weather: UpstreamProfile, hf: UpstreamProfile, seed: int = 7):
+        self.weather = weather
+        self.hf = hf
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests: Dict[str, int] = {"weather": 0, "hf": 0, "errors": 0}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def _roll(self, profile: UpstreamProfile) -> Tuple[float, bool]:
+        with self._lock:
+            return profile.delay(self._rng), self._rng.random() < profile.error_rate
+
+    def respond(self, method: str, path: str, body: Optional[Dict[str, Any]]) -> Tuple[int, Any]:
+        upstream = "weather" if path.startswith(("/geo/", "/data/")) else "hf"
+        delay, fail = self._roll(self.weather if upstream == "weather" else self.hf)
+        with self._lock:
+            self.requests[upstream] += 1
+            self.requests["errors"] += fail
+        if delay:
+            time.sleep(delay)
+        if fail:
+            return 503, {"error": "injected failure"}
+
+        if path == "/geo/1.0/direct":
+            return 200, [{"name": "Hyderabad", "lat": 17.385, "lon": 78.4867, "country": "IN"}]
+        if path == "/data/2.5/weather":
+            return 200, {"main": {"temp": 29.4, "humidity": 62}, "weather": [{"main": "Clouds"}]}
+        if path == "/data/2.5/forecast":
+            return 200, _forecast(int(time.time()))
+        if method == "POST" and path == "/v1/chat/completions":
+            return 200, _chat_completion(body or {})
+        if method == "POST" and path.startswith(("/hf-inference/models/", "/models/")):
+            return 200, [{"generated_text": CHAT_REPLY}]
+        return 404, {"error": f"no mock for {method} {path}"}
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve on a background thread; returns the base URL (port 0 picks a free one)."""
+        mocks = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real upstreams
+
+            def _handle(self, method: str) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"null") if length else None
+                status, payload = mocks.respond(method, urlparse(self.path).path, body)
+                data = json.dumps(payload).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True  # client gave up, e.g. a cancelled hedge
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="mock-upstreams", daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}"
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--weather-latency-ms", type=float, default=80.0)
+    parser.add_argument("--weather-error-rate", type=float, default=0.0)
+    parser.add_argument("--hf-latency-ms", type=float, default=600.0)
+    parser.add_argument("--hf-error-rate", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="uniform +/- jitter applied to both upstreams")
+
+
+def from_args(args: argparse.Namespace) -> MockUpstreams:
+    return MockUpstreams(
+        weather=UpstreamProfile(args.weather_latency_ms, args.jitter_ms, args.weather_error_rate),
+        hf=UpstreamProfile(args.hf_latency_ms, args.jitter_ms, args.hf_error_rate),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_arguments(parser)
+    args = parser.parse_args()
+    mocks = from_args(args)
+    print(f"mock upstreams on {mocks.start(args.host, args.port)}  (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mocks.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Percentile summaries, result files and baseline comparison shared by the benchmark runners."""
+import json
+import math
+import platform
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+# Higher is better for these keys; every other numeric key is a latency (lower is better).
+_HIGHER_IS_BETTER = {"throughput_rps", "ops_per_sec"}
+_IGNORED_KEYS = {"count", "errors"}
+# Single samples; printed but too noisy to fail a run on.
+_REPORT_ONLY = {"max_ms"}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+def summarize(latencies_s: Iterable[float], errors: int = 0, elapsed_s: Optional[float] = None) -> Dict[str, float]:
+    """Latency percentiles in ms, plus throughput when the wall time is known."""
+    values = sorted(latencies_s)
+    summary = {
+        "count": len(values),
+        "errors": errors,
+        "p50_ms": round(percentile(values, 50) * 1e3, 3),
+        "p90_ms": round(percentile(values, 90) * 1e3, 3),
+        "p95_ms": round(percentile(values, 95) * 1e3, 3),
+        "p99_ms": round(percentile(values, 99) * 1e3, 3),
+        "max_ms": round((values[-1] if values else 0.0) * 1e3, 3),
+    }
+    if elapsed_s:
+        summary["throughput_rps"] = round(len(values) / elapsed_s, 2)
+    return summary
+
+
+def print_table(title: str, results: Dict[str, Dict[str, float]]) -> None:
+    columns = [c for c in ("count", "errors", "throughput_rps", "ops_per_sec", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+               if any(c in row for row in results.values())]
+    width = max([len(name) for name in results] + [len(title)])
+    print(f"{title:<{width}}  " + "  ".join(f"{c:>14}" for c in columns))
+    for name, row in results.items():
+        print(f"{name:<{width}}  " + "  ".join(f"{row.get(c, ''):>14}" for c in columns))
+
+
+def save(path: Path, kind: str, results: Dict[str, Dict[str, float]], params: Dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "kind": kind,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "params": params,
+        "results": results,
+    }
+    path.write_text(json.dumps(document, indent=2) + "\n")
+    print(f"\nsaved {path}")
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline_path: Path, tolerance: float) -> bool:
+    """
+    Print each metric against the baseline and return False if any moved the
+    wrong way by more than `tolerance` (0.2 = 20%). Baselines are machine
+    specific; compare runs from the same host and parameters.
+    """
+    baseline = json.loads(baseline_path.read_text())
+    print(f"\nvs baseline {baseline_path} ({baseline.get('created_at')}, {baseline.get('machine')})")
+    ok = True
+    for name, row in results.items():
+        base_row = baseline["results"].get(name)
+        if base_row is None:
+            print(f"  {name}: no baseline entry")
+            continue
+        for key, value in row.items():
+            base = base_row.get(key)
+            if key in _IGNORED_KEYS or not isinstance(base, (int, float)) or not base:
+                continue
+            change = (value - base) / base
+            worse = -change if key in _HIGHER_IS_BETTER else change
+            flag = "REGRESSION" if worse > tolerance and key not in _REPORT_ONLY else ""
+            ok = ok and not flag
+            print(f"  {name:<40} {key:<14} {base:>12} -> {value:>12}  {change:+7.1%} {flag}")
+        if row.get("errors", 0) > base_row.get("errors", 0):
+            print(f"  {name:<40} errors         {base_row.get('errors', 0):>12} -> {row['errors']:>12}  REGRESSION")
+            ok = False
+    return ok
+
+
+def finish(results: Dict[str, Dict[str, float]], kind: str, params: Dict, args) -> None:
+    """Common --save / --baseline handling; exits 1 on a regression so CI can gate on it."""
+    if args.save:
+        save(Path(args.save), kind, results, params)
+    if args.baseline:
+        if not compare(results, Path(args.baseline), args.tolerance):
+            sys.exit(1)
+
+
+def add_arguments(parser, default_baseline: Path) -> None:
+    parser.add_argument("--save", metavar="PATH", help=f"write results as a baseline file (e.g. {default_baseline})")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a stored baseline and exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression as a fraction (default 0.2)")
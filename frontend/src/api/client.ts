@@ -166,7 +166,7 @@ export interface ChatResponse {
 
 export interface PlanResponse {
   crop_name: string;
-  weather: { temp: string; condition: string; icon: string };
+  weather: { temp: string; condition: string; icon: string } | null;
   current_date: string;
   current_time: string;
   duration_progress: number;
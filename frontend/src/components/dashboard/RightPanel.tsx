@@ -233,9 +233,9 @@ export default function RightPanel({ fieldId, crop }: Props) {
               <span className="text-4xl">🌤️</span>
               <div>
                 <p className="font-bold text-gray-900 text-lg">
-                  {weather ? `${Math.round(weather.temperature_c)}°C` : plan.weather.temp}
+                  {weather ? `${Math.round(weather.temperature_c)}°C` : plan.weather?.temp ?? "--"}
                 </p>
-                <p className="text-sm text-gray-600">{weather?.condition || plan.weather.condition}</p>
+                <p className="text-sm text-gray-600">{weather?.condition || plan.weather?.condition}</p>
                 {weather?.rainfall_mm !== undefined && (
                   <p className="text-xs text-gray-500">Rainfall: {weather.rainfall_mm} mm</p>
                 )}